@@ -0,0 +1,138 @@
+"""
+Burst test for rate limiting, the LLM concurrency budget and retries.
+
+Sends a burst of `/data-requests` calls from several clients at the app (seeded
+SQLite database, recorded fake LLM) whose fake provider enforces a quota: every
+call beyond `--quota` concurrent calls fails with a 429 quota error, and
+`--llm-error-rate` of the remaining calls fail transiently as well.  The burst is
+replayed twice:
+
+    - unbounded: no rate limits, no LLM budget and no retries.
+    - limited: per-client token buckets, at most `--quota` LLM calls in flight with
+      a bounded queue, and jittered retries.
+
+For each run the table shows how requests ended (200, 429, 503 or 500), how many
+quota errors the provider returned, the peak number of concurrent LLM calls and
+the latency percentiles.  Refused requests should be 429/503 with `Retry-After`,
+not 500s.
+
+Usage:
+    python benchmarks/backpressure_benchmark.py --requests 400 --clients 8 --quota 8
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from offline_benchmark import (
+    RecordedLLM, install_converter, latency_sampler, load_corpus, percentile, seed_database, DEFAULT_CORPUS,
+)
+
+
+def configure(limited: bool, args) -> None:
+    from src.utils.config import settings
+
+    settings.RATE_LIMIT_CLIENT_HEADER = "X-Client-Id"
+    settings.RATE_LIMIT_CLIENT_RPS = args.client_rps if limited else 0.0
+    settings.RATE_LIMIT_CLIENT_BURST = args.client_burst
+    settings.LLM_MAX_CONCURRENCY = args.quota if limited else 0
+    settings.LLM_MAX_QUEUE = args.max_queue
+    settings.LLM_MAX_RETRIES = 3 if limited else 0
+    settings.LLM_RETRY_BASE_SECONDS = args.retry_base
+
+
+async def burst(args, corpus: dict[str, str | None]) -> dict:
+    import httpx
+    from main import app
+
+    rng = random.Random(args.seed)
+    queries = [query for query, sql in corpus.items() if sql]
+    statuses, latencies, retry_after = {}, [], 0
+
+    async def one(client, index):
+        nonlocal retry_after
+        started = time.perf_counter()
+        response = await client.post(
+            "/data-requests",
+            json={"user_query": rng.choice(queries)},
+            headers={"X-Client-Id": f"client-{index % args.clients}"},
+        )
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        retry_after += "retry-after" in response.headers
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(one(client, index) for index in range(args.requests)))
+            elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "statuses": statuses,
+        "retry_after": retry_after,
+        "seconds": elapsed,
+        "p50": percentile(latencies, 0.50) * 1000,
+        "p99": percentile(latencies, 0.99) * 1000,
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400, help="Requests in the burst.")
+    parser.add_argument("--clients", type=int, default=8, help="Distinct X-Client-Id values.")
+    parser.add_argument("--quota", type=int, default=8, help="Concurrent LLM calls the fake provider accepts.")
+    parser.add_argument("--llm-latency", default="lognormal:0.05:0.5", help="Fake LLM latency distribution.")
+    parser.add_argument("--llm-error-rate", type=float, default=0.05, help="Fraction of calls failing transiently.")
+    parser.add_argument("--client-rps", type=float, default=10.0, help="Per-client rate in the limited run.")
+    parser.add_argument("--client-burst", type=float, default=40.0, help="Per-client burst in the limited run.")
+    parser.add_argument("--max-queue", type=int, default=64, help="LLM calls allowed to queue in the limited run.")
+    parser.add_argument("--retry-base", type=float, default=0.05, help="First retry backoff cap in seconds.")
+    parser.add_argument("--students", type=int, default=2000, help="Students in the seeded database.")
+    parser.add_argument("--seed", type=int, default=7)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    db_path = os.path.join(tempfile.mkdtemp(prefix="nl2sql-bench-"), "bench.sqlite3")
+    seed_database(db_path, args.students, args.seed)
+    os.environ.update({
+        "API_KEY": "benchmark",
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": db_path,
+        "SCHEMA_SOURCE": "database",
+        "SQL_CACHE_ENABLED": "false",
+        "SINGLE_FLIGHT_ENABLED": "false",
+        "EXAMPLE_STORE_ENABLED": "false",
+        "SQL_TEMPLATES_ENABLED": "false",
+    })
+    logging.disable(logging.ERROR)
+
+    corpus = load_corpus(DEFAULT_CORPUS)
+    print(f"{'run':>10} {'200':>5} {'429':>5} {'503':>5} {'500':>5} {'retry-after':>12} "
+          f"{'quota errs':>11} {'peak llm':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    llm = RecordedLLM(corpus, latency_sampler(args.llm_latency, random.Random(args.seed)),
+                      error_rate=args.llm_error_rate, quota=args.quota)
+    for limited in (False, True):
+        configure(limited, args)
+        llm.rng = random.Random(args.seed + 1)
+        llm.calls = llm.errors = llm.peak_in_flight = 0
+        install_converter(llm)
+        result = asyncio.run(burst(args, corpus))
+        statuses = result["statuses"]
+        print(f"{'limited' if limited else 'unbounded':>10} {statuses.get(200, 0):>5} {statuses.get(429, 0):>5} "
+              f"{statuses.get(503, 0):>5} {statuses.get(500, 0):>5} {result['retry_after']:>12} "
+              f"{llm.errors:>11} {llm.peak_in_flight:>9} {result['p50']:>8.1f} {result['p99']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
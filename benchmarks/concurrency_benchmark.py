@@ -0,0 +1,142 @@
+"""
+Concurrency benchmark for the `/data-requests` endpoint.
+
+Drives the FastAPI app in-process with a stub LLM (an awaitable sleep) and a stub
+Oracle driver (a blocking sleep inside the cursor) and reports requests per second
+at increasing client concurrency.  With a non-blocking request path throughput
+should grow roughly linearly until the database executor / pool size is saturated.
+
+Usage:
+    python benchmarks/concurrency_benchmark.py --llm-latency 0.05 --db-latency 0.02
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for name, value in {
+    "API_KEY": "benchmark",
+    "DB_USER": "benchmark",
+    "DB_PASS": "benchmark",
+    "DB_HOST": "localhost",
+    "DB_SERVICE_NAME": "benchmark",
+}.items():
+    os.environ.setdefault(name, value)
+os.environ.setdefault("SQL_CACHE_ENABLED", "false")
+os.environ.setdefault("SINGLE_FLIGHT_ENABLED", "false")
+os.environ.setdefault("EXAMPLE_STORE_ENABLED", "false")
+os.environ.setdefault("SQL_TEMPLATES_ENABLED", "false")
+os.environ.setdefault("RATE_LIMIT_CLIENT_RPS", "0")
+os.environ.setdefault("SCHEMA_SOURCE", "static")
+
+
+def install_stub_oracledb(db_latency: float) -> None:
+    """Registers a minimal `oracledb` stand-in whose queries block for `db_latency` seconds."""
+
+    class StubCursor:
+        description = [("ROLL_NUMBER",), ("SNAME",)]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql, *args, **kwargs):
+            time.sleep(db_latency)
+
+        def fetchall(self):
+            return [(1, "stub")]
+
+        def close(self):
+            pass
+
+    class StubConnection:
+        def cursor(self):
+            return StubCursor()
+
+        def close(self):
+            pass
+
+    class StubPool:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def acquire(self):
+            return StubConnection()
+
+        def reconfigure(self, **kwargs):
+            pass
+
+        def close(self):
+            pass
+
+    module = types.ModuleType("oracledb")
+    module.create_pool = StubPool
+    module.POOL_GETMODE_TIMEDWAIT = 3
+    module.DatabaseError = type("DatabaseError", (Exception,), {})
+    sys.modules["oracledb"] = module
+
+
+def install_stub_converter(llm_latency: float) -> None:
+    """Registers a stand-in converter module whose async call awaits `llm_latency` seconds."""
+
+    class StubConverter:
+        schema_version = "benchmark"
+
+        async def Generate_Sql_Async(self, user_query, examples=()):
+            await asyncio.sleep(llm_latency)
+            return "SELECT roll_number, sname FROM student"
+
+    module = types.ModuleType("src.nl2sql_converter")
+    module.get_converter = StubConverter
+    sys.modules["src.nl2sql_converter"] = module
+
+
+async def run_level(client, concurrency: int, total: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            response = await client.post("/data-requests", json={"user_query": "list all students"})
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+async def main_async(args) -> None:
+    import httpx
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            print(f"{'concurrency':>12} {'req/s':>10}")
+            for concurrency in args.levels:
+                throughput = await run_level(client, concurrency, args.requests)
+                print(f"{concurrency:>12} {throughput:>10.1f}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stub LLM latency in seconds.")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Stub DB latency in seconds.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests issued per concurrency level.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.disable(logging.WARNING)
+    install_stub_oracledb(args.db_latency)
+    install_stub_converter(args.llm_latency)
+    asyncio.run(main_async(args))
@@ -0,0 +1,63 @@
+"""
+Micro-benchmark of per-request overhead in the NL->SQL converter.
+
+Compares building the prompt, LLM client and chain on every call (the old
+per-request behaviour) against reusing one long-lived `NL2SQLConverter`.  A fake
+chat model with no latency is used so the numbers isolate the framework overhead.
+
+Usage:
+    python benchmarks/converter_overhead_benchmark.py --iterations 2000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("API_KEY", "benchmark")
+os.environ.setdefault("SCHEMA_SOURCE", "static")
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.nl2sql_converter import NL2SQLConverter
+
+SQL = "SELECT sname FROM student WHERE dept = 'CSE'"
+QUERY = "list the names of students in cse"
+
+
+def fake_llm() -> FakeListChatModel:
+    return FakeListChatModel(responses=[SQL])
+
+
+def per_request(iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        NL2SQLConverter(llm=fake_llm()).Generate_Sql(QUERY)
+    return (time.perf_counter() - start) / iterations
+
+
+def long_lived(iterations: int) -> float:
+    converter = NL2SQLConverter(llm=fake_llm())
+    start = time.perf_counter()
+    for _ in range(iterations):
+        converter.Generate_Sql(QUERY)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    before = per_request(args.iterations)
+    after = long_lived(args.iterations)
+    print(f"per-request build : {before * 1e6:9.1f} us/request")
+    print(f"long-lived chain  : {after * 1e6:9.1f} us/request")
+    print(f"saved             : {(before - after) * 1e6:9.1f} us/request ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""
+Offline end-to-end benchmark and accuracy harness.
+
+Replays a natural language query corpus against the full FastAPI app without
+Gemini or Oracle:
+
+    - The LLM is a deterministic fake that answers from a recorded NL -> SQL table
+      (`benchmarks/data/nl_sql_corpus.jsonl`) after a latency drawn from a seeded
+      distribution, e.g. `lognormal:0.05:0.5` (median seconds, sigma),
+      `uniform:0.02:0.2`, `normal:0.1:0.02` or `const:0.05`.
+    - The database is SQLite, seeded with a synthetic student/exam/placement
+      dataset whose size scales with `--students`; the schema is read from its
+      catalog like any other backend.
+
+Each response is compared with the rows the recorded SQL returns when run directly
+on the seeded database, so the accuracy column catches regressions in validation,
+transpiling, row capping or serialization.  Throughput, p50/p95/p99 latency, mean
+time per pipeline stage and peak RSS are printed and written to a JSON file;
+passing a previous file with `--compare` reports the deltas and exits non-zero
+when p95 latency or throughput regress beyond `--tolerance`.
+
+When `langchain-core` is installed the real `NL2SQLConverter` is used with the fake
+model plugged into its chain; otherwise the converter is replaced by a stub that
+calls the fake model through the same `LLMGate`.
+
+Usage:
+    python benchmarks/offline_benchmark.py --students 20000 --requests 500 --concurrency 16 \\
+        --output baseline.json
+    python benchmarks/offline_benchmark.py --output current.json --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_CORPUS = os.path.join(ROOT, "benchmarks", "data", "nl_sql_corpus.jsonl")
+
+DEPARTMENTS = ("CSE", "ECE", "EEE", "MECH", "CIVIL", "IT")
+COMPANIES = ("Infosys", "TCS", "Wipro", "Accenture", "Zoho", "Google", "Amazon", "Microsoft")
+
+SCHEMA = """
+CREATE TABLE student (
+    roll_number INTEGER PRIMARY KEY,
+    sname VARCHAR(30),
+    dept VARCHAR(5),
+    sem INTEGER
+);
+CREATE TABLE exam (
+    regno INTEGER PRIMARY KEY,
+    roll_number INTEGER REFERENCES student(roll_number),
+    dept VARCHAR(5),
+    mark1 INTEGER, mark2 INTEGER, mark3 INTEGER, mark4 INTEGER, mark5 INTEGER,
+    total INTEGER,
+    average INTEGER,
+    grade VARCHAR(3)
+);
+CREATE TABLE placement (
+    placementid INTEGER PRIMARY KEY,
+    roll_number INTEGER REFERENCES student(roll_number),
+    dept CHAR(5),
+    company VARCHAR(100),
+    salary INTEGER
+);
+"""
+
+
+def seed_database(path: str, students: int, seed: int) -> None:
+    """Creates the student/exam/placement tables with `students` synthetic students."""
+    rng = random.Random(seed)
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+
+    student_rows, exam_rows, placement_rows = [], [], []
+    for roll_number in range(1, students + 1):
+        dept = rng.choice(DEPARTMENTS)
+        student_rows.append((roll_number, f"Student {roll_number}", dept, rng.randint(1, 8)))
+        marks = [rng.randint(30, 100) for _ in range(5)]
+        total = sum(marks)
+        average = total // 5
+        grade = "A" if average >= 90 else "B" if average >= 75 else "C" if average >= 60 else "D" if average >= 50 else "F"
+        exam_rows.append((100000 + roll_number, roll_number, dept, *marks, total, average, grade))
+        if rng.random() < 0.6:
+            placement_rows.append((len(placement_rows) + 1, roll_number, dept, rng.choice(COMPANIES), rng.randrange(300000, 2500000, 1000)))
+
+    connection.executemany("INSERT INTO student VALUES (?, ?, ?, ?)", student_rows)
+    connection.executemany("INSERT INTO exam VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", exam_rows)
+    connection.executemany("INSERT INTO placement VALUES (?, ?, ?, ?, ?)", placement_rows)
+    connection.commit()
+    connection.close()
+
+
+def load_corpus(path: str) -> dict[str, str | None]:
+    """Reads `{"user_query", "sql"}` records; a null `sql` is a query the LLM must refuse."""
+    corpus = {}
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.strip():
+                record = json.loads(line)
+                corpus[record["user_query"].strip().lower()] = record.get("sql")
+    return corpus
+
+
+def latency_sampler(spec: str, rng: random.Random):
+    """Parses a latency distribution spec into a function returning seconds."""
+    kind, *values = spec.split(":")
+    values = [float(value) for value in values]
+    if kind == "const":
+        return lambda: values[0]
+    if kind == "uniform":
+        return lambda: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda: max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Unknown latency distribution '{spec}'.")
+
+
+class ResourceExhausted(Exception):
+
+    """Stand-in for the provider's quota error (HTTP 429)."""
+
+    code = 429
+
+
+class RecordedLLM:
+
+    """
+    Deterministic stand-in for the chat model, answering from a recorded NL -> SQL table.
+
+    With `error_rate` a seeded fraction of calls fails with `ResourceExhausted`; with
+    `quota` so does every call beyond that many concurrent ones, like a provider
+    enforcing its quota.
+    """
+
+    def __init__(self, corpus: dict[str, str | None], sample_latency, error_rate: float = 0.0,
+                 quota: int = 0, rng: random.Random | None = None):
+        self.corpus = corpus
+        self.sample_latency = sample_latency
+        self.error_rate = error_rate
+        self.quota = quota
+        self.rng = rng or random.Random(0)
+        self._queries = sorted(corpus, key=len, reverse=True)
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def respond(self, prompt: str):
+        self.calls += 1
+        if (self.quota and self.in_flight >= self.quota) or self.rng.random() < self.error_rate:
+            self.errors += 1
+            raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.sample_latency())
+        finally:
+            self.in_flight -= 1
+        prompt = prompt.rstrip()
+        sql = next((self.corpus[query] for query in self._queries if prompt.endswith(query)), None)
+        content = sql or "ERROR"
+        usage = {"input_tokens": len(prompt) // 4, "output_tokens": len(content) // 4}
+        return types.SimpleNamespace(content=content, usage_metadata=usage)
+
+
+def install_converter(llm: RecordedLLM) -> str:
+    """Plugs the fake model into the real converter, or into a stub converter without langchain."""
+    try:
+        import langchain_core  # noqa: F401
+    except ImportError:
+        from fastapi import HTTPException
+        from src.llm_gate import LLMGate
+        from src.utils.config import settings
+        from src.utils.sql_text import is_refusal
+
+        class StubConverter:
+            schema_version = "benchmark"
+
+            def __init__(self):
+                self.gate = LLMGate(
+                    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+                    max_queue=settings.LLM_MAX_QUEUE,
+                    queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+                    max_retries=settings.LLM_MAX_RETRIES,
+                    retry_base=settings.LLM_RETRY_BASE_SECONDS,
+                    retry_max=settings.LLM_RETRY_MAX_SECONDS
+                )
+
+            async def Generate_Sql_Async(self, user_query, examples=()):
+                try:
+                    content = (await self.gate.run(lambda: llm.respond(user_query))).content
+                except HTTPException:
+                    raise
+                except Exception:
+                    raise HTTPException(status_code=500, detail="SQL generation failed.")
+                return None if is_refusal(content) else content
+
+        module = types.ModuleType("src.nl2sql_converter")
+        module.get_converter = StubConverter
+        sys.modules["src.nl2sql_converter"] = module
+        return "stub (langchain-core not installed; prompt building not measured)"
+
+    import src.nl2sql_converter as converter_module
+    converter_module._converter = converter_module.NL2SQLConverter(llm=llm.respond)
+    return "NL2SQLConverter with recorded LLM"
+
+
+def expected_results(db_path: str, corpus: dict[str, str | None]) -> dict[str, list | None]:
+    """Runs the recorded SQL directly on the seeded database."""
+    connection = sqlite3.connect(db_path)
+    expected = {query: _canonical_rows(connection.execute(sql).fetchall()) if sql else None for query, sql in corpus.items()}
+    connection.close()
+    return expected
+
+
+def _canonical_rows(rows) -> list:
+    return sorted(
+        json.dumps([round(value, 6) if isinstance(value, float) else value for value in row], default=str)
+        for row in rows
+    )
+
+
+def _is_correct(status: int, body: dict, expected: list | None) -> bool:
+    if expected is None:
+        return status == 400
+    if status == 404:
+        return expected == []
+    if status != 200:
+        return False
+    return _canonical_rows(tuple(row.values()) for row in body["Table_result"]) == expected
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, math.ceil(fraction * len(values)) - 1))]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def replay(args, corpus: dict[str, str | None], expected: dict[str, list | None]) -> dict:
+    import httpx
+    from main import app
+    from src.utils.metrics import STAGE_SECONDS
+
+    rng = random.Random(args.seed)
+    queries = list(corpus)
+    workload = [rng.choice(queries) for _ in range(args.requests)]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, statuses, correct = [], {}, 0
+
+    async def one(client, user_query):
+        nonlocal correct
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.post("/data-requests", json={"user_query": user_query})
+            latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        correct += _is_correct(response.status_code, response.json(), expected[user_query])
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            for user_query in queries[:args.warmup]:
+                await client.post("/data-requests", json={"user_query": user_query})
+            stage_before = STAGE_SECONDS.totals()
+            started = time.perf_counter()
+            await asyncio.gather(*(one(client, user_query) for user_query in workload))
+            elapsed = time.perf_counter() - started
+
+    stages = {}
+    for (name,), (count, total) in sorted(STAGE_SECONDS.totals().items()):
+        before_count, before_total = stage_before.get((name,), (0, 0.0))
+        if count > before_count:
+            stages[name] = round((total - before_total) / (count - before_count) * 1000, 3)
+
+    latencies.sort()
+    return {
+        "requests": args.requests,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(args.requests / elapsed, 2),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+        },
+        "status_counts": {str(status): count for status, count in sorted(statuses.items())},
+        "accuracy": round(correct / args.requests, 4),
+        "stage_mean_ms": stages,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> bool:
+    """Prints the deltas against a previous run; returns False on a regression beyond `tolerance`."""
+    ok = True
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'}:")
+    checks = (
+        ("throughput_rps", current["throughput_rps"], baseline["throughput_rps"], False),
+        ("p50 ms", current["latency_ms"]["p50"], baseline["latency_ms"]["p50"], True),
+        ("p95 ms", current["latency_ms"]["p95"], baseline["latency_ms"]["p95"], True),
+        ("p99 ms", current["latency_ms"]["p99"], baseline["latency_ms"]["p99"], True),
+        ("accuracy", current["accuracy"], baseline["accuracy"], False),
+        ("peak_rss_mb", current["peak_rss_mb"], baseline["peak_rss_mb"], True),
+    )
+    for name, now, before, lower_is_better in checks:
+        change = (now - before) / before if before else 0.0
+        worse = change > tolerance if lower_is_better else change < -tolerance
+        gated = name in ("throughput_rps", "p95 ms", "accuracy")
+        flag = "REGRESSION" if worse and gated else ""
+        print(f"  {name:>15} {before:>10} -> {now:<10} ({change:+.1%}) {flag}")
+        ok = ok and not (worse and gated)
+    return ok
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL file of {user_query, sql} records.")
+    parser.add_argument("--students", type=int, default=5000, help="Synthetic students; exam and placement rows scale with it.")
+    parser.add_argument("--requests", type=int, default=300, help="Requests replayed from the corpus.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent in-flight requests.")
+    parser.add_argument("--warmup", type=int, default=3, help="Corpus queries sent once before measuring.")
+    parser.add_argument("--llm-latency", default="lognormal:0.05:0.5", help="Fake LLM latency distribution.")
+    parser.add_argument("--seed", type=int, default=7, help="Seed for the dataset, workload and latencies.")
+    parser.add_argument("--sql-cache", action="store_true", help="Keep the generated-SQL cache enabled.")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0,
+                        help="Fraction of LLM calls failing with a transient quota error.")
+    parser.add_argument("--examples", action="store_true",
+                        help="Enable the verified example store (starts empty, fills from successful queries).")
+    parser.add_argument("--templates", action="store_true",
+                        help="Enable the query-shape SQL templates (learned from successful queries).")
+    parser.add_argument("--db", help="SQLite file to seed. Defaults to a temporary file.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Previous results JSON to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression before failing.")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="nl2sql-bench-"), "bench.sqlite3")
+    seed_database(db_path, args.students, args.seed)
+
+    os.environ.update({
+        "API_KEY": "benchmark",
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": db_path,
+        "SCHEMA_SOURCE": "database",
+        "SQL_CACHE_ENABLED": "true" if args.sql_cache else "false",
+        "EXAMPLE_STORE_ENABLED": "true" if args.examples else "false",
+        "EXAMPLE_STORE_PATH": "",
+        "SQL_TEMPLATES_ENABLED": "true" if args.templates else "false",
+        "RATE_LIMIT_CLIENT_RPS": "0",
+    })
+    logging.disable(logging.WARNING)
+
+    corpus = load_corpus(args.corpus)
+    expected = expected_results(db_path, corpus)
+    llm = RecordedLLM(corpus, latency_sampler(args.llm_latency, random.Random(args.seed)),
+                      error_rate=args.llm_error_rate, rng=random.Random(args.seed + 1))
+    converter = install_converter(llm)
+
+    results = asyncio.run(replay(args, corpus, expected))
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "students": args.students,
+            "concurrency": args.concurrency,
+            "llm_latency": args.llm_latency,
+            "llm_error_rate": args.llm_error_rate,
+            "sql_cache": args.sql_cache,
+            "examples": args.examples,
+            "templates": args.templates,
+            "seed": args.seed,
+            "corpus": os.path.relpath(args.corpus, ROOT),
+            "converter": converter,
+        },
+        **results,
+        "llm_calls": llm.calls,
+        "llm_errors": llm.errors,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            if not compare(results, json.load(file), args.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+Prompt size and retrieval latency of relevance-pruned schema context.
+
+Builds synthetic schemas of growing size (tables named from a business vocabulary,
+each with a handful of columns and a foreign key to an earlier table) and compares
+the schema section of the prompt with every table inlined against the section
+produced by `SchemaRetriever` for the top-k tables plus foreign-key neighbours.
+Token counts are approximated as characters / 4.
+
+Usage:
+    python benchmarks/schema_retrieval_benchmark.py --sizes 10 100 1000 5000 --top-k 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.schema_details import STATIC_SCHEMA, TableSchema, render_schema
+from src.schema_retriever import SchemaRetriever
+
+NOUNS = [
+    "customer", "order", "invoice", "payment", "product", "supplier", "warehouse", "shipment",
+    "employee", "department", "salary", "course", "enrollment", "faculty", "hostel", "library",
+    "book", "loan", "account", "ledger", "budget", "project", "ticket", "asset", "vendor",
+    "contract", "branch", "region", "campaign", "lead", "attendance", "timetable", "transport",
+]
+QUALIFIERS = ["daily", "monthly", "archive", "audit", "summary", "detail", "history", "staging", "line", "item"]
+COLUMN_WORDS = ["name", "code", "status", "amount", "date", "type", "count", "rate", "score", "city", "email", "phone"]
+
+QUERIES = [
+    "top 10 students by total in cse",
+    "average salary of placed students by company",
+    "list unpaid invoices for each customer",
+    "monthly shipment count per warehouse",
+    "employees in the finance department hired this year",
+]
+
+
+def synthetic_schema(size: int, seed: int = 7) -> dict[str, TableSchema]:
+    rng = random.Random(seed)
+    tables = {table.name: table for table in STATIC_SCHEMA}
+    while len(tables) < size:
+        name = f"{rng.choice(NOUNS)}_{rng.choice(QUALIFIERS)}_{len(tables)}"
+        columns = [(f"{name}_id", "INT")] + [
+            (f"{rng.choice(NOUNS)}_{rng.choice(COLUMN_WORDS)}", "VARCHAR(50)") for _ in range(rng.randint(3, 9))
+        ]
+        parent = rng.choice(list(tables))
+        parent_key = tables[parent].primary_key[0] if tables[parent].primary_key else tables[parent].columns[0][0]
+        columns.append((f"{parent}_ref", "INT"))
+        tables[name] = TableSchema(name, tuple(columns), (f"{name}_id",), ((f"{parent}_ref", parent, parent_key),))
+    return dict(list(tables.items())[:size])
+
+
+def approx_tokens(lines: list[str]) -> int:
+    return len("\n".join(lines)) // 4
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'tables':>7} {'full tokens':>12} {'pruned tokens':>14} {'index ms':>9} {'p50 us':>8} {'p95 us':>8}")
+    for size in args.sizes:
+        tables = synthetic_schema(size)
+        full = approx_tokens(render_schema(list(tables.values())))
+
+        start = time.perf_counter()
+        retriever = SchemaRetriever(tables)
+        index_ms = (time.perf_counter() - start) * 1000
+
+        latencies, pruned = [], []
+        for _ in range(args.repeat):
+            for query in QUERIES:
+                start = time.perf_counter()
+                selected = retriever.relevant_tables(query, args.top_k)
+                latencies.append((time.perf_counter() - start) * 1e6)
+                pruned.append(approx_tokens(render_schema(selected)))
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{size:>7} {full:>12} {statistics.mean(pruned):>14.0f} {index_ms:>9.1f} "
+              f"{statistics.median(latencies):>8.0f} {p95:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Load test for single-flight deduplication of identical requests.
+
+Fires N concurrent copies of the same `/data-requests` call at the app (stub LLM,
+stub Oracle driver, SQL cache off) with and without the in-process single-flight
+group and counts how many LLM calls and database executions actually happened.
+A second run simulates several workers sharing one Redis by giving each worker its
+own `RedisSingleFlight` over a common in-memory Redis fake.
+
+Usage:
+    python benchmarks/single_flight_benchmark.py --duplicates 100 --workers 4
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from concurrency_benchmark import install_stub_oracledb
+
+
+class FakeRedis:
+
+    """In-memory stand-in for the subset of the `redis.asyncio` client used by `RedisSingleFlight`."""
+
+    def __init__(self):
+        self._data: dict[str, tuple[str, float | None]] = {}
+
+    def _live(self, name):
+        item = self._data.get(name)
+        if item is not None and item[1] is not None and item[1] <= time.monotonic():
+            del self._data[name]
+            return None
+        return item
+
+    async def set(self, name, value, nx=False, px=None):
+        if nx and self._live(name) is not None:
+            return None
+        self._data[name] = (value, time.monotonic() + px / 1000 if px else None)
+        return True
+
+    async def get(self, name):
+        item = self._live(name)
+        return item[0] if item is not None else None
+
+    async def eval(self, script, numkeys, name, token):
+        # Only the single-flight compare-and-delete script is supported.
+        if await self.get(name) != token:
+            return 0
+        return 1 if self._data.pop(name, None) is not None else 0
+
+    async def aclose(self):
+        pass
+
+
+class Counters:
+    llm_calls = 0
+    db_executions = 0
+
+
+def install_counting_converter(llm_latency: float) -> None:
+    """Registers a stand-in converter that counts its calls."""
+
+    class CountingConverter:
+        schema_version = "benchmark"
+
+        async def Generate_Sql_Async(self, user_query, examples=()):
+            Counters.llm_calls += 1
+            await asyncio.sleep(llm_latency)
+            return "SELECT roll_number, sname FROM student"
+
+    module = types.ModuleType("src.nl2sql_converter")
+    module.get_converter = CountingConverter
+    sys.modules["src.nl2sql_converter"] = module
+
+
+async def fire(client, duplicates: int) -> tuple[float, set[str]]:
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(
+        client.post("/data-requests", json={"user_query": "list all students"})
+        for _ in range(duplicates)
+    ))
+    elapsed = time.perf_counter() - start
+    for response in responses:
+        response.raise_for_status()
+    return elapsed, {response.text for response in responses}
+
+
+async def run_http(args) -> None:
+    import httpx
+    from main import app
+    from src.db import get_backend
+    from src.single_flight import SingleFlight
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        backend = get_backend()
+        execute = backend.Execute_Query
+
+        def counting_execute(*call_args, **call_kwargs):
+            Counters.db_executions += 1
+            return execute(*call_args, **call_kwargs)
+
+        backend.Execute_Query = counting_execute
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            print(f"{'single-flight':>14} {'requests':>9} {'llm calls':>10} {'db execs':>9} {'seconds':>8} {'bodies':>7}")
+            for label, group in (("off", None), ("local", SingleFlight())):
+                app.state.single_flight = group
+                Counters.llm_calls = Counters.db_executions = 0
+                elapsed, bodies = await fire(client, args.duplicates)
+                print(f"{label:>14} {args.duplicates:>9} {Counters.llm_calls:>10} {Counters.db_executions:>9} {elapsed:>8.3f} {len(bodies):>7}")
+
+
+async def run_workers(args) -> None:
+    from src.single_flight import RedisSingleFlight
+
+    redis = FakeRedis()
+    workers = [RedisSingleFlight(redis, poll_interval=0.005) for _ in range(args.workers)]
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(args.llm_latency + args.db_latency)
+        return [{"roll_number": 1, "sname": "stub"}]
+
+    results = await asyncio.gather(*(
+        workers[index % args.workers].do("rows:select roll_number, sname from student", work)
+        for index in range(args.duplicates)
+    ))
+    remote = sum(worker.remote_followers for worker in workers)
+    local = sum(worker.followers for worker in workers)
+    print(f"\n{args.workers} workers sharing one Redis: {args.duplicates} calls -> {calls} execution(s), "
+          f"{local} local followers, {remote} answered by another worker, "
+          f"{len({str(result) for result in results})} distinct result(s)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duplicates", type=int, default=100, help="Concurrent identical requests.")
+    parser.add_argument("--workers", type=int, default=4, help="Simulated workers sharing one Redis.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stub LLM latency in seconds.")
+    parser.add_argument("--db-latency", type=float, default=0.02, help="Stub DB latency in seconds.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.disable(logging.WARNING)
+    install_stub_oracledb(args.db_latency)
+    install_counting_converter(args.llm_latency)
+    asyncio.run(run_http(args))
+    asyncio.run(run_workers(args))
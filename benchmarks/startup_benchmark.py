@@ -0,0 +1,71 @@
+"""
+Startup-time report for the API module.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and prints the
+total import time together with the slowest modules by cumulative time, in the
+spirit of `python -X importtime` + `tuna`.  Importing `main` must not open database
+pools or construct the LLM client; those are created in the FastAPI lifespan, so
+this number is what every worker pays before it can fork or serve.
+
+Usage:
+    python benchmarks/startup_benchmark.py --top 25 --runs 5
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def profile_import(module: str) -> list[tuple[int, int, int, str]]:
+
+    """
+    Imports `module` in a subprocess with `-X importtime`.
+
+    Returns:
+        list[tuple[int, int, int, str]]: (self us, cumulative us, depth, module) per imported module.
+    """
+
+    env = dict(os.environ)
+    env.setdefault("API_KEY", "startup-benchmark")
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        sys.exit(f"Importing {module} failed:\n{completed.stderr[-2000:]}")
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3, help="Repetitions; the median total is reported.")
+    args = parser.parse_args()
+
+    runs = [profile_import(args.module) for _ in range(args.runs)]
+    totals = [sum(entry[0] for entry in run) for run in runs]
+    entries = runs[totals.index(sorted(totals)[len(totals) // 2])]
+
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.1f} ms "
+          f"over {args.runs} runs ({len(entries)} modules)\n")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, depth, name in sorted(entries, key=lambda entry: -entry[1])[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {'  ' * depth}{name}")
+
+
+if __name__ == "__main__":
+    main()
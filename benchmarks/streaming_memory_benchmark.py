@@ -0,0 +1,162 @@
+"""
+Peak-memory benchmark of `/data-requests`: buffered JSON vs batched NDJSON streaming.
+
+Seeds a local SQLite `exam` table and sends `/data-requests` for a `SELECT *` over
+it to the app in-process (stub LLM, SQLite backend, row cap and caches off), once
+as a buffered JSON response and once with `stream=true`.  The streaming run goes
+through the real path: `Db_Stream_Async`, the fetch executor and `StreamingResponse`.
+Each mode runs in a fresh subprocess so the reported peak RSS is not polluted by
+the other.
+
+The app is called as an ASGI callable whose `send` counts and discards the body:
+`httpx.ASGITransport` collects the whole body before returning, which would add
+the full response to both runs and hide the difference being measured.
+
+Usage:
+    python benchmarks/streaming_memory_benchmark.py --rows 1000000 --batch-size 1000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+QUERY = "SELECT * FROM exam"
+
+
+def seed(path: str, rows: int) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE exam (regno INTEGER PRIMARY KEY, roll_number INTEGER, dept TEXT, mark1 INTEGER, "
+        "mark2 INTEGER, mark3 INTEGER, mark4 INTEGER, mark5 INTEGER, total INTEGER, average INTEGER, grade TEXT)"
+    )
+    depts = ["CSE", "ECE", "EEE", "MECH", "CIVIL"]
+    connection.executemany(
+        "INSERT INTO exam VALUES (?,?,?,?,?,?,?,?,?,?,?)",
+        (
+            (i, i, depts[i % 5], 60 + i % 40, 55 + i % 45, 50 + i % 50, 70 + i % 30, 65 + i % 35,
+             300 + i % 200, 60 + i % 40, "ABCDE"[i % 5])
+            for i in range(rows)
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+
+def configure(path: str, batch_size: int) -> None:
+    """Points the app at the seeded database with everything but the query path switched off."""
+    os.environ.update({
+        "API_KEY": "benchmark",
+        "DB_BACKEND": "sqlite",
+        "SQLITE_PATH": path,
+        "DB_FETCH_BATCH_SIZE": str(batch_size),
+        "MAX_RESULT_ROWS": "0",
+        "SCHEMA_SOURCE": "static",
+        "SQL_CACHE_ENABLED": "false",
+        "SQL_TEMPLATES_ENABLED": "false",
+        "SINGLE_FLIGHT_ENABLED": "false",
+        "EXAMPLE_STORE_ENABLED": "false",
+        "RESULT_CACHE_ENABLED": "false",
+        "RATE_LIMIT_CLIENT_RPS": "0",
+    })
+
+    class StubConverter:
+        schema_version = "benchmark"
+
+        async def Generate_Sql_Async(self, user_query, examples=()):
+            return QUERY
+
+    module = types.ModuleType("src.nl2sql_converter")
+    module.get_converter = StubConverter
+    sys.modules["src.nl2sql_converter"] = module
+
+
+async def post(app, payload: dict) -> tuple[int, int]:
+    """Sends one POST /data-requests to the ASGI app; returns the status and the body size in bytes."""
+    body = json.dumps(payload).encode("utf-8")
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/data-requests", "raw_path": b"/data-requests", "query_string": b"",
+        "root_path": "", "headers": [(b"content-type", b"application/json"), (b"host", b"benchmark")],
+        "client": ("127.0.0.1", 1), "server": ("benchmark", 80),
+    }
+    received = False
+    finished = asyncio.Event()
+    status = 0
+    size = 0
+
+    async def receive():
+        nonlocal received
+        if received:
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status, size
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return status, size
+
+
+async def child_async(mode: str) -> dict:
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        baseline_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        status, size = await post(app, {"user_query": "all exam results", "stream": mode == "streaming"})
+        elapsed = time.perf_counter() - start
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {"mode": mode, "status": status, "bytes": size, "seconds": elapsed,
+            "baseline_rss_mib": baseline_kib / 1024, "peak_rss_mib": peak_kib / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--child", choices=["buffered", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        logging.disable(logging.WARNING)
+        configure(args.db, args.batch_size)
+        print(json.dumps(asyncio.run(child_async(args.child))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "exam.sqlite3")
+        seed(path, args.rows)
+        print(f"{'mode':>10} {'status':>6} {'MiB sent':>9} {'seconds':>9} {'startup RSS':>12} {'peak RSS':>9}   rows={args.rows}")
+        for mode in ("buffered", "streaming"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--db", path, "--batch-size", str(args.batch_size)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:>10} {result['status']:>6} {result['bytes'] / 2**20:>9.1f} {result['seconds']:>9.2f} "
+                  f"{result['baseline_rss_mib']:>12.1f} {result['peak_rss_mib']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,19 +10,45 @@ Modules Used:
     - FastAPI:  For building the API.
     - Pydantic: For data validation and request/response models.
     - src.nl2sql_converter:  Handles the conversion of natural language to SQL.
-    - src.query_exe:  Executes SQL queries against the database.
+    - src.db:  Executes SQL queries against the configured database backend.
+    - src.query_cache:  Caches generated SQL for repeated and near-duplicate queries.
+    - src.result_cache:  Optionally caches query results keyed on the generated SQL.
+    - src.example_store:  Verified NL/SQL examples used as few-shot examples or reused as is.
+    - src.rate_limit:  Per-client and global token-bucket request limits.
+    - src.sql_templates:  Bind variables for generated SQL and query-shape templates that skip the LLM.
 
 API Endpoints:
     - POST /data-requests:  Accepts a natural language query, converts it to SQL,
-                             executes the query, and returns the results as a JSON response.
+                             executes the query, and returns the results as a JSON response,
+                             an NDJSON stream (`stream`) or one page at a time (`page_size`/`page_token`).
+                             `format` selects row dicts, column-major JSON or Arrow IPC.
+    - POST /data-requests/batch:  Answers a list of natural language queries in one call, with per-item status.
+    - GET /metrics:  Exposes per-stage latency histograms, LLM token counts and pool gauges for Prometheus.
+    - GET /admin/cache-stats:  Returns hit/miss/eviction counters of the SQL, template and result caches and the single-flight counters.
+    - GET /admin/pool-stats:  Returns connection pool usage, the adaptive limit and checkout wait statistics.
+    - GET /admin/llm-stats:  Returns rate limiter rejections and the LLM concurrency budget, queue and retry counters.
+    - POST /admin/result-cache/invalidate:  Drops cached results for the given tables.
+    - POST /admin/examples:  Imports verified natural language/SQL pairs into the example store.
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from src.nl2sql_converter import Convert_Natural_Language_To_Sql
-from src.query_executer import db_instance,Db_Output_Gen
+import asyncio
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse, Response
+from pydantic import BaseModel, Field
+from typing import Literal
+from src.nl2sql_converter import get_converter
+from src.schema_details import get_schema_cache
+from src.db import get_backend,close_backend,Db_Output_Gen_Async,Db_Stream_Async,Db_Page_Async,Db_Explain_Async
+from src.query_cache import SemanticQueryCache
+from src.result_cache import QueryResultCache,canonicalize_sql
+from src.example_store import ExampleStore
+from src.rate_limit import RateLimiter
+from src.single_flight import create_single_flight
+from src.utils.config import settings
 from src.utils.logger import get_logger
+from src.utils.pagination import encode_page_token,decode_page_token
+from src.utils.metrics import stage,register_gauge,enable_tracing,render_metrics,MetricsMiddleware,CONTENT_TYPE as METRICS_MEDIA_TYPE
+from src.utils.result_format import ndjson_stream,collect_columns,collect_arrow_ipc,NDJSON_MEDIA_TYPE,ARROW_MEDIA_TYPE
 from contextlib import asynccontextmanager
 
 # Initialize logger
@@ -30,11 +56,103 @@ logger=get_logger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+
+    """
+    Creates the heavy resources after the worker has started (and, under gunicorn,
+    after it has forked) and releases them on shutdown.
+    """
+
+    backend=get_backend()
+    register_gauge(
+        "nl2sql_db_pool_connections",
+        "Pooled database connections by state.",
+        ("backend","state"),
+        lambda: _pool_samples(backend)
+    )
+    register_gauge(
+        "nl2sql_db_pool_manager",
+        "Adaptive connection limit, usage and cumulative checkout wait statistics.",
+        ("backend","field"),
+        lambda: [((backend.name,field),value) for field,value in backend.pool_manager.stats().items()]
+    )
+    pool_resizer=asyncio.create_task(backend.pool_manager.run(settings.DB_POOL_RESIZE_SECONDS))
+    if settings.OTEL_TRACING_ENABLED and not enable_tracing():
+        logger.warning("OTEL_TRACING_ENABLED is set but opentelemetry-api is not installed; spans are disabled.")
+    schema_cache=get_schema_cache()
+    await schema_cache.refresh_async()
+    schema_refresher=asyncio.create_task(schema_cache.run_refresher())
+    app.state.converter=get_converter()
+    register_gauge(
+        "nl2sql_llm_gate",
+        "LLM calls in flight and queued, and cumulative retry and load shedding counters.",
+        ("field",),
+        lambda: [((field,),value) for field,value in app.state.converter.gate.stats().items()]
+    )
+    from src.sql_validator import SQLValidator
+    from src.query_guard import QueryGuard
+    from src.sql_templates import SQLParameterizer,QueryTemplateCache
+    app.state.sql_validator=SQLValidator(schema_cache,get_backend().dialect)
+    app.state.query_guard=QueryGuard(
+        app.state.sql_validator,
+        max_rows=settings.MAX_RESULT_ROWS,
+        cost_mode=settings.QUERY_COST_GUARD,
+        max_cost=settings.MAX_QUERY_COST,
+        max_cardinality=settings.MAX_QUERY_CARDINALITY
+    )
+    app.state.parameterizer=SQLParameterizer(
+        app.state.sql_validator,
+        backend.bind_placeholder,
+        backend.padded_char_types
+    ) if settings.SQL_BIND_LITERALS else None
+    app.state.sql_templates=QueryTemplateCache(
+        app.state.sql_validator,
+        max_entries=settings.SQL_TEMPLATE_MAX_ENTRIES
+    ) if settings.SQL_TEMPLATES_ENABLED else None
+    logger.info("NL2SQL converter initialized.")
+    app.state.sql_cache=SemanticQueryCache(
+        max_entries=settings.SQL_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.SQL_CACHE_TTL_SECONDS,
+        similarity_threshold=settings.SQL_CACHE_SIMILARITY_THRESHOLD
+    ) if settings.SQL_CACHE_ENABLED else None
+    app.state.result_cache=QueryResultCache(
+        max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+        default_ttl=settings.RESULT_CACHE_TTL_SECONDS,
+        table_ttls=settings.RESULT_CACHE_TABLE_TTLS
+    ) if settings.RESULT_CACHE_ENABLED else None
+    app.state.example_store=None
+    if settings.EXAMPLE_STORE_ENABLED:
+        app.state.example_store=ExampleStore(
+            path=settings.EXAMPLE_STORE_PATH,
+            max_entries=settings.EXAMPLE_STORE_MAX_ENTRIES,
+            min_similarity=settings.EXAMPLE_MIN_SIMILARITY,
+            reuse_threshold=settings.EXAMPLE_REUSE_THRESHOLD
+        )
+        await asyncio.to_thread(app.state.example_store.load)
+    app.state.rate_limiter=RateLimiter(
+        client_rate=settings.RATE_LIMIT_CLIENT_RPS,
+        client_burst=settings.RATE_LIMIT_CLIENT_BURST,
+        global_rate=settings.RATE_LIMIT_GLOBAL_RPS,
+        global_burst=settings.RATE_LIMIT_GLOBAL_BURST,
+        max_clients=settings.RATE_LIMIT_MAX_CLIENTS
+    )
+    app.state.single_flight=create_single_flight()
     yield
-    db_instance.close_pool
+    schema_refresher.cancel()
+    pool_resizer.cancel()
+    if app.state.single_flight:
+        await app.state.single_flight.close()
+    close_backend()
     logger.info("Shutdown complete, connection pool closed.")
 
+def _pool_samples(backend) -> list[tuple[tuple,int]]:
+    usage=backend.pool_usage() if backend.pool is not None else None
+    if usage is None:
+        return []
+    opened,busy=usage
+    return [((backend.name,"open"),opened),((backend.name,"busy"),busy),((backend.name,"idle"),opened-busy)]
+
 app=FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 class NlQueryRequest(BaseModel):
 
@@ -43,28 +161,269 @@ class NlQueryRequest(BaseModel):
 
     Attributes:
         user_query (str): The natural language query string.
+        stream (bool): Stream the rows as NDJSON instead of returning a single JSON document.
+        page_size (int, optional): Return at most this many rows plus a `next_page_token`.
+        page_token (str, optional): Token from a previous page to continue from.
+        format (str): Result layout: `rows` (a dict per row), `columns` (column-major JSON)
+            or `arrow` (Apache Arrow IPC stream).
     """
     user_query:str
+    format:Literal["rows","columns","arrow"]="rows"
+    stream:bool=False
+    page_size:int|None=Field(default=None,gt=0)
+    page_token:str|None=None
+
+class BatchQueryRequest(BaseModel):
+
+    """
+    Request model for batches of natural language queries.
+
+    Attributes:
+        user_queries (list[str]): The natural language queries, answered in this order.
+    """
+    user_queries:list[str]
+
+class ExampleItem(BaseModel):
+
+    """
+    A verified natural language query and the SQL answering it.
+
+    Attributes:
+        user_query (str): The natural language query.
+        sql (str): The SQL SELECT statement answering it.
+    """
+    user_query:str
+    sql:str
+
+class ExampleImportRequest(BaseModel):
+
+    """
+    Request model for importing verified examples.
+
+    Attributes:
+        examples (list[ExampleItem]): The examples to store.
+    """
+    examples:list[ExampleItem]
+
+class CacheInvalidationRequest(BaseModel):
+
+    """
+    Request model for result cache invalidation.
+
+    Attributes:
+        tables (list[str]): Tables whose cached results should be dropped. Empty drops everything.
+    """
+    tables:list[str]=[]
+
+def enforce_rate_limit(http_request:Request,cost:int=1) -> None:
+    """
+    Admits the request against the client's and the global token buckets.
+
+    The client is identified by `RATE_LIMIT_CLIENT_HEADER` when it is set and present.
+    For a list-valued header such as `X-Forwarded-For` the last entry is used: it is
+    the one added by the trusted proxy, while earlier entries come from the client.
+
+    Raises:
+        HTTPException:
+            - 429 Too Many Requests: If the client exceeded `RATE_LIMIT_CLIENT_RPS`, with `Retry-After`,
+              or `cost` exceeds a bucket's burst.
+            - 503 Service Unavailable: If the worker exceeded `RATE_LIMIT_GLOBAL_RPS`, with `Retry-After`.
+    """
+
+    client_id=None
+    if settings.RATE_LIMIT_CLIENT_HEADER:
+        client_id=http_request.headers.get(settings.RATE_LIMIT_CLIENT_HEADER,"").split(",")[-1].strip()
+    if not client_id:
+        client_id=http_request.client.host if http_request.client else "unknown"
+    http_request.app.state.rate_limiter.check(client_id,cost)
+
+async def resolve_sql(state,user_query:str) -> tuple[str,bool]:
+
+    """
+    Returns checked, ready-to-run SQL for a normalized natural language query.
+
+    The SQL comes from the SQL cache, a learned template of the same query shape with
+    the query's values filled in, a near-identical verified example or the LLM
+    (prompted with the most similar examples), is validated against the schema,
+    capped at `MAX_RESULT_ROWS` and, when enabled, checked against the optimizer's
+    cost estimates.  Concurrent calls for the same query share one resolution.
+
+    Args:
+        state (State): The application state holding the converter, caches and guards.
+        user_query (str): The stripped, lower-cased natural language query.
+
+    Returns:
+        tuple[str, bool]: The SQL and whether it was reused rather than generated.
+
+    Raises:
+        HTTPException:
+            - 400 Bad Request: If the LLM refused the query or the SQL failed validation or the cost check.
+            - 503 Service Unavailable: If the LLM is at capacity or keeps failing transiently, with `Retry-After`.
+    """
+
+    single_flight=state.single_flight
+    if single_flight:
+        key=f"sql:{state.converter.schema_version}:{user_query}"
+        generated_sql,from_cache=await single_flight.do(key,lambda: _resolve_sql(state,user_query))
+        return generated_sql,from_cache
+    return await _resolve_sql(state,user_query)
+
+async def _resolve_sql(state,user_query:str) -> tuple[str,bool]:
+    converter=state.converter
+    sql_cache=state.sql_cache
+
+    with stage("sql_cache_lookup"):
+        generated_sql=sql_cache.get(user_query,converter.schema_version) if sql_cache else None
+    from_cache=generated_sql is not None
+    if not from_cache and state.sql_templates:
+        with stage("template_lookup"):
+            generated_sql=state.sql_templates.match(user_query,converter.schema_version)
+        if generated_sql is not None:
+            generated_sql=await _check_template(state,user_query,generated_sql)
+            if generated_sql is not None:
+                return generated_sql,True
+    if not from_cache:
+        examples=[]
+        example_store=state.example_store
+        if example_store:
+            with stage("example_lookup"):
+                results=example_store.search(user_query,settings.EXAMPLE_TOP_K)
+                reusable=example_store.match(user_query,results)
+                if reusable is not None:
+                    generated_sql=await _reuse_example(state,user_query,reusable)
+            examples=[example for example,_ in results]
+        from_cache=generated_sql is not None
+        if not from_cache:
+            generated_sql=await converter.Generate_Sql_Async(user_query,examples)
+
+    if not generated_sql:
+        logger.warning(f"Failed to generate SQL for query: {user_query}")
+        raise HTTPException(status_code=400,detail="Invalid SQL query or unauthorized modifications detected.")
+
+    with stage("sql_validation"):
+        generated_sql=state.sql_validator.validate(generated_sql)
+        generated_sql=state.query_guard.cap_rows(generated_sql)
+    with stage("cost_check"):
+        await state.query_guard.check_cost(generated_sql,Db_Explain_Async)
+    logger.info(f"Generated SQL query: {generated_sql}")
+    return generated_sql,from_cache
+
+async def _reuse_example(state,user_query:str,example) -> str | None:
+    try:
+        state.sql_validator.validate(example.sql)
+    except HTTPException as e:
+        logger.warning(f"Stored example for '{example.user_query}' no longer validates ({e.detail}); discarding it.")
+        await asyncio.to_thread(state.example_store.discard,example.user_query)
+        return None
+    logger.info(f"Reusing verified example '{example.user_query}' for query: {user_query}")
+    return example.sql
+
+async def _check_template(state,user_query:str,generated_sql:str) -> str | None:
+    # The filled-in values are only guesses (their case is copied from the learned query), so a
+    # template answer is used only if it validates, passes the cost check and its filters find
+    # at least one row.  Returns the checked SQL, or None to fall back to generating it: any
+    # failure here, including database errors, only ever sends the query to the LLM.
+    try:
+        validated_sql=state.sql_validator.validate(generated_sql)
+        generated_sql=state.query_guard.cap_rows(validated_sql)
+        with stage("cost_check"):
+            await state.query_guard.check_cost(generated_sql,Db_Explain_Async)
+        statement,params=bind_literals(state,state.query_guard.paginate(state.sql_templates.probe(validated_sql),0,1))
+        with stage("template_check"):
+            rows,_=await Db_Page_Async(statement,1,params)
+    except HTTPException as e:
+        logger.warning(f"Learned SQL template failed its checks for query: {user_query} ({e.detail}); generating SQL instead.")
+        return None
+    if not rows:
+        logger.info(f"Learned SQL template found no rows for query: {user_query}; generating SQL instead.")
+        return None
+    logger.info(f"Filled a learned SQL template for query: {user_query}: {generated_sql}")
+    return generated_sql
+
+async def remember_sql(state,user_query:str,generated_sql:str,has_rows:bool=True) -> None:
+    """
+    Stores freshly generated SQL in the SQL cache and, once it has returned rows, as a
+    verified example and as the template of the query's shape.  The example store may
+    append to its file, so it is written from a worker thread.
+    """
+
+    if state.sql_cache:
+        state.sql_cache.put(user_query,state.converter.schema_version,generated_sql)
+    if state.example_store and has_rows:
+        await asyncio.to_thread(state.example_store.add,user_query,generated_sql)
+    if state.sql_templates and has_rows:
+        state.sql_templates.learn(user_query,state.converter.schema_version,generated_sql)
+
+def bind_literals(state,generated_sql:str) -> tuple[str,dict|None]:
+    """
+    Returns the statement to execute for checked SQL, with its filter literals as bind variables, and their values.
+
+    Caches, single-flight keys and page tokens keep using the SQL with literals; only execution sees the bound form.
+    """
+
+    if state.parameterizer is None:
+        return generated_sql,None
+    return state.parameterizer.bind(generated_sql)
+
+async def execute_rows(state,generated_sql:str) -> list[dict]:
+    """
+    Executes SQL and returns all rows, going through the result cache when it is enabled.
+
+    Concurrent executions of the same SQL share one database round trip.
+    """
+
+    single_flight=state.single_flight
+    if single_flight:
+        return await single_flight.do(f"rows:{canonicalize_sql(generated_sql)}",lambda: _execute_rows(state,generated_sql))
+    return await _execute_rows(state,generated_sql)
+
+async def _execute_rows(state,generated_sql:str) -> list[dict]:
+    statement,params=bind_literals(state,generated_sql)
+    result_cache=state.result_cache
+    if result_cache:
+        return await result_cache.get_or_execute(generated_sql,lambda _: Db_Output_Gen_Async(statement,params))
+    return await Db_Output_Gen_Async(statement,params)
 
 @app.post("/data-requests")
-async def process_request(request:NlQueryRequest):
+async def process_request(request:NlQueryRequest,http_request:Request):
 
     """
     Processes a natural language query, converts it to SQL, and returns the results.
 
     This endpoint receives a natural language query, validates it, converts it into
-    an SQL query using the `Convert_Natural_Language_To_Sql` function, executes
-    the SQL query against the database using the `Db_Output_Gen` function, and
-    returns the results as a JSON response.
+    an SQL query using the converter built at startup, executes
+    the SQL query against the database using the `Db_Output_Gen_Async` function, and
+    returns the results as a JSON response.  Neither step blocks the event loop, so
+    a slow LLM call or database query does not stall other requests on the worker.
+
+    Every query is capped at `MAX_RESULT_ROWS` rows and, when `QUERY_COST_GUARD` is
+    enabled, checked against the optimizer's estimates before it runs.  Its filter
+    literals are sent as bind variables, so queries differing only in values reuse
+    one cursor.
+
+    Large results can be requested as an NDJSON stream (`stream=true`), fetched from
+    the database in `arraysize` batches, or page by page (`page_size`/`page_token`,
+    with the rows put in a total order so pages neither skip nor repeat rows);
+    either way the worker only holds one batch or page in memory.  The `columns` and
+    `arrow` formats are built directly from cursor batches, listing each column name
+    once instead of repeating it on every row.
 
     Args:
         request (NlQueryRequest):  The incoming request containing the natural language query.
+        http_request (Request):  The raw request, used to reach the application state.
 
     Returns:
-        JSONResponse:  A JSON response containing the query results or an error message.
-                       - `200 OK`:  Query executed successfully, and results are returned in the `Table_result` field.
+        JSONResponse | StreamingResponse:  A JSON response containing the query results or an error message,
+                       or an NDJSON stream of rows when `stream` is set.
+                       - `200 OK`:  Query executed successfully, and results are returned in the `Table_result` field
+                                    (with `next_page_token` when paginating), or as an Arrow IPC body for `format=arrow`.
                        - `400 Bad Request`: Invalid query (e.g., empty query, invalid table/column names, forbidden SQL commands). Detail contains specific error information.
                        - `404 Not Found`: Query executed successfully, but no data was found.
+                       - `429 Too Many Requests`: The client exceeded its rate limit; see `Retry-After`.
+                       - `503 Service Unavailable`: The worker or the LLM is at capacity, or the LLM kept
+                                                    failing transiently; see `Retry-After`.
+                       - `504 Gateway Timeout`: The query exceeded `DB_STATEMENT_TIMEOUT_MS`.
+                       - `501 Not Implemented`: Arrow format requested but pyarrow is not installed.
                        - `500 Internal Server Error`: An unexpected error occurred during processing.
 
     Raises:
@@ -78,19 +437,60 @@ async def process_request(request:NlQueryRequest):
     if not user_query:
         logger.warning("Received an empty query request.")
         raise HTTPException(status_code=400,detail="Query cannot be empty.Please enter a valid query.")
-    
-    generated_sql=Convert_Natural_Language_To_Sql(user_query)
 
-    if not generated_sql:
-        logger.warning(f"Failed to generate SQL for query: {user_query}")
-        raise HTTPException(status_code=400,detail="Invalid SQL query or unauthorized modifications detected.")
+    if request.format!="rows" and (request.stream or request.page_size or request.page_token):
+        raise HTTPException(status_code=400,detail="Streaming and pagination are only available with format 'rows'.")
+
+    enforce_rate_limit(http_request)
     
-    logger.info(f"Generated SQL query: {generated_sql}")
+    state=http_request.app.state
+    generated_sql,from_cache=await resolve_sql(state,user_query)
 
     try:
-        query_result=Db_Output_Gen(generated_sql)
+        statement,params=bind_literals(state,generated_sql)
+        if request.stream:
+            batches=Db_Stream_Async(statement,params=params)
+            first_batch=await anext(batches,None)
+            if first_batch is None:
+                return JSONResponse(content={"Message":"No data found"},status_code=404)
+            if not from_cache:
+                await remember_sql(state,user_query,generated_sql)
+            return StreamingResponse(ndjson_stream(batches,first_batch),media_type=NDJSON_MEDIA_TYPE)
+
+        if request.page_size or request.page_token:
+            page_size=min(request.page_size or settings.MAX_PAGE_SIZE,settings.MAX_PAGE_SIZE)
+            offset=decode_page_token(request.page_token,generated_sql)
+            paged_sql=state.query_guard.paginate(state.query_guard.order_rows(generated_sql),offset,page_size+1)
+            paged_statement,paged_params=bind_literals(state,paged_sql)
+            page_rows,has_more=await Db_Page_Async(paged_statement,page_size,paged_params)
+            if not from_cache:
+                await remember_sql(state,user_query,generated_sql,has_rows=bool(page_rows))
+            if not page_rows and offset==0:
+                return JSONResponse(content={"Message":"No data found"},status_code=404)
+            next_page_token=encode_page_token(generated_sql,offset+len(page_rows)) if has_more else None
+            with stage("serialization"):
+                return JSONResponse(content={"Table_result":page_rows,"next_page_token":next_page_token},status_code=200)
+
+        if request.format!="rows":
+            batches=Db_Stream_Async(statement,params=params)
+            if request.format=="columns":
+                payload=await collect_columns(batches)
+            else:
+                payload=await collect_arrow_ipc(batches)
+            if payload is None:
+                return JSONResponse(content={"Message":"No data found"},status_code=404)
+            if not from_cache:
+                await remember_sql(state,user_query,generated_sql)
+            if request.format=="columns":
+                return JSONResponse(content={"Table_result":payload},status_code=200)
+            return Response(content=payload,media_type=ARROW_MEDIA_TYPE,status_code=200)
+
+        query_result=await execute_rows(state,generated_sql)
+        if not from_cache:
+            await remember_sql(state,user_query,generated_sql,has_rows=bool(query_result))
         if query_result:
-            return JSONResponse(content={"Table_result":query_result},status_code=200)
+            with stage("serialization"):
+                return JSONResponse(content={"Table_result":query_result},status_code=200)
         else:
             return JSONResponse(content={"Message":"No data found"},status_code=404)
 
@@ -98,12 +498,214 @@ async def process_request(request:NlQueryRequest):
         logger.error(f"HTTP Exception: {e.detail}")
         raise HTTPException(
             status_code=e.status_code,
-            detail=f"HTTP error occurred: {e.detail}. Please check your request and try again."
+            detail=f"HTTP error occurred: {e.detail}. Please check your request and try again.",
+            headers=e.headers
         )
     except Exception as e:
         logger.exception("Unexpected error during query execution.")
         raise HTTPException(status_code=500,detail="Internal server error: An unexpected error occurred while processing your request.")
 
-def shutdown():
-    db_instance.close_pool()
-    logger.info("Shutdown complete, connection pool closed.")
\ No newline at end of file
+@app.post("/data-requests/batch")
+async def process_batch_request(request:BatchQueryRequest,http_request:Request):
+
+    """
+    Answers several natural language queries in one call.
+
+    Repeated queries (after normalization) are answered once.  SQL generation and
+    execution run concurrently, at most `BATCH_CONCURRENCY` at a time so a batch
+    cannot take over the LLM quota or the whole connection pool, and queries that
+    produce the same SQL share one execution.  A failing query does not fail the
+    batch: every item carries its own status.
+
+    Args:
+        request (BatchQueryRequest): The natural language queries.
+        http_request (Request): The raw request, used to reach the application state.
+
+    Returns:
+        JSONResponse: `results`, one entry per input query in input order, each with the
+                      `user_query`, a `status` ("ok", "no_data" or "error"), its HTTP-style
+                      `status_code` and either `Table_result`, `Message` or `detail` (plus `retry_after`
+                      in seconds for items shed by the LLM budget).
+
+    Raises:
+        HTTPException:
+            - 400 Bad Request: If the batch is empty or larger than `BATCH_MAX_QUERIES`.
+            - 429 Too Many Requests / 503 Service Unavailable: If the batch's unique queries exceed the rate limits.
+    """
+
+    if not request.user_queries:
+        raise HTTPException(status_code=400,detail="The batch must contain at least one query.")
+    if len(request.user_queries)>settings.BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400,detail=f"A batch may contain at most {settings.BATCH_MAX_QUERIES} queries.")
+
+    state=http_request.app.state
+    limiter=asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+    executions:dict[str,asyncio.Task]={}
+
+    async def execute(generated_sql:str) -> list[dict]:
+        async with limiter:
+            return await execute_rows(state,generated_sql)
+
+    async def answer(user_query:str) -> dict:
+        try:
+            if not user_query:
+                raise HTTPException(status_code=400,detail="Query cannot be empty.Please enter a valid query.")
+            async with limiter:
+                generated_sql,from_cache=await resolve_sql(state,user_query)
+            if generated_sql not in executions:
+                executions[generated_sql]=asyncio.create_task(execute(generated_sql))
+            query_result=await executions[generated_sql]
+            if not from_cache:
+                await remember_sql(state,user_query,generated_sql,has_rows=bool(query_result))
+            if query_result:
+                return {"status":"ok","status_code":200,"Table_result":query_result}
+            return {"status":"no_data","status_code":404,"Message":"No data found"}
+        except HTTPException as e:
+            logger.error(f"Batch item failed ({e.status_code}): {e.detail}")
+            item={"status":"error","status_code":e.status_code,"detail":e.detail}
+            if e.headers and "Retry-After" in e.headers:
+                item["retry_after"]=int(e.headers["Retry-After"])
+            return item
+        except Exception:
+            logger.exception(f"Unexpected error during batch query: {user_query}")
+            return {"status":"error","status_code":500,"detail":"Internal server error during query processing."}
+
+    normalized=[user_query.strip().lower() for user_query in request.user_queries]
+    unique=list(dict.fromkeys(normalized))
+    enforce_rate_limit(http_request,cost=len(unique))
+    answers=dict(zip(unique,await asyncio.gather(*(answer(user_query) for user_query in unique))))
+    logger.info(f"Answered batch of {len(normalized)} queries ({len(unique)} unique, {len(executions)} distinct SQL).")
+    return JSONResponse(content={"results":[
+        {"user_query":original,**answers[user_query]}
+        for original,user_query in zip(request.user_queries,normalized)
+    ]},status_code=200)
+
+@app.get("/metrics")
+async def metrics():
+
+    """
+    Exposes latency histograms, LLM token counts and pool gauges for Prometheus.
+
+    Returns:
+        Response: The metrics in the Prometheus text exposition format.
+    """
+
+    return Response(content=render_metrics(),media_type=METRICS_MEDIA_TYPE)
+
+@app.get("/admin/cache-stats")
+async def cache_stats(http_request:Request):
+
+    """
+    Returns the cache counters so cache sizes and TTLs can be tuned.
+
+    Returns:
+        JSONResponse: The `sql_cache`, `sql_templates`, `result_cache`, `single_flight` and `example_store`
+                      statistics; null when disabled.
+    """
+
+    sql_cache=http_request.app.state.sql_cache
+    result_cache=http_request.app.state.result_cache
+    single_flight=http_request.app.state.single_flight
+    example_store=http_request.app.state.example_store
+    sql_templates=http_request.app.state.sql_templates
+    return JSONResponse(content={
+        "sql_cache":sql_cache.stats() if sql_cache else None,
+        "sql_templates":sql_templates.stats() if sql_templates else None,
+        "result_cache":result_cache.stats() if result_cache else None,
+        "single_flight":single_flight.stats() if single_flight else None,
+        "example_store":example_store.stats() if example_store else None
+    },status_code=200)
+
+@app.get("/admin/pool-stats")
+async def pool_stats():
+
+    """
+    Returns the connection pool usage and checkout wait statistics.
+
+    Returns:
+        JSONResponse: The backend name, the driver pool's open/busy counts and the adaptive limit with its wait statistics.
+    """
+
+    backend=get_backend()
+    usage=backend.pool_usage() if backend.pool is not None else None
+    return JSONResponse(content={
+        "backend":backend.name,
+        "open":usage[0] if usage else None,
+        "busy":usage[1] if usage else None,
+        **backend.pool_manager.stats()
+    },status_code=200)
+
+@app.get("/admin/llm-stats")
+async def llm_stats(http_request:Request):
+
+    """
+    Returns the rate limiter and LLM gate counters so the limits can be tuned.
+
+    Returns:
+        JSONResponse: The `rate_limiter` admission/rejection counters and the `llm_gate` in-flight, queue and retry counters.
+    """
+
+    return JSONResponse(content={
+        "rate_limiter":http_request.app.state.rate_limiter.stats(),
+        "llm_gate":http_request.app.state.converter.gate.stats()
+    },status_code=200)
+
+@app.post("/admin/result-cache/invalidate")
+async def invalidate_result_cache(request:CacheInvalidationRequest,http_request:Request):
+
+    """
+    Drops cached query results for the given tables, e.g. after a data load.
+
+    Args:
+        request (CacheInvalidationRequest): The tables to invalidate; empty invalidates everything.
+
+    Returns:
+        JSONResponse: The number of cached results removed.
+
+    Raises:
+        HTTPException:
+            - 404 Not Found: If the result cache is disabled.
+    """
+
+    result_cache=http_request.app.state.result_cache
+    if not result_cache:
+        raise HTTPException(status_code=404,detail="Result cache is not enabled.")
+    removed=result_cache.invalidate(request.tables)
+    return JSONResponse(content={"invalidated":removed},status_code=200)
+
+@app.post("/admin/examples")
+async def import_examples(request:ExampleImportRequest,http_request:Request):
+
+    """
+    Imports verified natural language/SQL pairs into the example store.
+
+    Each SQL statement is validated against the current schema first; imported
+    examples are never evicted in favour of examples recorded from executions.
+
+    Args:
+        request (ExampleImportRequest): The examples to import.
+
+    Returns:
+        JSONResponse: The number of examples stored and, per rejected example, its index and the validation error.
+
+    Raises:
+        HTTPException:
+            - 404 Not Found: If the example store is disabled.
+    """
+
+    example_store=http_request.app.state.example_store
+    if not example_store:
+        raise HTTPException(status_code=404,detail="Example store is not enabled.")
+    validator=http_request.app.state.sql_validator
+    imported=0
+    rejected=[]
+    for index,item in enumerate(request.examples):
+        try:
+            sql=validator.validate(item.sql)
+        except HTTPException as e:
+            rejected.append({"index":index,"detail":e.detail})
+            continue
+        if await asyncio.to_thread(example_store.add,item.user_query.strip().lower(),sql,source="import"):
+            imported+=1
+    logger.info(f"Imported {imported} verified examples ({len(rejected)} rejected).")
+    return JSONResponse(content={"imported":imported,"rejected":rejected},status_code=200)
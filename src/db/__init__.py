@@ -0,0 +1,149 @@
+"""
+Pluggable database backend layer.
+
+Drivers are registered by name and the active one is chosen through
+`settings.DB_BACKEND`.  Built-in drivers are referenced by import path so that only
+the selected driver's client library is imported.  The module-level `Db_*`
+functions are the entry points used by the API.
+
+Built-in backends:
+    - oracle: `src.db.oracle_backend.OracleBackend`
+    - mysql:  `src.db.mysql_backend.MySQLBackend`
+    - sqlite: `src.db.sqlite_backend.SQLiteBackend`
+"""
+
+import importlib
+from fastapi import HTTPException
+from src.db.base import DatabaseBackend
+from src.utils.config import settings
+from src.utils.logger import get_logger
+
+logger=get_logger(__name__)
+
+_BACKENDS: dict[str, str | type[DatabaseBackend]] = {
+    "oracle": "src.db.oracle_backend:OracleBackend",
+    "mysql": "src.db.mysql_backend:MySQLBackend",
+    "sqlite": "src.db.sqlite_backend:SQLiteBackend",
+}
+
+_backend: DatabaseBackend | None = None
+
+def register_backend(name: str, backend: str | type[DatabaseBackend]) -> None:
+
+    """
+    Registers a database driver under a name selectable through `DB_BACKEND`.
+
+    Args:
+        name (str): The backend name.
+        backend (str | type[DatabaseBackend]): The backend class, or its "module:Class" import path.
+    """
+
+    _BACKENDS[name.lower()] = backend
+
+def _resolve(name: str) -> type[DatabaseBackend]:
+    backend = _BACKENDS.get(name.lower())
+    if backend is None:
+        logger.error(f"Unknown database backend: {name}")
+        raise HTTPException(status_code=500, detail=f"Unknown database backend '{name}'.")
+    if isinstance(backend, str):
+        module_name, class_name = backend.split(":")
+        backend = getattr(importlib.import_module(module_name), class_name)
+        _BACKENDS[name.lower()] = backend
+    return backend
+
+def get_backend() -> DatabaseBackend:
+
+    """
+    Returns the active database backend, creating its connection pool on first use.
+
+    Returns:
+        DatabaseBackend: The backend selected by `settings.DB_BACKEND`.
+    """
+
+    global _backend
+    if _backend is None:
+        _backend = _resolve(settings.DB_BACKEND)()
+    return _backend
+
+def close_backend() -> None:
+    """Closes the active backend's connection pool, if one was created."""
+    global _backend
+    if _backend is not None:
+        _backend.close_pool()
+        _backend = None
+
+def Db_Output_Gen(query: str,params=None) ->list[dict]:
+
+    """
+    Executes a SQL query and returns the results.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (dict, optional): Bind parameters for the query.
+
+    Returns:
+        List[Dict[str, Any]]: A list of dictionaries representing the query results.
+    """
+
+    return get_backend().Execute_Query(query, params)
+
+async def Db_Output_Gen_Async(query: str,params=None) ->list[dict]:
+
+    """
+    Executes a SQL query on the database executor and returns the results.
+
+    Args:
+        query (str): The SQL query to execute.
+        params (dict, optional): Bind parameters for the query.
+
+    Returns:
+        List[Dict[str, Any]]: A list of dictionaries representing the query results.
+    """
+
+    return await get_backend().Execute_Query_Async(query, params)
+
+def Db_Stream_Async(query: str, batch_size: int | None = None, params=None):
+
+    """
+    Streams the results of a SQL query in batches without blocking the event loop.
+
+    Args:
+        query (str): The SQL query to execute.
+        batch_size (int, optional): Rows per batch. Defaults to `settings.DB_FETCH_BATCH_SIZE`.
+        params (dict, optional): Bind parameters for the query.
+
+    Returns:
+        AsyncIterator[tuple[list[str], list[tuple]]]: The column names and row batches.
+    """
+
+    return get_backend().Fetch_Batches_Async(query, batch_size, params)
+
+async def Db_Page_Async(query: str, limit: int, params=None) -> tuple[list[dict], bool]:
+
+    """
+    Returns the page of a paged SQL query without blocking the event loop.
+
+    Args:
+        query (str): The SQL query, paged to `limit + 1` rows (see `QueryGuard.paginate`).
+        limit (int): Maximum number of rows in the page.
+        params (dict, optional): Bind parameters for the query.
+
+    Returns:
+        tuple[list[dict], bool]: The page rows and whether more rows are available.
+    """
+
+    return await get_backend().Execute_Page_Async(query, limit, params)
+
+async def Db_Explain_Async(query: str) -> tuple[float | None, float | None]:
+
+    """
+    Returns the optimizer's cost and row count estimates for a SQL query.
+
+    Args:
+        query (str): The SQL query to estimate.
+
+    Returns:
+        tuple[float | None, float | None]: The estimated cost and row count; None where the backend has no estimate.
+    """
+
+    return await get_backend().Explain_Query_Async(query)
@@ -0,0 +1,491 @@
+"""
+Base class shared by every database backend.
+
+`DatabaseBackend` implements query execution, batched fetching, page fetching, row
+conversion, error mapping and the executor that lets blocking driver calls be
+awaited.  A driver only supplies how to create its pool, acquire and release a
+connection, read its catalog and which exceptions its driver raises.  Drivers that can enforce `DB_STATEMENT_TIMEOUT_MS` or report plan
+estimates override `_is_timeout` and `_explain`.
+
+Every checkout goes through a `PoolManager`, which adapts the number of
+connections in use to the observed waits and turns long waits into 503s.
+Drivers whose pool can change size override `_resize_pool` so that the pool
+follows the manager's limit.
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from src.db.pool_manager import PoolManager
+from src.utils.config import settings
+from src.utils.logger import get_logger
+from src.utils.metrics import stage
+from src.utils.result_format import rows_to_dicts
+
+logger=get_logger(__name__)
+
+class DatabaseBackend(ABC):
+
+    """
+    Connection pooling and query execution common to all database drivers.
+
+    Subclasses set `name` and `database_errors` and implement the abstract methods
+    `_create_pool`, `_acquire`, `_release`, `_close` and `_read_catalog`;
+    a backend missing one of them fails when it is created.
+
+    Attributes:
+        name (str): The registered backend name, e.g. "oracle".
+        dialect (str | None): sqlglot dialect generated SQL is transpiled to.
+        database_errors (tuple[type[Exception], ...]): Driver errors reported as 400s.
+        bind_placeholder (str): Format string of a named bind variable in the driver's paramstyle.
+        padded_char_types (tuple[str, ...]): Column types compared with blank-padding semantics,
+            whose literals must not be replaced by bind variables.
+        max_connections (int): Pool size; the executor gets one worker per connection.
+        fetch_batch_size (int): Default rows per `fetchmany` call.
+        statement_timeout_ms (int): Per-statement timeout in milliseconds; 0 disables it.
+        executor (ThreadPoolExecutor): Runs blocking driver calls off the event loop.
+        fetch_executor (ThreadPoolExecutor): Fetches the follow-up batches of open streams.
+        pool_manager (PoolManager): Adaptive limit on concurrently checked-out connections.
+    """
+
+    name = "base"
+    dialect: str | None = None
+    database_errors: tuple = ()
+    bind_placeholder = ":{}"
+    padded_char_types: tuple[str, ...] = ()
+
+    def __init__(self):
+
+        """
+        Creates the executor and the driver's connection pool.
+
+        Raises:
+            HTTPException:
+                - 500 Internal Server Error: If the connection pool cannot be created.
+        """
+
+        self.max_connections = settings.DB_MAX_CONNECTIONS
+        self.fetch_batch_size = settings.DB_FETCH_BATCH_SIZE
+        self.statement_timeout_ms = settings.DB_STATEMENT_TIMEOUT_MS
+        self.executor = ThreadPoolExecutor(
+            max_workers = self.max_connections,
+            thread_name_prefix = f"{self.name}-query"
+        )
+        # An open stream holds its connection between batches.  If its next batch had to
+        # queue behind executor threads blocked waiting for a connection, it could never
+        # release it; batches after the first therefore never share threads with checkouts.
+        self.fetch_executor = ThreadPoolExecutor(
+            max_workers = self.max_connections,
+            thread_name_prefix = f"{self.name}-fetch"
+        )
+        self.pool_manager = PoolManager(
+            min_size = settings.DB_MIN_CONNECTIONS,
+            max_size = self.max_connections,
+            increment = settings.DB_CONNECTION_INCREMENT,
+            wait_timeout = settings.DB_POOL_WAIT_TIMEOUT_SECONDS,
+            target_wait = settings.DB_POOL_TARGET_WAIT_SECONDS,
+            adaptive = settings.DB_POOL_ADAPTIVE
+        )
+        self.pool = None
+        try:
+            self.pool = self._create_pool()
+            self.pool_manager.on_resize = self._resize_pool
+            logger.info(f"Database connection pool initialized successfully ({self.name}).")
+
+        except self.database_errors as e:
+            logger.error(f"Database connection error: {e}")
+            self.executor.shutdown(wait=False)
+            self.fetch_executor.shutdown(wait=False)
+            raise HTTPException(status_code=500, detail=f"Unable to establish database connection.")
+
+    @abstractmethod
+    def _create_pool(self):
+        """Creates and returns the driver's connection pool."""
+
+    @abstractmethod
+    def _acquire(self):
+        """Checks a connection out of the driver's pool."""
+
+    @abstractmethod
+    def _release(self, connection) -> None:
+        """Returns a connection to the driver's pool."""
+
+    @abstractmethod
+    def _close(self) -> None:
+        """Closes the driver's pool and its connections."""
+
+    @abstractmethod
+    def _read_catalog(self, cursor) -> list:
+
+        """
+        Reads table, column, primary key and foreign key definitions from the catalog.
+
+        Args:
+            cursor: An open cursor on a pooled connection.
+
+        Returns:
+            list[TableSchema]: The tables visible to the service.
+        """
+
+    def _resize_pool(self, limit: int) -> None:
+
+        """
+        Resizes the driver's pool to the `PoolManager`'s new limit.
+
+        The default keeps the pool at the size it was created with, which is only
+        correct for drivers whose pool cannot change size.
+
+        Args:
+            limit (int): The number of connections that may now be checked out.
+        """
+
+    def _explain(self, cursor, sql_query: str) -> tuple[float | None, float | None]:
+
+        """
+        Asks the optimizer for its estimates without running the query.
+
+        Args:
+            cursor: An open cursor on a pooled connection.
+            sql_query (str): The SQL query to estimate.
+
+        Returns:
+            tuple[float | None, float | None]: The estimated cost and row count; None where the driver has no estimate.
+        """
+
+        return None, None
+
+    def _is_timeout(self, error: Exception) -> bool:
+        """True if a driver error means the statement timeout was exceeded."""
+        return False
+
+    def _is_unavailable(self, error: Exception) -> bool:
+        """True if a driver error means the database or the pool is temporarily unreachable."""
+        return False
+
+    def _checkout(self):
+        self.pool_manager.acquire()
+        try:
+            return self._acquire()
+        except BaseException:
+            self.pool_manager.release()
+            raise
+
+    def _checkin(self, connection) -> None:
+        try:
+            self._release(connection)
+        finally:
+            self.pool_manager.release()
+
+    def _database_error(self, error: Exception) -> HTTPException:
+        if self._is_unavailable(error):
+            logger.error(f"Database unavailable: {error}")
+            return HTTPException(status_code=503, detail="Database connection unavailable. Please retry.")
+        if self._is_timeout(error):
+            logger.error(f"Query cancelled after the {self.statement_timeout_ms} ms statement timeout: {error}")
+            return HTTPException(status_code=504, detail=f"Query exceeded the {self.statement_timeout_ms} ms statement timeout")
+        logger.error(f"Database error during query execution: {error}")
+        return HTTPException(status_code=400, detail=f"Error executing the query")
+
+    def pool_usage(self) -> tuple[int, int] | None:
+
+        """
+        Reports how many pooled connections are open and how many are checked out.
+
+        Returns:
+            tuple[int, int] | None: `(open, busy)`, or None if the driver cannot tell.
+        """
+
+        return None
+
+    def _execute(self, cursor, sql_query: str, params: dict | None) -> None:
+        if params:
+            cursor.execute(sql_query, params)
+        else:
+            cursor.execute(sql_query)
+
+    def _run(self, sql_query: str, params: dict | None, consume, arraysize: int | None = None):
+
+        """
+        Acquires a connection, executes the query and hands the cursor to `consume`.
+
+        Centralizes the error mapping and connection release used by every
+        execution path.
+
+        Raises:
+            HTTPException:
+                - 400 Bad Request: If the driver reports an error executing the query.
+                - 503 Service Unavailable: If no connection could be obtained in time or the connection was lost.
+                - 504 Gateway Timeout: If the query exceeds the statement timeout.
+                - 500 Internal Server Error: If an unexpected error occurs during query execution.
+        """
+
+        connection = None
+        try:
+            with stage("db_acquire"):
+                connection = self._checkout()
+            cursor = connection.cursor()
+            try:
+                cursor.arraysize = arraysize or self.fetch_batch_size
+                with stage("db_execute"):
+                    self._execute(cursor, sql_query, params)
+                with stage("db_fetch"):
+                    return consume(cursor)
+            finally:
+                cursor.close()
+
+        except self.database_errors as e:
+            raise self._database_error(e)
+
+        except HTTPException:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Unexpected error while executing query: {sql_query}")
+            raise HTTPException(status_code=500, detail="Internal server error during query execution.")
+
+        finally:
+            if connection is not None:
+                self._checkin(connection)
+                logger.debug("Database connection released back to pool.")
+
+    def Execute_Query(self, sql_query: str, params: dict | None = None) -> list[dict]:
+
+        """
+        Executes an SQL query and returns all rows as dictionaries keyed by column name.
+
+        Args:
+            sql_query (str): The SQL query to execute.
+            params (dict, optional): Bind parameters for the query.
+
+        Returns:
+            List[Dict[str, Any]]: The query results; an empty list if the query returns no data.
+
+        Raises:
+            HTTPException:
+                - 400 Bad Request: If there is an error executing the query.
+                - 503 Service Unavailable: If no connection could be obtained in time or the connection was lost.
+                - 504 Gateway Timeout: If the query exceeds the statement timeout.
+                - 500 Internal Server Error: If an unexpected error occurs during query execution.
+        """
+
+        def consume(cursor):
+            columns = [col[0] for col in cursor.description]
+            return rows_to_dicts(columns, cursor.fetchall())
+
+        results = self._run(sql_query, params, consume)
+        if not results:
+            logger.info(f"Query returned no results: {sql_query}")
+        else:
+            logger.debug(f"Query executed successfully and returned {len(results)} rows.")
+        return results
+
+    def Fetch_Batches(self, sql_query: str, batch_size: int | None = None, params: dict | None = None):
+
+        """
+        Executes an SQL query and yields its rows in batches.
+
+        The cursor's `arraysize` is set to the batch size so each `fetchmany` call
+        maps to one network round trip, and only one batch is held in memory at a
+        time.  The connection is released when the generator is exhausted or closed.
+
+        Args:
+            sql_query (str): The SQL query to execute.
+            batch_size (int, optional): Rows per batch. Defaults to `settings.DB_FETCH_BATCH_SIZE`.
+            params (dict, optional): Bind parameters for the query.
+
+        Yields:
+            tuple[list[str], list[tuple]]: The column names and the next batch of row tuples.
+
+        Raises:
+            HTTPException:
+                - 400 Bad Request: If there is an error executing the query.
+                - 503 Service Unavailable: If no connection could be obtained in time or the connection was lost.
+                - 504 Gateway Timeout: If the query exceeds the statement timeout.
+                - 500 Internal Server Error: If an unexpected error occurs during query execution.
+        """
+
+        batch_size = batch_size or self.fetch_batch_size
+        connection = None
+        cursor = None
+        try:
+            with stage("db_acquire"):
+                connection = self._checkout()
+            cursor = connection.cursor()
+            cursor.arraysize = batch_size
+            with stage("db_execute"):
+                self._execute(cursor, sql_query, params)
+            columns = [col[0] for col in cursor.description]
+            while True:
+                with stage("db_fetch"):
+                    rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield columns, rows
+
+        except self.database_errors as e:
+            raise self._database_error(e)
+
+        except HTTPException:
+            raise
+
+        except Exception as e:
+            logger.exception(f"Unexpected error while executing query: {sql_query}")
+            raise HTTPException(status_code=500, detail="Internal server error during query execution.")
+
+        finally:
+            if cursor is not None:
+                cursor.close()
+            if connection is not None:
+                self._checkin(connection)
+                logger.debug("Database connection released back to pool.")
+
+    def Execute_Page(self, sql_query: str, limit: int, params: dict | None = None) -> tuple[list[dict], bool]:
+
+        """
+        Executes a paged SQL query and returns its page of results.
+
+        The query carries its own OFFSET and row limit (see `QueryGuard.paginate`) and
+        must ask for one row more than `limit`, which tells whether another page follows.
+        Pages are only consistent with each other if the query orders its rows
+        completely (see `QueryGuard.order_rows`).
+
+        Args:
+            sql_query (str): The paged SQL query to execute.
+            limit (int): Maximum number of rows in the page.
+            params (dict, optional): Bind parameters for the query.
+
+        Returns:
+            tuple[list[dict], bool]: The page rows and whether more rows are available.
+        """
+
+        def consume(cursor):
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchmany(limit + 1)
+            return rows_to_dicts(columns, rows[:limit]), len(rows) > limit
+
+        return self._run(sql_query, params, consume, arraysize=limit + 1)
+
+    def Fetch_Schema(self) -> list:
+
+        """
+        Introspects the database catalog.
+
+        Returns:
+            list[TableSchema]: The tables visible to the service, with columns and keys.
+
+        Raises:
+            HTTPException:
+                - 500 Internal Server Error: If the catalog cannot be read.
+        """
+
+        connection = None
+        try:
+            connection = self._checkout()
+            cursor = connection.cursor()
+            try:
+                return self._read_catalog(cursor)
+            finally:
+                cursor.close()
+
+        except self.database_errors as e:
+            logger.error(f"Database error while reading the schema catalog: {e}")
+            raise HTTPException(status_code=500, detail="Schema metadata retrieval failed.")
+
+        finally:
+            if connection is not None:
+                self._checkin(connection)
+
+    def Explain_Query(self, sql_query: str) -> tuple[float | None, float | None]:
+
+        """
+        Returns the optimizer's cost and cardinality estimates for a query.
+
+        Args:
+            sql_query (str): The SQL query to estimate.
+
+        Returns:
+            tuple[float | None, float | None]: The estimated cost and row count; None where unavailable.
+
+        Raises:
+            HTTPException:
+                - 400 Bad Request: If the query cannot be explained.
+        """
+
+        connection = None
+        try:
+            connection = self._checkout()
+            cursor = connection.cursor()
+            try:
+                return self._explain(cursor, sql_query)
+            finally:
+                cursor.close()
+
+        except self.database_errors as e:
+            logger.warning(f"Unable to explain the query: {e}")
+            raise HTTPException(status_code=400, detail="Unable to estimate the query cost.")
+
+        finally:
+            if connection is not None:
+                self._checkin(connection)
+
+    async def Explain_Query_Async(self, sql_query: str) -> tuple[float | None, float | None]:
+        """Runs `Explain_Query` on the executor sized to the connection pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.Explain_Query, sql_query)
+
+    async def Execute_Query_Async(self, sql_query: str, params: dict | None = None) -> list[dict]:
+        """Runs `Execute_Query` on the executor sized to the connection pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.Execute_Query, sql_query, params)
+
+    async def Execute_Page_Async(self, sql_query: str, limit: int, params: dict | None = None) -> tuple[list[dict], bool]:
+        """Runs `Execute_Page` on the executor sized to the connection pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self.Execute_Page, sql_query, limit, params)
+
+    async def Fetch_Batches_Async(self, sql_query: str, batch_size: int | None = None, params: dict | None = None):
+
+        """
+        Asynchronous counterpart of `Fetch_Batches`.
+
+        The first batch, which checks out the connection and executes the query, runs
+        on `executor`; the following batches only fetch from the open cursor and run on
+        `fetch_executor`, so a stream can always advance and release its connection.
+
+        Args:
+            sql_query (str): The SQL query to execute.
+            batch_size (int, optional): Rows per batch. Defaults to `settings.DB_FETCH_BATCH_SIZE`.
+            params (dict, optional): Bind parameters for the query.
+
+        Yields:
+            tuple[list[str], list[tuple]]: The column names and the next batch of row tuples.
+        """
+
+        loop = asyncio.get_running_loop()
+        batches = self.Fetch_Batches(sql_query, batch_size, params)
+        executor = self.executor
+        try:
+            while True:
+                batch = await loop.run_in_executor(executor, next, batches, None)
+                if batch is None:
+                    break
+                executor = self.fetch_executor
+                yield batch
+        finally:
+            await loop.run_in_executor(self.fetch_executor, batches.close)
+
+    def close_pool(self) -> None:
+
+        """
+        Closes the connection pool and the executors.
+
+        Ensures that all database connections are properly closed and releases resources.
+        """
+
+        self.executor.shutdown(wait=True)
+        self.fetch_executor.shutdown(wait=True)
+        if self.pool is not None:
+            self._close()
+            self.pool = None
+            logger.info("Database connection pool closed.")
@@ -0,0 +1,163 @@
+"""
+MySQL database backend built on `mysql.connector`.
+
+Connections are kept in a `QueuePool` rather than a `MySQLConnectionPool`, which
+opens all of its connections up front, cannot be resized and has no public way
+to close them.  The pool therefore opens connections as the `PoolManager`'s
+adaptive limit grows and closes them as it shrinks.  Each checkout pings its
+connection and reconnects one the server dropped; each check-in resets the
+session, as `MySQLConnectionPool` did.
+"""
+
+import json
+import os
+import re
+import mysql.connector
+from src.db.base import DatabaseBackend
+from src.db.queue_pool import QueuePool
+from src.schema_details import tables_from_catalog
+from src.utils.config import settings
+from src.utils.logger import get_logger
+
+logger=get_logger(__name__)
+
+_COLUMNS_SQL = """
+    SELECT table_name, column_name, column_type
+    FROM information_schema.columns
+    WHERE table_schema = DATABASE()
+    ORDER BY table_name, ordinal_position
+"""
+
+_KEYS_SQL = """
+    SELECT constraint_name, table_name, column_name, referenced_table_name, referenced_column_name
+    FROM information_schema.key_column_usage
+    WHERE table_schema = DATABASE()
+      AND (constraint_name = 'PRIMARY' OR referenced_table_name IS NOT NULL)
+    ORDER BY table_name, ordinal_position
+"""
+
+# Settings of the MySQL-only setup, still read by src.utils.config as fallbacks.
+_LEGACY_SETTINGS = {
+    "HOST_NAME": "DB_HOST",
+    "USER_NAME": "DB_USER",
+    "PASSWORD": "DB_PASS",
+    "DATABASE_NAME": "DB_NAME",
+    "POOL_SIZE": "DB_MAX_CONNECTIONS",
+}
+
+# ER_QUERY_TIMEOUT: the max_execution_time limit was exceeded.
+_QUERY_TIMEOUT_ERRNO = 3024
+
+# CR_CONN_HOST_ERROR, CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED.
+_UNAVAILABLE_ERRNOS = (2003, 2006, 2013, 2055)
+
+def _max_estimate(node, key: str) -> float | None:
+    """Returns the largest numeric value stored under `key` anywhere in an EXPLAIN FORMAT=JSON document."""
+    found = None
+    if isinstance(node, dict):
+        for name, value in node.items():
+            candidate = float(value) if name == key and isinstance(value, (int, float, str)) else _max_estimate(value, key)
+            if candidate is not None and (found is None or candidate > found):
+                found = candidate
+    elif isinstance(node, list):
+        for value in node:
+            candidate = _max_estimate(value, key)
+            if candidate is not None and (found is None or candidate > found):
+                found = candidate
+    return found
+
+class MySQLBackend(DatabaseBackend):
+
+    """Executes queries on MySQL through a pool of `mysql.connector` connections."""
+
+    name = "mysql"
+    dialect = "mysql"
+    database_errors = (mysql.connector.Error,)
+    bind_placeholder = "%({})s"
+
+    def _create_pool(self):
+        for legacy, current in _LEGACY_SETTINGS.items():
+            if os.getenv(legacy) and not os.getenv(current):
+                logger.warning(f"{legacy} is deprecated; set {current} instead.")
+        pool = QueuePool(self._connect, self.pool_manager.limit, settings.DB_CONNECT_TIMEOUT)
+        pool.release(pool.acquire())
+        return pool
+
+    def _connect(self):
+        return mysql.connector.connect(
+            host = settings.DB_HOST,
+            port = int(settings.DB_PORT or 3306),
+            user = settings.DB_USER,
+            password = settings.DB_PASS,
+            database = settings.DB_NAME,
+            connect_timeout = settings.DB_CONNECT_TIMEOUT,
+        )
+
+    def _acquire(self):
+        connection = self.pool.acquire()
+        try:
+            if not connection.is_connected():
+                connection.reconnect()
+            if self.statement_timeout_ms:
+                # Check-in resets session variables, so the limit is set per checkout.
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(f"SET SESSION max_execution_time = {int(self.statement_timeout_ms)}")
+                finally:
+                    cursor.close()
+        except BaseException:
+            # Keep the connection pooled; the next checkout tries to reconnect it again.
+            self.pool.release(connection)
+            raise
+        return connection
+
+    def _release(self, connection) -> None:
+        # Always hand the connection back: dropping one that fails to reset would
+        # shrink the pool for good.  A dropped connection is reconnected on its next checkout.
+        try:
+            connection.consume_results()
+            connection.reset_session()
+        except mysql.connector.Error as e:
+            logger.warning(f"Error resetting a MySQL connection before returning it to the pool: {e}")
+        self.pool.release(connection)
+
+    def _close(self) -> None:
+        self.pool.close()
+
+    def _resize_pool(self, limit: int) -> None:
+        self.pool.resize(limit)
+
+    def _execute(self, cursor, sql_query: str, params: dict | None) -> None:
+        if params:
+            # Parameters are pyformat placeholders, so literal '%' in the query must be doubled.
+            sql_query = re.sub(r"%(?!\()", "%%", sql_query)
+        super()._execute(cursor, sql_query, params)
+
+    def pool_usage(self) -> tuple[int, int] | None:
+        return self.pool.usage()
+
+    def _is_timeout(self, error: Exception) -> bool:
+        return getattr(error, "errno", None) == _QUERY_TIMEOUT_ERRNO
+
+    def _is_unavailable(self, error: Exception) -> bool:
+        return getattr(error, "errno", None) in _UNAVAILABLE_ERRNOS
+
+    def _explain(self, cursor, sql_query: str) -> tuple[float | None, float | None]:
+        cursor.execute(f"EXPLAIN FORMAT=JSON {sql_query}")
+        row = cursor.fetchone()
+        if not row:
+            return None, None
+        plan = json.loads(row[0])
+        return _max_estimate(plan, "query_cost"), _max_estimate(plan, "rows_produced_per_join")
+
+    def _read_catalog(self, cursor) -> list:
+        cursor.execute(_COLUMNS_SQL)
+        columns = [(table, column, column_type.upper()) for table, column, column_type in cursor.fetchall()]
+        cursor.execute(_KEYS_SQL)
+        primary_keys, foreign_keys = [], []
+        for constraint_name, table, column, referenced_table, referenced_column in cursor.fetchall():
+            if constraint_name == "PRIMARY":
+                primary_keys.append((table, column))
+            else:
+                foreign_keys.append((table, column, referenced_table, referenced_column))
+        return tables_from_catalog(columns, primary_keys, foreign_keys)
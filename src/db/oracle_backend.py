@@ -0,0 +1,129 @@
+"""
+Oracle database backend built on `oracledb` connection pooling.
+
+The pool waits at most `DB_POOL_WAIT_TIMEOUT_SECONDS` for a connection, pings
+connections that have been idle for `DB_POOL_PING_INTERVAL_SECONDS` before handing
+them out (so connections killed by a failover are replaced instead of failing the
+query), closes connections idle for `DB_POOL_IDLE_TIMEOUT_SECONDS` beyond the
+minimum and keeps a statement cache of `DB_STMT_CACHE_SIZE` per connection.
+Its maximum follows the `PoolManager` limit through `reconfigure`.
+"""
+
+import uuid
+import oracledb
+from src.db.base import DatabaseBackend
+from src.schema_details import tables_from_catalog
+from src.utils.config import settings
+
+_COLUMNS_SQL = """
+    SELECT table_name, column_name, data_type, data_length, data_precision, data_scale
+    FROM all_tab_columns
+    WHERE owner = :owner
+    ORDER BY table_name, column_id
+"""
+
+_CONSTRAINTS_SQL = """
+    SELECT c.constraint_type, cc.table_name, cc.column_name, rc.table_name, rc.column_name
+    FROM all_constraints c
+    JOIN all_cons_columns cc
+      ON cc.owner = c.owner AND cc.constraint_name = c.constraint_name
+    LEFT JOIN all_cons_columns rc
+      ON rc.owner = c.r_owner AND rc.constraint_name = c.r_constraint_name AND rc.position = cc.position
+    WHERE c.owner = :owner AND c.constraint_type IN ('P', 'R')
+    ORDER BY cc.table_name, cc.position
+"""
+
+_PLAN_SQL = """
+    SELECT cost, cardinality
+    FROM plan_table
+    WHERE statement_id = :statement_id AND id = 0
+"""
+
+# DPI-1067 (thick mode) and DPY-4024 (thin mode): call timeout exceeded.
+_TIMEOUT_CODES = ("DPI-1067", "DPY-4024")
+
+# Pool wait timeouts, refused connections and connections lost mid-call.
+_UNAVAILABLE_CODES = (
+    "DPY-4005", "ORA-24457", "DPY-6005", "DPY-4011", "DPI-1080",
+    "ORA-03113", "ORA-03114", "ORA-03135", "ORA-12514", "ORA-12541",
+)
+
+def _column_type(data_type: str, length, precision, scale) -> str:
+    if data_type == "NUMBER" and precision is not None:
+        return f"NUMBER({precision},{scale})" if scale else f"NUMBER({precision})"
+    if data_type in ("VARCHAR2", "NVARCHAR2", "CHAR", "NCHAR", "RAW"):
+        return f"{data_type}({length})"
+    return data_type
+
+class OracleBackend(DatabaseBackend):
+
+    """Executes queries on Oracle through an `oracledb` connection pool."""
+
+    name = "oracle"
+    dialect = "oracle"
+    database_errors = (oracledb.DatabaseError,)
+    # A CHAR column equals a blank-padded literal but not a bound VARCHAR2 without the padding.
+    padded_char_types = ("CHAR", "NCHAR")
+
+    def _create_pool(self):
+        return oracledb.create_pool(
+            user = settings.DB_USER,
+            password = settings.DB_PASS,
+            dsn = f"{settings.DB_HOST}:{settings.DB_PORT or '1521'}/{settings.DB_SERVICE_NAME}",
+            min = self.pool_manager.min_size,
+            max = self.pool_manager.limit,
+            increment = settings.DB_CONNECTION_INCREMENT,
+            getmode = oracledb.POOL_GETMODE_TIMEDWAIT,
+            wait_timeout = int(settings.DB_POOL_WAIT_TIMEOUT_SECONDS * 1000),
+            ping_interval = settings.DB_POOL_PING_INTERVAL_SECONDS,
+            timeout = settings.DB_POOL_IDLE_TIMEOUT_SECONDS,
+            stmtcachesize = settings.DB_STMT_CACHE_SIZE
+        )
+
+    def _acquire(self):
+        connection = self.pool.acquire()
+        # Bounds every round trip on the connection; a timed-out call is cancelled by the server.
+        connection.call_timeout = self.statement_timeout_ms
+        return connection
+
+    def _release(self, connection) -> None:
+        connection.close()
+
+    def _close(self) -> None:
+        self.pool.close()
+
+    def _resize_pool(self, limit: int) -> None:
+        self.pool.reconfigure(min=self.pool_manager.min_size, max=limit)
+
+    def pool_usage(self) -> tuple[int, int] | None:
+        return self.pool.opened, self.pool.busy
+
+    def _is_timeout(self, error: Exception) -> bool:
+        return bool(error.args) and getattr(error.args[0], "full_code", None) in _TIMEOUT_CODES
+
+    def _is_unavailable(self, error: Exception) -> bool:
+        return bool(error.args) and getattr(error.args[0], "full_code", None) in _UNAVAILABLE_CODES
+
+    def _explain(self, cursor, sql_query: str) -> tuple[float | None, float | None]:
+        statement_id = f"nl2sql_{uuid.uuid4().hex[:20]}"
+        cursor.execute(f"EXPLAIN PLAN SET STATEMENT_ID = '{statement_id}' FOR {sql_query}")
+        try:
+            cursor.execute(_PLAN_SQL, statement_id=statement_id)
+            row = cursor.fetchone()
+        finally:
+            cursor.execute("DELETE FROM plan_table WHERE statement_id = :statement_id", statement_id=statement_id)
+            cursor.connection.commit()
+        return (row[0], row[1]) if row else (None, None)
+
+    def _read_catalog(self, cursor) -> list:
+        owner = (settings.SCHEMA_OWNER or settings.DB_USER or "").upper()
+        cursor.execute(_COLUMNS_SQL, owner=owner)
+        columns = [(table, column, _column_type(*details)) for table, column, *details in cursor.fetchall()]
+        cursor.execute(_CONSTRAINTS_SQL, owner=owner)
+        primary_keys, foreign_keys = [], []
+        for constraint_type, table, column, referenced_table, referenced_column in cursor.fetchall():
+            if constraint_type == "P":
+                primary_keys.append((table, column))
+            elif referenced_table:
+                foreign_keys.append((table, column, referenced_table, referenced_column))
+        return tables_from_catalog(columns, primary_keys, foreign_keys)
@@ -0,0 +1,186 @@
+"""
+Adaptive limit on concurrently checked-out database connections.
+
+A fixed pool size is either too small for bursts (requests queue silently behind
+it) or larger than the database needs most of the time.  `PoolManager` sits in
+front of every driver's pool and decides how many connections may be checked out
+at once, between `DB_MIN_CONNECTIONS` and `DB_MAX_CONNECTIONS`:
+
+    - Wait: a caller that finds every allowed connection in use waits for one to
+      be released, even when the limit is below the maximum.
+    - Grow: a caller that has waited `target_wait` seconds raises the limit by
+      `increment`, so the limit follows sustained queueing rather than momentary
+      bursts.
+    - Shrink: every `resize_interval` seconds, if peak usage stayed below the limit
+      and no checkout waited longer than `target_wait`, the limit shrinks by one.
+    - Fail fast: a caller that cannot get a connection within `wait_timeout`
+      seconds gets a 503 instead of queueing indefinitely.
+
+Every change of the limit is passed to `on_resize`, which the backends use to
+resize the driver's pool, so growing opens connections and shrinking closes them.
+
+Wait times are recorded in the `db_pool_wait` stage histogram, and `stats()`
+reports the current limit, usage and cumulative wait statistics.
+
+Classes:
+    - PoolManager: Adaptive checkout limit with bounded waits.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable
+from fastapi import HTTPException
+from src.utils.logger import get_logger
+from src.utils.metrics import STAGE_SECONDS
+
+logger=get_logger(__name__)
+
+class PoolManager:
+
+    """
+    Bounds and adapts the number of concurrently checked-out connections.
+
+    Attributes:
+        min_size (int): Lowest limit.
+        max_size (int): Highest limit; the driver pool must allow this many connections.
+        increment (int): Connections added per growth step.
+        wait_timeout (float): Seconds a caller may wait before a 503.
+        target_wait (float): Checkout wait after which the limit grows; an interval whose
+            longest wait stayed below it allows shrinking.
+        adaptive (bool): False pins the limit to `max_size`.
+        limit (int): Current number of connections that may be checked out.
+        on_resize (Callable[[int], None] | None): Called with the new limit whenever it changes,
+            while the manager's lock is held so that resizes apply in order.
+    """
+
+    def __init__(self, min_size: int, max_size: int, increment: int = 1, wait_timeout: float = 2.0,
+                 target_wait: float = 0.01, adaptive: bool = True):
+        self.min_size = max(1, min(min_size, max_size))
+        self.max_size = max_size
+        self.increment = max(1, increment)
+        self.wait_timeout = wait_timeout
+        self.target_wait = target_wait
+        self.adaptive = adaptive
+        self.limit = self.min_size if adaptive else max_size
+        self.on_resize: Callable[[int], None] | None = None
+        self.in_use = 0
+        self.waiting = 0
+        self._condition = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.timeouts = 0
+        self.grown = 0
+        self.shrunk = 0
+        self._window_peak = 0
+        self._window_max_wait = 0.0
+
+    def acquire(self) -> None:
+
+        """
+        Waits for a checkout slot.
+
+        Raises:
+            HTTPException:
+                - 503 Service Unavailable: If no slot frees up within `wait_timeout`.
+        """
+
+        started = time.monotonic()
+        waited = 0.0
+        with self._condition:
+            if self.in_use >= self.limit:
+                self.waiting += 1
+                try:
+                    self._wait_for_slot(started)
+                finally:
+                    self.waiting -= 1
+                waited = time.monotonic() - started
+                self.waits += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+                self._window_max_wait = max(self._window_max_wait, waited)
+            self.in_use += 1
+            self.checkouts += 1
+            self._window_peak = max(self._window_peak, self.in_use)
+        STAGE_SECONDS.observe(("db_pool_wait",), waited)
+
+    def _wait_for_slot(self, started: float) -> None:
+        deadline = started + self.wait_timeout
+        grow_at = started + self.target_wait
+        while self.in_use >= self.limit:
+            now = time.monotonic()
+            can_grow = self.adaptive and self.limit < self.max_size
+            if can_grow and now >= grow_at:
+                if self._resize(min(self.max_size, self.limit + self.increment)):
+                    self.grown += 1
+                    logger.info(f"Database connection limit raised to {self.limit} ({self.waiting} waiting).")
+                    self._condition.notify_all()
+                    continue
+                grow_at = deadline
+            remaining = deadline - now
+            if remaining <= 0:
+                self.timeouts += 1
+                logger.warning(f"Timed out after {self.wait_timeout:.2f}s waiting for a database connection "
+                               f"({self.in_use}/{self.limit} in use, {self.waiting} waiting).")
+                raise HTTPException(status_code=503, detail="No database connection available. Please retry.")
+            self._condition.wait(min(remaining, grow_at - now) if can_grow else remaining)
+
+    def _resize(self, limit: int) -> bool:
+        if self.on_resize is not None:
+            try:
+                self.on_resize(limit)
+            except Exception as e:
+                logger.error(f"Unable to resize the database connection pool to {limit}: {e}")
+                return False
+        self.limit = limit
+        return True
+
+    def release(self) -> None:
+        """Frees a checkout slot."""
+        with self._condition:
+            self.in_use -= 1
+            self._condition.notify()
+
+    def adjust(self) -> int:
+
+        """
+        Shrinks the limit by one if the last interval did not need it.
+
+        Returns:
+            int: The limit after the adjustment.
+        """
+
+        with self._condition:
+            if (self.adaptive and self.limit > self.min_size and self._window_peak < self.limit
+                    and self._window_max_wait < self.target_wait and self._resize(self.limit - 1)):
+                self.shrunk += 1
+                logger.debug(f"Database connection limit lowered to {self.limit}.")
+            self._window_peak = self.in_use
+            self._window_max_wait = 0.0
+            return self.limit
+
+    async def run(self, resize_interval: float) -> None:
+        """Calls `adjust` every `resize_interval` seconds until cancelled, off the event loop."""
+        while True:
+            await asyncio.sleep(resize_interval)
+            await asyncio.to_thread(self.adjust)
+
+    def stats(self) -> dict:
+        """Returns the current limit and usage together with the cumulative wait statistics."""
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "in_use": self.in_use,
+                "waiting": self.waiting,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "wait_seconds_max": round(self.max_wait_seconds, 6),
+                "timeouts": self.timeouts,
+                "grown": self.grown,
+                "shrunk": self.shrunk,
+            }
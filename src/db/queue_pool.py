@@ -0,0 +1,94 @@
+"""
+Bounded connection pool for drivers without a suitable pool of their own.
+
+`sqlite3` has no pool at all, and `mysql.connector`'s `MySQLConnectionPool` opens
+every connection up front, cannot change size and can only be closed through its
+private methods.  `QueuePool` keeps connections created by the driver's public
+`connect` call in a queue shared by the executor threads, so the backends can open
+connections on demand, follow the `PoolManager`'s limit and close them on shutdown.
+"""
+
+import queue
+import threading
+from typing import Any, Callable
+from fastapi import HTTPException
+from src.utils.logger import get_logger
+
+logger=get_logger(__name__)
+
+class QueuePool:
+
+    """
+    A minimal bounded connection pool.
+
+    Connections are opened on demand up to `max_connections` and reused afterwards;
+    callers wait up to `timeout` seconds for a free connection.  Lowering
+    `max_connections` with `resize` closes the connections beyond it.
+    """
+
+    def __init__(self, connect: Callable[[], Any], max_connections: int, timeout: float):
+        self.connect = connect
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.max_connections:
+                self._opened += 1
+                try:
+                    return self.connect()
+                except BaseException:
+                    self._opened -= 1
+                    raise
+
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise HTTPException(status_code=503, detail="No database connection available. Please retry.")
+
+    def usage(self) -> tuple[int, int]:
+        """Returns the number of open connections and how many of them are checked out."""
+        return self._opened, self._opened - self._idle.qsize()
+
+    def resize(self, max_connections: int) -> None:
+        """Changes the number of connections the pool may open, closing idle ones beyond it."""
+        with self._lock:
+            self.max_connections = max_connections
+            while self._opened > max_connections:
+                try:
+                    connection = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+                self._opened -= 1
+                _close_quietly(connection)
+
+    def release(self, connection) -> None:
+        with self._lock:
+            if self._opened > self.max_connections:
+                self._opened -= 1
+                _close_quietly(connection)
+                return
+        self._idle.put(connection)
+
+    def close(self) -> None:
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            _close_quietly(connection)
+
+def _close_quietly(connection) -> None:
+    # A connection the server already dropped may fail to close; it is discarded either way.
+    try:
+        connection.close()
+    except Exception as e:
+        logger.warning(f"Error closing a pooled database connection: {e}")
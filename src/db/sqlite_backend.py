@@ -0,0 +1,74 @@
+"""
+SQLite database backend built on the standard library `sqlite3` module.
+
+Lets the full pipeline and its benchmarks run on a laptop without an external
+database.  `sqlite3` has no pool of its own, so connections are kept in a `QueuePool`
+shared by the executor threads.  The statement timeout is enforced with a
+progress handler that interrupts the query once its deadline has passed.
+"""
+
+import sqlite3
+import time
+from src.db.base import DatabaseBackend
+from src.db.queue_pool import QueuePool
+from src.schema_details import tables_from_catalog
+from src.utils.config import settings
+
+# Number of SQLite virtual machine instructions between deadline checks.
+_PROGRESS_STEPS = 10000
+
+class SQLiteBackend(DatabaseBackend):
+
+    """Executes queries on a local SQLite database file."""
+
+    name = "sqlite"
+    dialect = "sqlite"
+    database_errors = (sqlite3.Error,)
+
+    def _create_pool(self):
+        pool = QueuePool(
+            lambda: sqlite3.connect(settings.SQLITE_PATH, timeout=settings.DB_CONNECT_TIMEOUT, check_same_thread=False),
+            self.pool_manager.limit,
+            settings.DB_CONNECT_TIMEOUT
+        )
+        pool.release(pool.acquire())
+        return pool
+
+    def _acquire(self):
+        return self.pool.acquire()
+
+    def _release(self, connection) -> None:
+        connection.set_progress_handler(None, 0)
+        self.pool.release(connection)
+
+    def _close(self) -> None:
+        self.pool.close()
+
+    def _resize_pool(self, limit: int) -> None:
+        self.pool.resize(limit)
+
+    def pool_usage(self) -> tuple[int, int] | None:
+        return self.pool.usage()
+
+    def _execute(self, cursor, sql_query: str, params: dict | None) -> None:
+        if self.statement_timeout_ms:
+            deadline = time.monotonic() + self.statement_timeout_ms / 1000
+            cursor.connection.set_progress_handler(lambda: time.monotonic() > deadline, _PROGRESS_STEPS)
+        super()._execute(cursor, sql_query, params)
+
+    def _is_timeout(self, error: Exception) -> bool:
+        return isinstance(error, sqlite3.OperationalError) and "interrupted" in str(error)
+
+    def _read_catalog(self, cursor) -> list:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+        columns, primary_keys, foreign_keys = [], [], []
+        for (table,) in cursor.fetchall():
+            cursor.execute(f'PRAGMA table_info("{table}")')
+            for _, column, column_type, _, _, pk_position in cursor.fetchall():
+                columns.append((table, column, column_type or "TEXT"))
+                if pk_position:
+                    primary_keys.append((table, column))
+            cursor.execute(f'PRAGMA foreign_key_list("{table}")')
+            for _, _, referenced_table, column, referenced_column, *_ in cursor.fetchall():
+                foreign_keys.append((table, column, referenced_table, referenced_column))
+        return tables_from_catalog(columns, primary_keys, foreign_keys)
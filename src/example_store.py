@@ -0,0 +1,264 @@
+"""
+Store of verified natural language -> SQL examples with a nearest-neighbour index.
+
+A zero-shot prompt leaves the LLM to guess the house conventions of the schema
+(which join path, which date functions, how "top" is meant) on every call.
+`ExampleStore` keeps question/SQL pairs that are known to be good, either imported
+by an administrator or recorded after the SQL ran successfully and returned rows,
+and answers two questions for a new query:
+
+    - Which stored examples are most similar?  The best few are placed in the
+      prompt as few-shot examples.
+    - Is one of them (near) identical?  Then its SQL is reused and the LLM call
+      is skipped.  As in the SQL cache, queries whose numeric literals differ, or
+      that lack a word the example's SQL uses as a value, never count as identical.
+
+Queries are compared with Jaccard similarity over the same unigram/bigram shingles
+as the SQL cache.  The inverted index counts, for every candidate sharing a
+shingle with the query, how many shingles they share, so a lookup touches only
+the postings of the query's own shingles and never the stored examples' sets.
+
+When `path` is set the store is persisted as JSON lines: every new example is
+appended and the file is rewritten compactly when it is loaded.  `add`, `discard`
+and `load` then do blocking file I/O; async callers run them in a worker thread.
+
+Classes:
+    - Example: A stored question/SQL pair.
+    - ExampleStore: Thread-safe example store with a shingle index.
+"""
+
+import heapq
+import json
+import os
+import threading
+from collections import OrderedDict
+from src.utils.logger import get_logger
+from src.utils.text_similarity import normalize_query, query_tokens, shingles, literal_tokens, value_tokens
+
+logger=get_logger(__name__)
+
+class Example:
+
+    """
+    A verified question/SQL pair.
+
+    Attributes:
+        user_query (str): The normalized natural language query.
+        sql (str): SQL that correctly answers it.
+        source (str): "import" for administrator-provided examples, "execution" for recorded ones.
+        values (frozenset[str]): Query tokens the SQL uses as values; a query reusing the SQL must contain them all.
+    """
+
+    __slots__ = ("user_query", "sql", "source", "shingles", "literals", "values")
+
+    def __init__(self, user_query: str, sql: str, source: str):
+        tokens = query_tokens(user_query)
+        self.user_query = user_query
+        self.sql = sql
+        self.source = source
+        self.shingles = shingles(tokens)
+        self.literals = literal_tokens(tokens)
+        self.values = value_tokens(user_query, sql)
+
+    def to_dict(self) -> dict:
+        return {"user_query": self.user_query, "sql": self.sql, "source": self.source}
+
+class ExampleStore:
+
+    """
+    Keeps verified examples and finds the ones most similar to a query.
+
+    Attributes:
+        path (str | None): JSON lines file the examples are persisted to; None keeps them in memory only.
+        max_entries (int): Maximum number of examples; the oldest recorded example is evicted first.
+        min_similarity (float): Minimum similarity for an example to be returned by `search`.
+        reuse_threshold (float): Minimum similarity for `match` to reuse an example's SQL.
+    """
+
+    def __init__(self, path: str | None = None, max_entries: int = 5000, min_similarity: float = 0.3,
+                 reuse_threshold: float = 0.95):
+        self.path = path
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self.reuse_threshold = reuse_threshold
+        self._examples: OrderedDict[str, Example] = OrderedDict()
+        self._index: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.reuses = 0
+        self.recorded = 0
+        self.imported = 0
+        self.evictions = 0
+
+    def load(self) -> int:
+
+        """
+        Loads the examples persisted at `path` and rewrites the file without superseded lines.
+
+        Returns:
+            int: The number of examples in the store.
+        """
+
+        if not self.path or not os.path.exists(self.path):
+            return 0
+        lines = 0
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                lines += 1
+                try:
+                    record = json.loads(line)
+                    self._insert(Example(record["user_query"], record["sql"], record.get("source", "import")))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping malformed example in {self.path}: {e}")
+        if lines > len(self._examples):
+            self._rewrite()
+        logger.info(f"Loaded {len(self._examples)} verified examples from {self.path}.")
+        return len(self._examples)
+
+    def add(self, user_query: str, sql: str, source: str = "execution") -> bool:
+
+        """
+        Stores an example, replacing an earlier example for the same query.
+
+        Args:
+            user_query (str): The natural language query.
+            sql (str): SQL verified to answer it.
+            source (str): "execution" for SQL that ran successfully, "import" for administrator-provided SQL.
+
+        Returns:
+            bool: False if the store already held exactly this example.
+        """
+
+        example = Example(normalize_query(user_query), sql.strip(), source)
+        if not example.user_query or not example.sql:
+            return False
+        with self._lock:
+            current = self._examples.get(example.user_query)
+            if current is not None and current.sql == example.sql:
+                if current.source == "execution" and source == "import":
+                    current.source = source
+                return False
+            if current is not None and current.source == "import" and source == "execution":
+                return False
+            self._insert(example)
+            if source == "import":
+                self.imported += 1
+            else:
+                self.recorded += 1
+            self._append(example)
+        return True
+
+    def search(self, user_query: str, top_k: int) -> list[tuple[Example, float]]:
+
+        """
+        Returns the stored examples most similar to a query.
+
+        Args:
+            user_query (str): The natural language query.
+            top_k (int): Maximum number of examples to return.
+
+        Returns:
+            list[tuple[Example, float]]: `(example, similarity)` pairs of at least `min_similarity`, best first.
+        """
+
+        query_shingles = shingles(query_tokens(normalize_query(user_query)))
+        overlaps: dict[str, int] = {}
+        with self._lock:
+            self.searches += 1
+            for shingle in query_shingles:
+                for key in self._index.get(shingle, ()):
+                    overlaps[key] = overlaps.get(key, 0) + 1
+            scored = []
+            for key, overlap in overlaps.items():
+                example = self._examples[key]
+                score = overlap / (len(query_shingles) + len(example.shingles) - overlap)
+                if score >= self.min_similarity:
+                    scored.append((example, score))
+        return heapq.nlargest(top_k, scored, key=lambda item: item[1])
+
+    def match(self, user_query: str, results: list[tuple[Example, float]]) -> Example | None:
+
+        """
+        Picks the search result whose SQL can be reused for the query as is.
+
+        Args:
+            user_query (str): The natural language query.
+            results (list[tuple[Example, float]]): The output of `search` for the same query.
+
+        Returns:
+            Example | None: The best example at or above `reuse_threshold` with the same numeric
+                literals and every value word of the example.
+        """
+
+        tokens = query_tokens(normalize_query(user_query))
+        literals = literal_tokens(tokens)
+        present = frozenset(tokens)
+        for example, score in results:
+            if score >= self.reuse_threshold and example.literals == literals and example.values <= present:
+                self.reuses += 1
+                return example
+        return None
+
+    def discard(self, user_query: str) -> None:
+        """Removes the example stored for a query, e.g. because its SQL no longer validates."""
+        with self._lock:
+            if self._remove(normalize_query(user_query)):
+                self._rewrite()
+
+    def stats(self) -> dict:
+        """Returns the store size and its lookup and insert counters."""
+        return {
+            "size": len(self._examples),
+            "max_entries": self.max_entries,
+            "searches": self.searches,
+            "reuses": self.reuses,
+            "recorded": self.recorded,
+            "imported": self.imported,
+            "evictions": self.evictions,
+        }
+
+    def _insert(self, example: Example) -> None:
+        self._remove(example.user_query)
+        self._examples[example.user_query] = example
+        for shingle in example.shingles:
+            self._index.setdefault(shingle, set()).add(example.user_query)
+        while len(self._examples) > self.max_entries:
+            oldest = next((key for key, stored in self._examples.items() if stored.source == "execution"),
+                          next(iter(self._examples)))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> bool:
+        example = self._examples.pop(key, None)
+        if example is None:
+            return False
+        for shingle in example.shingles:
+            bucket = self._index.get(shingle)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._index[shingle]
+        return True
+
+    def _append(self, example: Example) -> None:
+        if not self.path:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(json.dumps(example.to_dict()) + "\n")
+        except OSError as e:
+            logger.error(f"Unable to persist example to {self.path}: {e}")
+
+    def _rewrite(self) -> None:
+        if not self.path:
+            return
+        temporary = f"{self.path}.tmp"
+        try:
+            with open(temporary, "w", encoding="utf-8") as file:
+                for example in self._examples.values():
+                    file.write(json.dumps(example.to_dict()) + "\n")
+            os.replace(temporary, self.path)
+        except OSError as e:
+            logger.error(f"Unable to rewrite the example store {self.path}: {e}")
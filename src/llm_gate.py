@@ -0,0 +1,236 @@
+"""
+Concurrency budget, load shedding and retries for LLM calls.
+
+The LLM provider enforces a quota; going over it turns every request into an
+error.  `LLMGate` wraps each LLM call:
+
+    - Budget: at most `max_concurrency` calls are in flight per worker; further
+      calls wait for a slot.
+    - Backpressure: at most `max_queue` calls may wait.  A call arriving at a full
+      queue, or waiting longer than `queue_timeout` seconds, is shed with a 503
+      and a `Retry-After` header estimated from the recent call latency, instead
+      of piling up behind the quota.
+    - Retries: transient errors (quota, overload, timeouts, dropped connections)
+      are retried up to `max_retries` times with full-jitter exponential backoff
+      (a random delay between 0 and `min(retry_max, retry_base * 2**attempt)`), so
+      workers that failed together do not retry together.  When the retries are
+      used up the call fails with a 503 rather than a 500, as the request may
+      well succeed later.  The slot is kept while backing off, so retries do not
+      add load on top of the budget.
+
+Errors are classified without importing the provider SDK: by the HTTP status a
+Google API or HTTP client exception carries (`code`/`status_code`), by the
+exception class name, or by being a built-in timeout/connection error, looking
+through the exception's cause chain.  Time spent waiting for a slot is recorded
+in the `llm_queue` stage histogram.
+
+Classes:
+    - LLMGate: Concurrency budget with bounded queueing and retries.
+
+Functions:
+    - is_transient_error: Whether an LLM error is worth retrying.
+"""
+
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable
+from fastapi import HTTPException
+from src.utils.logger import get_logger
+from src.utils.metrics import STAGE_SECONDS
+
+logger=get_logger(__name__)
+
+_TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+_TRANSIENT_ERROR_NAMES = frozenset({
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "GatewayTimeout", "Aborted", "RetryError",
+    "ConnectError", "ConnectTimeout", "ReadTimeout", "WriteTimeout", "PoolTimeout", "RemoteProtocolError",
+})
+
+def is_transient_error(error: BaseException) -> bool:
+
+    """
+    Tells whether an LLM call failed for a reason that may go away on retry.
+
+    Args:
+        error (BaseException): The exception raised by the LLM call.
+
+    Returns:
+        bool: True for quota, overload, timeout and connection errors, also when wrapped by another exception.
+    """
+
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, HTTPException):
+            return False
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        if type(error).__name__ in _TRANSIENT_ERROR_NAMES:
+            return True
+        status = getattr(error, "code", None) or getattr(error, "status_code", None)
+        if isinstance(status, int) and status in _TRANSIENT_STATUS_CODES:
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+class LLMGate:
+
+    """
+    Limits concurrent LLM calls, sheds excess load and retries transient errors.
+
+    Attributes:
+        max_concurrency (int): Calls allowed in flight at once; 0 disables the budget and the queue cap.
+        max_queue (int): Calls allowed to wait for a slot.
+        queue_timeout (float): Seconds a call may wait for a slot.
+        max_retries (int): Retries after the first attempt for transient errors.
+        retry_base (float): Backoff cap for the first retry, in seconds; doubled on each retry.
+        retry_max (float): Upper bound of the backoff, in seconds.
+    """
+
+    def __init__(self, max_concurrency: int = 16, max_queue: int = 64, queue_timeout: float = 10.0,
+                 max_retries: int = 3, retry_base: float = 0.5, retry_max: float = 8.0):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        self.in_flight = 0
+        self.queued = 0
+        self.calls = 0
+        self.retries = 0
+        self.shed = 0
+        self.queue_timeouts = 0
+        self.exhausted = 0
+        self._latency = 1.0
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+
+        """
+        Runs an LLM call within the concurrency budget, retrying transient errors.
+
+        Args:
+            call (Callable): Coroutine function making one LLM call; invoked once per attempt.
+
+        Returns:
+            Any: The result of the first successful attempt.
+
+        Raises:
+            HTTPException:
+                - 503 Service Unavailable: If the queue is full, no slot freed up within
+                  `queue_timeout`, or transient errors persisted through every retry.
+            Exception: A non-transient error raised by `call`, unchanged.
+        """
+
+        await self._enter()
+        try:
+            return await self._call_with_retries(call)
+        finally:
+            self._leave()
+
+    async def _enter(self) -> None:
+        if self._semaphore is None:
+            self.in_flight += 1
+            return
+        if self.in_flight + self.queued >= self.max_concurrency + self.max_queue:
+            self.shed += 1
+            logger.debug(f"LLM queue full ({self.queued} waiting, {self.in_flight} in flight); shedding request.")
+            raise self._unavailable("The language model is at capacity. Please retry.")
+
+        started = time.perf_counter()
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except TimeoutError:
+            self.queue_timeouts += 1
+            logger.warning(f"Waited {self.queue_timeout:.1f}s for an LLM slot; shedding request.")
+            raise self._unavailable("The language model is at capacity. Please retry.")
+        finally:
+            self.queued -= 1
+            STAGE_SECONDS.observe(("llm_queue",), time.perf_counter() - started)
+        self.in_flight += 1
+
+    def _leave(self) -> None:
+        self.in_flight -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def run_sync(self, call: Callable[[], Any]) -> Any:
+
+        """
+        Blocking counterpart of `run` for synchronous callers: retries transient errors, without the budget.
+
+        Args:
+            call (Callable): Function making one LLM call; invoked once per attempt.
+
+        Returns:
+            Any: The result of the first successful attempt.
+
+        Raises:
+            HTTPException:
+                - 503 Service Unavailable: If transient errors persisted through every retry.
+            Exception: A non-transient error raised by `call`, unchanged.
+        """
+
+        attempt = 0
+        while True:
+            self.calls += 1
+            started = time.perf_counter()
+            try:
+                result = call()
+            except Exception as e:
+                time.sleep(self._backoff(e, attempt))
+                attempt += 1
+                continue
+            self._latency = 0.8 * self._latency + 0.2 * (time.perf_counter() - started)
+            return result
+
+    async def _call_with_retries(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        attempt = 0
+        while True:
+            self.calls += 1
+            started = time.perf_counter()
+            try:
+                result = await call()
+            except Exception as e:
+                await asyncio.sleep(self._backoff(e, attempt))
+                attempt += 1
+                continue
+            self._latency = 0.8 * self._latency + 0.2 * (time.perf_counter() - started)
+            return result
+
+    def _backoff(self, error: Exception, attempt: int) -> float:
+        """Returns the delay before the next attempt, or re-raises when the error is final."""
+        if not is_transient_error(error):
+            raise error
+        if attempt >= self.max_retries:
+            self.exhausted += 1
+            logger.error(f"LLM call failed after {attempt + 1} attempts: {error!r}")
+            raise self._unavailable("The language model is temporarily unavailable. Please retry.") from error
+        delay = random.uniform(0, min(self.retry_max, self.retry_base * 2 ** attempt))
+        self.retries += 1
+        logger.warning(f"Transient LLM error ({error!r}); retry {attempt + 1}/{self.max_retries} in {delay:.2f}s.")
+        return delay
+
+    def _unavailable(self, detail: str) -> HTTPException:
+        slots = max(self.max_concurrency, 1)
+        retry_after = max(1, math.ceil(self._latency * (self.queued + slots) / slots))
+        return HTTPException(status_code=503, detail=detail, headers={"Retry-After": str(retry_after)})
+
+    def stats(self) -> dict:
+        """Returns the current in-flight and queued calls together with the cumulative counters."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "calls": self.calls,
+            "retries": self.retries,
+            "shed": self.shed,
+            "queue_timeouts": self.queue_timeouts,
+            "exhausted": self.exhausted,
+        }
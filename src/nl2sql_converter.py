@@ -6,76 +6,50 @@ into executable SQL SELECT queries.  It uses Langchain for prompt management and
 interaction with the LLM. The module also includes error handling for API key issues
 and SQL generation failures.
 
+The LLM client, the LCEL chain and the schema-dependent part of the prompt are built
+once by `NL2SQLConverter` (normally in the FastAPI lifespan), so a request only has to
+append its query to the pre-rendered prompt prefix.  Importing this module is cheap:
+Langchain and the Gemini client are only imported, and the API key only checked,
+when the first converter is constructed.
+
 Modules Used:
-    - os:  For accessing environment variables (API keys).
-    - dotenv:  For loading environment variables from a .env file.
-    - google.generativeai:  The Google Gemini API client.
-    - langchain:  For prompt engineering and LLM chain management.
+    - src.utils.config:  For the Gemini API key.
+    - langchain_google_genai:  The Google Gemini chat model (imported lazily).
+    - langchain_core:  For LLM chain management (imported lazily).
     - fastapi:  For raising HTTP exceptions in case of errors.
-    - src.schema_details:  For retrieving database schema metadata.
+    - src.schema_details:  For the cached, versioned database schema metadata.
+    - src.example_store:  For the verified examples placed in the prompt as few-shot examples.
+    - src.llm_gate:  For the LLM concurrency budget, load shedding and retries.
+    - src.sql_templates:  For returning bind variables to callers passing `params` (imported lazily).
+
+Classes:
+    - NL2SQLConverter: Long-lived converter holding the compiled chain and prompt prefix.
 
 Functions:
+    - get_converter: Returns the shared, lazily created converter.
     - Convert_Natural_Language_To_Sql: Converts a natural language query into an SQL SELECT statement.
+    - Convert_Natural_Language_To_Sql_Async: Non-blocking variant used by the API request path.
 """
 
-import os
-from dotenv import load_dotenv
-import google.generativeai as Aimodel
-from langchain.prompts import PromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.runnables import RunnablePassthrough, RunnableLambda
+from typing import Sequence
 from fastapi import HTTPException
-from src.schema_details import get_metadata
+from src.example_store import Example
+from src.llm_gate import LLMGate
+from src.schema_details import SchemaCache, get_schema_cache, render_schema
+from src.schema_retriever import SchemaRetriever
+from src.utils.config import settings
 from src.utils.logger import get_logger
-
-# Load environment variables
-load_dotenv()
+from src.utils.metrics import stage, record_llm_usage
+from src.utils.sql_text import is_refusal
 
 # Initialize logger
 logger = get_logger(__name__)
 
-# Load API Key
-API_KEY = os.getenv('API_KEY')
-
-if not API_KEY:
-    logger.error("Missing API_KEY in environment variables.")
-    raise HTTPException(status_code=500, detail="API_KEY is missing. Set it in the environment variables.")
-
-Aimodel.configure(api_key=API_KEY)
-
-def Convert_Natural_Language_To_Sql(user_query:str,params = None) -> str | None:   
-        
-        """
-        Converts a natural language query into a SQL SELECT statement using Google Gemini.
-        
-        This function takes a natural language query as input and uses the Google Gemini API,
-        guided by a carefully crafted prompt, to generate a corresponding SQL SELECT statement.
-        It validates that the generated SQL adheres to specific rules (e.g., SELECT-only,
-        schema adherence) and returns the SQL query string if successful.  If any error
-        occurs during SQL generation or if the generated SQL violates the rules, it returns None.
-
-        Args:
-            user_query (str): The natural language query to be converted.
-            params (dict, optional): Additional parameters (currently unused). Defaults to None.
-
-        Returns:
-            str | None: The generated SQL SELECT statement, or None if generation failed.
-
-        Raises:
-            HTTPException:
-                - 500 Internal Server Error: If the Google Gemini API fails to generate a valid SQL query.
-        """
-
-        schema_details=get_metadata()
-        if not schema_details:
-            logger.error("Schema metadata retrieval failed.")
-            raise HTTPException(status_code=500, detail="Schema metadata unavailable.")
-
-        prompt_template = f"""
+PROMPT_PREFIX_TEMPLATE = """
 
         Convert the following natural language query into a SQL SELECT statement suitable for a database with the following table structure:
 
-        {'\n'.join(schema_details)}
+        {schema_text}
 
         You are a highly skilled SQL query generation tool designed for enterprise database environments. 
         Your sole function is to translate natural language requests into valid and efficient SQL SELECT statements. 
@@ -126,23 +100,304 @@ def Convert_Natural_Language_To_Sql(user_query:str,params = None) -> str | None:
         3.  Construct a valid SQL SELECT statement that fulfills all requirements.
         4.  Output ONLY the SQL SELECT statement.  If any rule is violated, output "ERROR".
 
-        Now, convert the following Natural Language Query: {user_query}
+        Now, convert the following Natural Language Query: """
+
+EXAMPLES_HEADER = """
+        **Verified Examples:**
+
+        The following questions were answered correctly by these SQL statements. Follow their conventions where they apply.
+
+"""
+
+_PROMPT_HEAD, _PROMPT_RULES = PROMPT_PREFIX_TEMPLATE.split("{schema_text}")
+_PROMPT_RULES, _QUERY_INSTRUCTION = _PROMPT_RULES.rsplit("\n", 1)
+_PROMPT_RULES += "\n"
+
+def render_examples(examples: Sequence[Example]) -> str:
+    """Renders few-shot examples as question/SQL pairs to be placed before the user query."""
+    if not examples:
+        return ""
+    return EXAMPLES_HEADER + "".join(
+        f"        Question: {example.user_query}\n        SQL: {example.sql}\n\n" for example in examples
+    )
+
+class NL2SQLConverter:
+
+    """
+    Converts natural language queries to SQL with a chain that is built once.
+
+    The schema metadata is rendered into the static prompt prefix once per schema
+    version, and the LLM client and LCEL chain are reused for every request, so the
+    per-request work is limited to appending the user query to the prefix.  When the
+    schema cache picks up a new version the prefix is re-rendered on the next request.
+
+    Schemas with at least `SCHEMA_RETRIEVAL_MIN_TABLES` tables are not inlined in
+    full: a `SchemaRetriever` picks the `SCHEMA_RETRIEVAL_TOP_K` most relevant tables
+    (plus their foreign-key neighbours) for each query, and only those are placed
+    between the pre-rendered instruction parts of the prompt.
+
+    Verified examples similar to the query (see `src.example_store`) can be passed
+    to `Generate_Sql`/`Generate_Sql_Async`; they are placed just before the query.
+
+    Asynchronous LLM calls go through an `LLMGate`, which bounds the calls in flight,
+    sheds load with a 503 once too many are queued and retries transient provider
+    errors with jittered backoff.  The client's own retries are therefore turned off.
+
+    Attributes:
+        schema_cache (SchemaCache): Source of the schema description and its version.
+        prompt_prefix (str): The fully rendered prompt up to the user query (full schema).
+        retriever (SchemaRetriever | None): Table retriever, set only for large schemas.
+        gate (LLMGate): Concurrency budget and retry policy for asynchronous LLM calls.
+        chain (Runnable): Chain mapping a user query to the raw LLM text.
+    """
+
+    def __init__(self, llm=None, schema_cache: SchemaCache | None = None, gate: LLMGate | None = None):
+
         """
+        Builds the prompt prefix, the LLM client and the chain.
+
+        Args:
+            llm (BaseChatModel, optional): Chat model to use. Defaults to Gemini via
+                `ChatGoogleGenerativeAI`; benchmarks pass a fake model here.
+            schema_cache (SchemaCache, optional): Schema source. Defaults to `get_schema_cache()`.
+            gate (LLMGate, optional): LLM call gate. Defaults to one configured from the `LLM_*` settings.
+
+        Raises:
+            HTTPException:
+                - 500 Internal Server Error: If the schema metadata is unavailable or,
+                  when no `llm` is given, the API key is missing.
+        """
+
+        from langchain_core.runnables import RunnableLambda
+
+        self.schema_cache = schema_cache or get_schema_cache()
+        self._prompt_version = None
+        self.prompt_prefix = ""
+        self._schema_text = ""
+        self.retriever = None
+        self._refresh_prompt_prefix()
+        self.llm = llm or self._create_llm()
+        self.gate = gate or LLMGate(
+            max_concurrency=settings.LLM_MAX_CONCURRENCY,
+            max_queue=settings.LLM_MAX_QUEUE,
+            queue_timeout=settings.LLM_QUEUE_TIMEOUT_SECONDS,
+            max_retries=settings.LLM_MAX_RETRIES,
+            retry_base=settings.LLM_RETRY_BASE_SECONDS,
+            retry_max=settings.LLM_RETRY_MAX_SECONDS
+        )
+        self.chain = (
+              RunnableLambda(self._render_request)
+              |self.llm
+              |RunnableLambda(self._read_response)
+        )
+
+    @staticmethod
+    def _create_llm():
+        if not settings.API_KEY:
+            logger.error("Missing API_KEY in environment variables.")
+            raise HTTPException(status_code=500, detail="API_KEY is missing. Set it in the environment variables.")
+
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model="gemini-pro", api_key=settings.API_KEY, temperature=0, max_retries=0)
+
+    @property
+    def schema_version(self) -> str:
+        """Version hash of the current schema, used to key caches of generated SQL."""
+        return self.schema_cache.version
+
+    def _refresh_prompt_prefix(self) -> None:
+        version, schema_details, tables = self.schema_cache.snapshot()
+        if version == self._prompt_version:
+            return
+        if not schema_details:
+            logger.error("Schema metadata retrieval failed.")
+            raise HTTPException(status_code=500, detail="Schema metadata unavailable.")
+        self._schema_text = '\n'.join(schema_details)
+        self.prompt_prefix = _PROMPT_HEAD + self._schema_text + _PROMPT_RULES + _QUERY_INSTRUCTION
+        self.retriever = SchemaRetriever(tables) if len(tables) >= settings.SCHEMA_RETRIEVAL_MIN_TABLES else None
+        self._prompt_version = version
+
+    def render_prompt(self, user_query: str, examples: Sequence[Example] = ()) -> str:
+        """Appends the examples and the user query to the pre-rendered prompt prefix, pruning the schema for large schemas."""
+        with stage("prompt_build"):
+            self._refresh_prompt_prefix()
+            retriever = self.retriever
+            if retriever is None:
+                if not examples:
+                    return self.prompt_prefix + user_query
+                schema_text = self._schema_text
+            else:
+                tables = retriever.relevant_tables(user_query, settings.SCHEMA_RETRIEVAL_TOP_K)
+                schema_text = '\n'.join(render_schema(tables))
+            return _PROMPT_HEAD + schema_text + _PROMPT_RULES + render_examples(examples) + _QUERY_INSTRUCTION + user_query
+
+    def _render_request(self, request: tuple[str, Sequence[Example]]) -> str:
+        return self.render_prompt(*request)
+
+    @staticmethod
+    def _read_response(message) -> str:
+        """Returns the text of the chat model response, recording its token usage."""
+        record_llm_usage(message)
+        return message.content
+
+    def Generate_Sql(self, user_query: str, examples: Sequence[Example] = ()) -> str | None:
+
+        """
+        Generates SQL for a natural language query, blocking on the LLM round trip.
+
+        Args:
+            user_query (str): The natural language query to be converted.
+            examples (Sequence[Example], optional): Verified examples to include as few-shot examples.
+
+        Returns:
+            str | None: The generated SQL SELECT statement, or None if the LLM refused the query.
+
+        Raises:
+            HTTPException:
+                - 503 Service Unavailable: If transient LLM errors persisted through the retries.
+                - 500 Internal Server Error: If the Google Gemini API fails to generate a valid SQL query.
+        """
+
+        request = (user_query, tuple(examples))
+
+        def call():
+            with stage("llm_call"):
+                return self.chain.invoke(request)
 
-        llm = ChatGoogleGenerativeAI(model="gemini-pro", api_key=API_KEY, temperature=0)
-        prompt = PromptTemplate(template=prompt_template,input_variables=["user_query"])
         try:
-              chain = (
-                    {"user_query":RunnablePassthrough()}
-                    |prompt
-                    |llm
-                    |RunnableLambda(lambda x:x.content)
-              )
-
-              sql_query = chain.invoke(user_query)
-              return sql_query if "ERROR" not in sql_query else None
-        
+              sql_query = self.gate.run_sync(call)
+              return sql_query if not is_refusal(sql_query) else None
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.exception(f"SQL generation failed for query: {user_query}")
             raise HTTPException(status_code=500, detail="SQL generation failed.")
-        
\ No newline at end of file
+
+    async def Generate_Sql_Async(self, user_query: str, examples: Sequence[Example] = ()) -> str | None:
+
+        """
+        Generates SQL through the chain's `ainvoke` without blocking the event loop.
+
+        The call waits for a slot in `gate` and transient provider errors are retried.
+
+        Args:
+            user_query (str): The natural language query to be converted.
+            examples (Sequence[Example], optional): Verified examples to include as few-shot examples.
+
+        Returns:
+            str | None: The generated SQL SELECT statement, or None if the LLM refused the query.
+
+        Raises:
+            HTTPException:
+                - 503 Service Unavailable: If the LLM is at capacity or transient errors persisted through the retries.
+                - 500 Internal Server Error: If the Google Gemini API fails to generate a valid SQL query.
+        """
+
+        request = (user_query, tuple(examples))
+
+        async def call():
+            with stage("llm_call"):
+                return await self.chain.ainvoke(request)
+
+        try:
+              sql_query = await self.gate.run(call)
+              return sql_query if not is_refusal(sql_query) else None
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.exception(f"SQL generation failed for query: {user_query}")
+            raise HTTPException(status_code=500, detail="SQL generation failed.")
+
+_converter: NL2SQLConverter | None = None
+
+def get_converter() -> NL2SQLConverter:
+
+    """
+    Returns the shared converter, creating it on first use.
+
+    Returns:
+        NL2SQLConverter: The process-wide converter instance.
+    """
+
+    global _converter
+    if _converter is None:
+        _converter = NL2SQLConverter()
+    return _converter
+
+def Convert_Natural_Language_To_Sql(user_query:str,params = None) -> str | None:   
+        
+        """
+        Converts a natural language query into a SQL SELECT statement using Google Gemini.
+        
+        This function takes a natural language query as input and uses the Google Gemini API,
+        guided by a carefully crafted prompt, to generate a corresponding SQL SELECT statement.
+        It validates that the generated SQL adheres to specific rules (e.g., SELECT-only,
+        schema adherence) and returns the SQL query string if successful.  If any error
+        occurs during SQL generation or if the generated SQL violates the rules, it returns None.
+
+        This call blocks on the LLM round trip; request handlers running on the event
+        loop should use `Convert_Natural_Language_To_Sql_Async` instead.
+
+        Args:
+            user_query (str): The natural language query to be converted.
+            params (dict, optional): When given, the SQL is validated against the schema
+                (`SQLValidator.validate`) and returned with its filter literals as bind
+                variables, and this dict is filled with their values, ready for
+                `Db_Output_Gen(sql, params)`.  Without it the raw LLM output is returned
+                unvalidated. Defaults to None.
+
+        Returns:
+            str | None: The generated SQL SELECT statement, or None if generation failed or,
+                when `params` is given, the SQL failed validation.
+
+        Raises:
+            HTTPException:
+                - 503 Service Unavailable: If the LLM is at capacity or transient errors persisted through the retries.
+                - 500 Internal Server Error: If the Google Gemini API fails to generate a valid SQL query.
+        """
+
+        return _bind_params(get_converter().Generate_Sql(user_query),params)
+
+async def Convert_Natural_Language_To_Sql_Async(user_query:str,params = None) -> str | None:
+
+        """
+        Asynchronous counterpart of `Convert_Natural_Language_To_Sql`.
+
+        Uses the chain's `ainvoke` so the Gemini round trip does not block the event loop
+        and other requests on the same worker keep making progress.
+
+        Args:
+            user_query (str): The natural language query to be converted.
+            params (dict, optional): When given, the SQL is validated against the schema
+                (`SQLValidator.validate`) and returned with its filter literals as bind
+                variables, and this dict is filled with their values, ready for
+                `Db_Output_Gen(sql, params)`.  Without it the raw LLM output is returned
+                unvalidated. Defaults to None.
+
+        Returns:
+            str | None: The generated SQL SELECT statement, or None if generation failed or,
+                when `params` is given, the SQL failed validation.
+
+        Raises:
+            HTTPException:
+                - 503 Service Unavailable: If the LLM is at capacity or transient errors persisted through the retries.
+                - 500 Internal Server Error: If the Google Gemini API fails to generate a valid SQL query.
+        """
+
+        return _bind_params(await get_converter().Generate_Sql_Async(user_query),params)
+
+def _bind_params(generated_sql: str | None, params: dict | None) -> str | None:
+        """Validates generated SQL and moves its filter literals into `params` when the caller asked for bind variables."""
+        if generated_sql is None or params is None:
+                return generated_sql
+        from src.sql_templates import get_parameterizer
+        parameterizer = get_parameterizer()
+        try:
+                validated_sql = parameterizer.validator.validate(generated_sql)
+        except HTTPException:
+                return None
+        statement, values = parameterizer.bind(validated_sql)
+        params.update(values or {})
+        return statement
@@ -0,0 +1,166 @@
+"""
+Semantic cache for generated SQL, placed in front of the NL->SQL converter.
+
+Queries are keyed on their normalized text and the schema version the SQL was
+generated against, so a schema change never serves stale SQL.  Entries expire after
+a TTL and the least recently used entry is evicted once the cache is full.
+
+Besides exact matches the cache reuses SQL for near-duplicate phrasings
+("top 10 students by total in cse" vs "show the top 10 students by total in cse").
+Each entry's token shingles are kept in an inverted index, candidates sharing a
+shingle are scored with Jaccard similarity and the best one above the threshold is
+returned.  A near-duplicate must have exactly the same content tokens as the
+query and may only differ in stopwords, plurals and word order: a single changed
+word can change the SQL ("... ascending" vs "... descending", "... in cse" vs
+"... in ece", "top 10" vs "top 20") while still scoring above the threshold.
+
+Classes:
+    - SemanticQueryCache: TTL/LRU cache with a near-duplicate shingle index.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from src.utils.logger import get_logger
+from src.utils.text_similarity import normalize_query, query_tokens, shingles, jaccard
+
+logger=get_logger(__name__)
+
+class _CacheEntry:
+    __slots__ = ("sql", "expires_at", "shingles", "tokens")
+
+    def __init__(self, sql: str, expires_at: float, shingles: frozenset, tokens: frozenset):
+        self.sql = sql
+        self.expires_at = expires_at
+        self.shingles = shingles
+        self.tokens = tokens
+
+class SemanticQueryCache:
+
+    """
+    Caches generated SQL by normalized query text and schema version.
+
+    Attributes:
+        max_entries (int): Maximum number of cached queries before LRU eviction.
+        ttl_seconds (float): Lifetime of an entry in seconds.
+        similarity_threshold (float): Minimum Jaccard similarity for a near-duplicate hit.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0, similarity_threshold: float = 0.85):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._entries: OrderedDict[tuple[str, str], _CacheEntry] = OrderedDict()
+        self._index: dict[tuple[str, str], set[tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, user_query: str, schema_version: str) -> str | None:
+
+        """
+        Looks up cached SQL for a query, falling back to the nearest similar query.
+
+        Args:
+            user_query (str): The natural language query.
+            schema_version (str): Version of the schema the SQL must have been generated for.
+
+        Returns:
+            str | None: The cached SQL, or None on a miss.
+        """
+
+        key = (schema_version, normalize_query(user_query))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry.sql
+                self._remove(key)
+                self.expirations += 1
+
+            tokens = query_tokens(key[1])
+            match = self._nearest(schema_version, tokens, now)
+            if match is not None:
+                self._entries.move_to_end(match)
+                self.near_hits += 1
+                logger.debug(f"Near-duplicate cache hit for '{key[1]}' via '{match[1]}'.")
+                return self._entries[match].sql
+
+            self.misses += 1
+            return None
+
+    def put(self, user_query: str, schema_version: str, sql: str) -> None:
+
+        """
+        Stores generated SQL for a query, evicting the least recently used entry if full.
+
+        Args:
+            user_query (str): The natural language query.
+            schema_version (str): Version of the schema the SQL was generated for.
+            sql (str): The generated SQL.
+        """
+
+        key = (schema_version, normalize_query(user_query))
+        tokens = query_tokens(key[1])
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = _CacheEntry(sql, time.monotonic() + self.ttl_seconds, shingles(tokens), frozenset(tokens))
+            self._entries[key] = entry
+            for shingle in entry.shingles:
+                self._index.setdefault((schema_version, shingle), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drops every cached entry; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+
+    def stats(self) -> dict:
+        """Returns the cache size and hit/miss/eviction counters."""
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+        }
+
+    def _nearest(self, schema_version: str, tokens: list[str], now: float):
+        query_shingles = shingles(tokens)
+        present = frozenset(tokens)
+        candidates = set()
+        for shingle in query_shingles:
+            candidates.update(self._index.get((schema_version, shingle), ()))
+
+        best_key, best_score = None, self.similarity_threshold
+        for key in candidates:
+            entry = self._entries[key]
+            if entry.expires_at <= now or entry.tokens != present:
+                continue
+            score = jaccard(query_shingles, entry.shingles)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key)
+        for shingle in entry.shingles:
+            bucket = self._index.get((key[0], shingle))
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._index[(key[0], shingle)]
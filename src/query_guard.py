@@ -0,0 +1,273 @@
+"""
+Guardrails applied to validated SQL before it is executed.
+
+Nothing in a natural language request bounds the size of its result: an
+unfiltered `SELECT *` or an accidental cartesian join would be fetched in full and
+hold a pooled connection for as long as that takes.  `QueryGuard` protects the
+shared database in three ways:
+
+    1. Row cap: every query is rewritten to return at most `MAX_RESULT_ROWS` rows
+       (`FETCH FIRST n ROWS ONLY` on Oracle, `LIMIT n` on MySQL and SQLite).  A
+       smaller limit written by the LLM is kept; a limit that is not a plain row
+       count (`FETCH FIRST 50 PERCENT`, `WITH TIES`) is kept too, and the query is
+       wrapped in `SELECT * FROM (...)` carrying the cap, unless its output has
+       duplicate column names, which a derived table cannot have.
+    2. Paging: `order_rows` gives a paged query a total row order (its own ORDER BY
+       keys, then every output column by position), otherwise consecutive pages
+       could skip or repeat rows, and `paginate` adds OFFSET and the page size to
+       the query itself rather than to a derived table wrapped around it.
+    3. Cost check (optional): the optimizer's estimates are read with `EXPLAIN`
+       and a query whose cost or cardinality exceeds the configured thresholds is
+       logged ("warn") or refused ("reject").  Drivers without plan estimates
+       (SQLite) skip the check.
+
+Statement timeouts are enforced by the database backends themselves (see
+`DB_STATEMENT_TIMEOUT_MS`).
+
+Classes:
+    - QueryGuard: Row cap, paging and plan-cost check.
+"""
+
+from typing import Awaitable, Callable
+from sqlglot import exp
+from fastapi import HTTPException
+from src.sql_validator import SQLValidator
+from src.utils.logger import get_logger
+
+logger=get_logger(__name__)
+
+COST_GUARD_MODES = ("off", "warn", "reject")
+
+# Column types the databases cannot sort by.
+_UNORDERABLE_TYPES = frozenset({"CLOB", "NCLOB", "BLOB", "LONG", "BFILE", "JSON", "XMLTYPE"})
+
+def _limit_value(tree: exp.Expression) -> int | None:
+    """Returns the row limit already written in the query, or None if it has none that can be read."""
+    node = tree.args.get("limit")
+    if isinstance(node, exp.Limit):
+        count = node.expression
+    elif isinstance(node, exp.Fetch):
+        # Newer sqlglot releases keep PERCENT / WITH TIES in a LimitOptions node, older ones on the Fetch itself.
+        options = node.args.get("limit_options") or node
+        if options.args.get("percent") or options.args.get("with_ties"):
+            return None
+        count = node.args.get("count")
+    else:
+        return None
+    if isinstance(count, exp.Literal) and not count.is_string and count.this.isdigit():
+        return int(count.this)
+    return None
+
+class QueryGuard:
+
+    """
+    Caps the rows a query may return and optionally checks its estimated cost.
+
+    Attributes:
+        validator (SQLValidator): Provides the memoized AST and the backend dialect.
+        max_rows (int): Row cap added to every query; 0 disables it.
+        cost_mode (str): "off", "warn" or "reject".
+        max_cost (float | None): Largest acceptable optimizer cost.
+        max_cardinality (float | None): Largest acceptable estimated row count.
+    """
+
+    def __init__(self, validator: SQLValidator, max_rows: int = 0, cost_mode: str = "off",
+                 max_cost: float | None = None, max_cardinality: float | None = None):
+        if cost_mode not in COST_GUARD_MODES:
+            raise ValueError(f"QUERY_COST_GUARD must be one of {', '.join(COST_GUARD_MODES)}, not '{cost_mode}'.")
+        self.validator = validator
+        self.max_rows = max_rows
+        self.cost_mode = cost_mode
+        self.max_cost = max_cost
+        self.max_cardinality = max_cardinality
+
+    def cap_rows(self, sql: str) -> str:
+
+        """
+        Adds the row cap to a validated query.
+
+        Args:
+            sql (str): A query returned by `SQLValidator.validate`.
+
+        Returns:
+            str: The query limited to `max_rows` rows, in the backend's dialect.
+        """
+
+        if not self.max_rows:
+            return sql
+        tree = self.validator.parse(sql)
+        limit = _limit_value(tree)
+        if limit is not None and limit <= self.max_rows:
+            return sql
+        if limit is None and tree.args.get("limit") is not None:
+            # Replacing a percentage or WITH TIES clause would change which rows the query means.
+            tree = self._derived(tree, "capped")
+            if tree is None:
+                logger.warning(f"Cannot add the row cap to a query with duplicate output columns: {sql}")
+                return sql
+        return tree.limit(self.max_rows).sql(dialect=self.validator.dialect)
+
+    def paginate(self, sql: str, offset: int, limit: int) -> str:
+
+        """
+        Restricts a validated query to one page of its rows.
+
+        OFFSET and the page size are added to the query's own AST: a derived table
+        around it would fail for a join returning duplicate column names, and MySQL
+        may ignore the ORDER BY of a derived table.  A plain row limit already in the
+        query (e.g. the row cap) still bounds the page.
+
+        Args:
+            sql (str): A query returned by `order_rows`.
+            offset (int): Number of rows to skip.
+            limit (int): Maximum number of rows in the page.
+
+        Returns:
+            str: The paged query in the backend's dialect.
+
+        Raises:
+            HTTPException:
+                - 400 Bad Request: If the query has its own OFFSET, percentage or WITH TIES
+                  clause and duplicate output columns, so it can be neither extended nor wrapped.
+        """
+
+        tree = self.validator.parse(sql)
+        existing = _limit_value(tree)
+        if tree.args.get("offset") is not None or (existing is None and tree.args.get("limit") is not None):
+            # The query's own OFFSET or non-plain limit cannot be merged with the page's.
+            tree = self._derived(tree, "paged")
+            if tree is None:
+                raise HTTPException(status_code=400, detail="This query cannot be paged; request it without page_size.")
+        elif existing is not None:
+            limit = max(0, min(limit, existing - offset))
+        if offset:
+            tree = tree.offset(offset)
+        return tree.limit(limit).sql(dialect=self.validator.dialect)
+
+    def _derived(self, tree: exp.Query, alias: str) -> exp.Select | None:
+        """Wraps a query in `SELECT * FROM (...)`, or returns None if it has duplicate output column names."""
+        ctes = {cte.alias_or_name.lower(): cte.this for cte in tree.find_all(exp.CTE)}
+        names = [name for name, _ in self._output_columns(tree, ctes) or () if name]
+        if len(names) != len(set(names)):
+            return None
+        return exp.select("*").from_(tree.subquery(alias))
+
+    def order_rows(self, sql: str) -> str:
+
+        """
+        Makes the row order of a validated query deterministic, so OFFSET pages neither skip nor repeat rows.
+
+        The query's own ORDER BY keys come first; every sortable output column is then
+        appended by position as a tie-breaker, so only identical rows can still tie.
+
+        Args:
+            sql (str): A query returned by `cap_rows`.
+
+        Returns:
+            str: The ordered query in the backend's dialect, or the query unchanged if its
+                output columns cannot be determined from the schema.
+        """
+
+        tree = self.validator.parse(sql)
+        ctes = {cte.alias_or_name.lower(): cte.this for cte in tree.find_all(exp.CTE)}
+        columns = self._output_columns(tree, ctes) or ()
+        positions = [
+            exp.Literal.number(position) for position, (_, column_type) in enumerate(columns, start=1)
+            if (column_type or "").split("(")[0].upper() not in _UNORDERABLE_TYPES
+        ]
+        if not positions:
+            logger.warning(f"Cannot determine the output columns to order pages by; pages may be unstable: {sql}")
+            return sql
+        return tree.order_by(*positions).sql(dialect=self.validator.dialect)
+
+    def _output_columns(self, query: exp.Expression, ctes: dict) -> list[tuple[str, str | None]] | None:
+
+        """
+        Returns the `(name, SQL type)` of each output column, or None if a `*` cannot be expanded.
+
+        Names are lower-case and empty for unaliased expressions; types are None where unknown.
+        """
+
+        while isinstance(query, (exp.SetOperation, exp.Subquery)):
+            query = query.this
+        if not isinstance(query, exp.Select):
+            return None
+        from_clause = query.args.get("from_") or query.args.get("from")
+        sources = ([from_clause.this] if from_clause else []) + [join.this for join in query.args.get("joins") or []]
+        source_columns = {}
+        for source in sources:
+            source_columns[source.alias_or_name.lower()] = self._source_columns(source, ctes)
+
+        columns = []
+        for expression in query.expressions:
+            if isinstance(expression, exp.Star):
+                expanded = list(source_columns.values())
+            elif isinstance(expression, exp.Column) and isinstance(expression.this, exp.Star):
+                expanded = [source_columns.get(expression.table.lower())]
+            else:
+                columns.append((expression.alias_or_name.lower(), self._column_type(expression, source_columns)))
+                continue
+            if any(source is None for source in expanded):
+                return None
+            for source in expanded:
+                columns.extend(source)
+        return columns
+
+    def _source_columns(self, source: exp.Expression, ctes: dict) -> list[tuple[str, str | None]] | None:
+        if isinstance(source, exp.Table):
+            name = source.name.lower()
+            if name in ctes:
+                return self._output_columns(ctes[name], ctes)
+            schema = self.validator.schema_cache.tables.get(name)
+            return list(schema.columns) if schema else None
+        if isinstance(source, exp.Subquery):
+            return self._output_columns(source.this, ctes)
+        return None
+
+    @staticmethod
+    def _column_type(expression: exp.Expression, source_columns: dict) -> str | None:
+        column = expression.this if isinstance(expression, exp.Alias) else expression
+        if not isinstance(column, exp.Column):
+            return None
+        candidates = [source_columns.get(column.table.lower())] if column.table else source_columns.values()
+        for columns in candidates:
+            for name, column_type in columns or ():
+                if name == column.name.lower():
+                    return column_type
+        return None
+
+    async def check_cost(self, sql: str, explain: Callable[[str], Awaitable[tuple[float | None, float | None]]]) -> None:
+
+        """
+        Compares the optimizer's estimates for a query with the configured limits.
+
+        Args:
+            sql (str): The query about to be executed.
+            explain (Callable): Coroutine function returning `(cost, cardinality)` estimates for the SQL.
+
+        Raises:
+            HTTPException:
+                - 400 Bad Request: If the mode is "reject" and an estimate exceeds its limit.
+        """
+
+        if self.cost_mode == "off" or (self.max_cost is None and self.max_cardinality is None):
+            return
+        try:
+            cost, cardinality = await explain(sql)
+        except HTTPException as e:
+            logger.warning(f"Skipping the cost check, the plan could not be read: {e.detail}")
+            return
+
+        exceeded = []
+        if self.max_cost is not None and cost is not None and cost > self.max_cost:
+            exceeded.append(f"estimated cost {cost:g} exceeds {self.max_cost:g}")
+        if self.max_cardinality is not None and cardinality is not None and cardinality > self.max_cardinality:
+            exceeded.append(f"estimated rows {cardinality:g} exceed {self.max_cardinality:g}")
+        if not exceeded:
+            return
+
+        reason = "; ".join(exceeded)
+        if self.cost_mode == "reject":
+            logger.warning(f"Rejected expensive query ({reason}): {sql}")
+            raise HTTPException(status_code=400, detail=f"Query rejected: {reason}.")
+        logger.warning(f"Expensive query ({reason}): {sql}")
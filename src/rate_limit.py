@@ -0,0 +1,163 @@
+"""
+Token-bucket request rate limits, per client and for the whole worker.
+
+Every `/data-requests` call can end in an LLM call, so an unthrottled burst turns
+straight into provider quota errors.  `RateLimiter` admits a request only if both
+the client's bucket and the global bucket hold enough tokens:
+
+    - An exhausted client bucket answers 429 Too Many Requests: that client should
+      slow down while everyone else is unaffected.
+    - An exhausted global bucket answers 503 Service Unavailable: the worker as a
+      whole is at capacity.  The client's tokens are refunded.
+
+Both carry a `Retry-After` header with the number of seconds until enough tokens
+have been refilled.  A request costing more tokens than a bucket can hold (a batch
+larger than the burst) can never be admitted and is answered 429 without one.  Buckets are only touched from the event loop, so they need
+no locking.  Client buckets are kept in an LRU map bounded by `max_clients`.
+
+Classes:
+    - TokenBucket: Continuously refilled token bucket.
+    - RateLimiter: Per-client and global token buckets.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from fastapi import HTTPException
+
+class TokenBucket:
+
+    """
+    Holds up to `burst` tokens, refilled at `rate` tokens per second.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        burst (float): Bucket capacity, i.e. the largest burst admitted at once.
+    """
+
+    __slots__ = ("rate", "burst", "tokens", "updated")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, cost: float = 1.0) -> float:
+
+        """
+        Takes `cost` tokens if the bucket holds them.
+
+        Args:
+            cost (float): Tokens to take.
+
+        Returns:
+            float: 0.0 if the tokens were taken, otherwise the seconds until they will be available;
+                infinity if `cost` exceeds `burst`.
+        """
+
+        if cost > self.burst:
+            return math.inf
+        self._refill(time.monotonic())
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def refund(self, cost: float = 1.0) -> None:
+        """Returns tokens taken by a request that was refused elsewhere."""
+        self.tokens = min(self.burst, self.tokens + cost)
+
+class RateLimiter:
+
+    """
+    Admits requests against a per-client and a global token bucket.
+
+    A rate of 0 disables the corresponding bucket.
+
+    Attributes:
+        client_rate (float): Requests per second allowed per client.
+        client_burst (float): Requests a client may send at once.
+        global_rate (float): Requests per second allowed for the worker.
+        global_burst (float): Requests the worker admits at once.
+        max_clients (int): Client buckets kept before the least recently used one is dropped.
+        max_cost (float): Largest cost a single request may have, i.e. the smallest enabled burst.
+    """
+
+    def __init__(self, client_rate: float = 0.0, client_burst: float = 1.0, global_rate: float = 0.0,
+                 global_burst: float = 1.0, max_clients: int = 10000):
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_clients = max_clients
+        self._clients: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._global = TokenBucket(global_rate, global_burst) if global_rate > 0 else None
+        capacities = [TokenBucket(client_rate, client_burst).burst] if client_rate > 0 else []
+        if self._global is not None:
+            capacities.append(self._global.burst)
+        self.max_cost = min(capacities, default=math.inf)
+        self.admitted = 0
+        self.client_rejections = 0
+        self.global_rejections = 0
+        self.oversized_rejections = 0
+
+    def check(self, client_id: str, cost: float = 1.0) -> None:
+
+        """
+        Admits a request or raises with the time after which it may be retried.
+
+        Args:
+            client_id (str): Identifies the caller, e.g. an API client header or the remote address.
+            cost (float): Tokens the request consumes, e.g. the number of queries in a batch.
+
+        Raises:
+            HTTPException:
+                - 429 Too Many Requests: If the client exceeded its rate, or the request costs more than a bucket holds.
+                - 503 Service Unavailable: If the worker exceeded the global rate.
+        """
+
+        if cost > self.max_cost:
+            self.oversized_rejections += 1
+            raise HTTPException(status_code=429, detail=f"Request costs {cost:g} rate limit tokens, but at most "
+                                                        f"{self.max_cost:g} are admitted at once. Send fewer queries per request.")
+
+        bucket = None
+        if self.client_rate > 0:
+            bucket = self._client_bucket(client_id)
+            wait = bucket.try_acquire(cost)
+            if wait:
+                self.client_rejections += 1
+                raise HTTPException(status_code=429, detail="Rate limit exceeded. Please slow down.",
+                                    headers={"Retry-After": str(math.ceil(wait))})
+        if self._global is not None:
+            wait = self._global.try_acquire(cost)
+            if wait:
+                if bucket is not None:
+                    bucket.refund(cost)
+                self.global_rejections += 1
+                raise HTTPException(status_code=503, detail="The service is at capacity. Please retry.",
+                                    headers={"Retry-After": str(math.ceil(wait))})
+        self.admitted += 1
+
+    def _client_bucket(self, client_id: str) -> TokenBucket:
+        bucket = self._clients.get(client_id)
+        if bucket is None:
+            bucket = self._clients[client_id] = TokenBucket(self.client_rate, self.client_burst)
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client_id)
+        return bucket
+
+    def stats(self) -> dict:
+        """Returns the admission and rejection counters."""
+        return {
+            "clients": len(self._clients),
+            "admitted": self.admitted,
+            "client_rejections": self.client_rejections,
+            "global_rejections": self.global_rejections,
+            "oversized_rejections": self.oversized_rejections,
+        }
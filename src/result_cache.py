@@ -0,0 +1,246 @@
+"""
+Query-result cache keyed on canonicalized SQL.
+
+Dashboards issue the same aggregate SELECTs over and over; this cache keeps their
+results in memory so repeated SQL does not reach the database.  Entries are keyed on
+the SQL with whitespace, letter case (outside string literals) and trailing
+semicolons normalized, bounded by a total memory budget in bytes and expired by a
+per-table TTL (the shortest TTL of the tables a query reads wins).  Entries can be
+invalidated explicitly by table name, and concurrent executions of the same SQL are
+coalesced into a single database round trip.
+
+Classes:
+    - QueryResultCache: Byte-budgeted LRU result cache with table-level invalidation.
+
+Functions:
+    - canonicalize_sql: Normalizes SQL text for use as a cache key.
+    - extract_tables: Returns the table names referenced by a SELECT statement.
+"""
+
+import asyncio
+import re
+import sys
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from src.utils.logger import get_logger
+
+logger=get_logger(__name__)
+
+_STRING_LITERAL = re.compile(r"('(?:[^']|'')*')")
+_TABLE_CLAUSE = re.compile(
+    r"\b(?:from|join)\s+(.+?)(?=\b(?:where|group|order|having|join|inner|left|right|full|cross|"
+    r"natural|on|using|union|intersect|minus|except|fetch|limit|offset|connect|start)\b|\(|\)|$)"
+)
+
+def canonicalize_sql(sql: str) -> str:
+
+    """
+    Normalizes SQL so that trivially different spellings share a cache key.
+
+    Whitespace runs are collapsed, text outside string literals is lower-cased and
+    trailing semicolons are removed.  String literals are left untouched because
+    their case is significant.
+
+    Args:
+        sql (str): The SQL statement.
+
+    Returns:
+        str: The canonical form of the statement.
+    """
+
+    parts = _STRING_LITERAL.split(sql.strip().rstrip(";").strip())
+    return "".join(
+        part if index % 2 else " ".join(part.lower().split())
+        for index, part in enumerate(parts)
+    )
+
+def extract_tables(canonical_sql: str) -> frozenset[str]:
+
+    """
+    Extracts the table names a canonicalized SELECT statement reads from.
+
+    Args:
+        canonical_sql (str): SQL as returned by `canonicalize_sql`.
+
+    Returns:
+        frozenset[str]: Lower-case table names without schema prefixes.
+    """
+
+    tables = set()
+    for clause in _TABLE_CLAUSE.findall(_STRING_LITERAL.sub("''", canonical_sql)):
+        for item in clause.split(","):
+            words = item.split()
+            if words:
+                tables.add(words[0].split(".")[-1].strip('"'))
+    return frozenset(tables)
+
+def _estimate_size(rows: list[dict]) -> int:
+    """Approximates the memory held by a list of row dictionaries, in bytes."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row.values():
+            size += sys.getsizeof(value)
+    return size
+
+class _ResultEntry:
+    __slots__ = ("rows", "size", "expires_at", "tables")
+
+    def __init__(self, rows: list[dict], size: int, expires_at: float, tables: frozenset[str]):
+        self.rows = rows
+        self.size = size
+        self.expires_at = expires_at
+        self.tables = tables
+
+class QueryResultCache:
+
+    """
+    Caches query results under a memory budget with per-table TTLs.
+
+    Attributes:
+        max_bytes (int): Memory budget for all cached results.
+        default_ttl (float): TTL in seconds for tables without an explicit TTL.
+        table_ttls (dict[str, float]): Per-table TTL overrides, keyed by lower-case table name.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, default_ttl: float = 30.0, table_ttls: dict[str, float] | None = None):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.table_ttls = {table.lower(): ttl for table, ttl in (table_ttls or {}).items()}
+        self._entries: OrderedDict[str, _ResultEntry] = OrderedDict()
+        self._by_table: dict[str, set[str]] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._generation = 0
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get_or_execute(self, sql: str, execute: Callable[[str], Awaitable[list[dict]]]) -> list[dict]:
+
+        """
+        Returns cached rows for the SQL, executing it at most once across concurrent callers.
+
+        Args:
+            sql (str): The SQL statement to run.
+            execute (Callable): Coroutine function running the SQL and returning its rows.
+
+        Returns:
+            list[dict]: The query results.
+
+        Raises:
+            Exception: Whatever `execute` raised; every coalesced caller receives the same error.
+        """
+
+        key = canonicalize_sql(sql)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.rows
+            self._remove(key)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            rows = await execute(sql)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(rows)
+        if generation == self._generation:
+            self._store(key, rows)
+        return rows
+
+    def invalidate(self, tables: list[str] | None = None) -> int:
+
+        """
+        Drops cached results that read from any of the given tables.
+
+        Args:
+            tables (list[str], optional): Table names to invalidate. All entries are dropped when omitted or empty.
+
+        Returns:
+            int: The number of entries removed.
+        """
+
+        self._generation += 1
+        if not tables:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._by_table.clear()
+            self.current_bytes = 0
+        else:
+            keys = set()
+            for table in tables:
+                keys.update(self._by_table.get(table.lower(), ()))
+            for key in keys:
+                self._remove(key)
+            removed = len(keys)
+
+        self.invalidations += removed
+        logger.info(f"Invalidated {removed} cached results for tables: {tables or 'ALL'}")
+        return removed
+
+    def stats(self) -> dict:
+        """Returns the cache size and hit/miss/coalescing/eviction counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _store(self, key: str, rows: list[dict]) -> None:
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            logger.debug(f"Result of {size} bytes exceeds the cache budget; not cached.")
+            return
+
+        tables = extract_tables(key)
+        ttl = min((self.table_ttls.get(table, self.default_ttl) for table in tables), default=self.default_ttl)
+        if ttl <= 0:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = _ResultEntry(rows, size, time.monotonic() + ttl, tables)
+        self.current_bytes += size
+        for table in tables:
+            self._by_table.setdefault(table, set()).add(key)
+
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
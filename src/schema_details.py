@@ -1,17 +1,254 @@
 """
 Module to provide metadata details for the database schema.
 
-This module defines a function, `Metadata`, that returns a list of strings
-describing the database schema.  This metadata is used by the NL-to-SQL
-conversion process to generate valid SQL queries.
+The schema is read from the active database's catalog (`ALL_TAB_COLUMNS` /
+`information_schema` / SQLite pragmas) and held in a `SchemaCache`, which renders
+the table descriptions used in the LLM prompt, exposes the structured tables and
+columns to the SQL validator and tags each snapshot with a version hash.  The cache
+is refreshed in the background every `SCHEMA_REFRESH_SECONDS`, so catalog queries
+run once per interval and caches keyed on the version are invalidated as soon as
+the schema changes.
+
+When `SCHEMA_SOURCE` is "static", or the catalog cannot be read at startup, the
+built-in description of the student/exam/placement tables is used instead.
+
+Classes:
+    - TableSchema: Columns, primary key and foreign keys of one table.
+    - SchemaCache: Versioned, periodically refreshed schema snapshot.
+
+Functions:
+    - tables_from_catalog: Builds `TableSchema` objects from catalog query rows.
+    - render_schema: Renders tables as prompt description lines.
+    - get_schema_cache: Returns the shared schema cache.
+    - get_metadata: Returns the schema description lines used in the prompt.
+    - get_schema_version: Returns the version hash of the current schema.
 """
 
-import logging
+import asyncio
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable
 from fastapi import HTTPException
+from src.utils.config import settings
 from src.utils.logger import get_logger
 
 logger=get_logger(__name__)
 
+@dataclass(frozen=True)
+class TableSchema:
+
+    """
+    Structure of one table as read from the catalog.
+
+    Attributes:
+        name (str): Table name, lower-case.
+        columns (tuple[tuple[str, str], ...]): `(column name, SQL type)` pairs, names lower-case.
+        primary_key (tuple[str, ...]): Primary key columns.
+        foreign_keys (tuple[tuple[str, str, str], ...]): `(column, referenced table, referenced column)` triples.
+    """
+
+    name: str
+    columns: tuple[tuple[str, str], ...]
+    primary_key: tuple[str, ...] = ()
+    foreign_keys: tuple[tuple[str, str, str], ...] = field(default=())
+
+    def describe(self) -> str:
+        """Renders the table as a single prompt line, e.g. "student table: roll_number INT PRIMARY KEY, ..."."""
+        references = {column: (table, target) for column, table, target in self.foreign_keys}
+        parts = []
+        for column, column_type in self.columns:
+            part = f"{column} {column_type}"
+            if column in self.primary_key:
+                part += " PRIMARY KEY"
+            if column in references:
+                part += f" REFERENCES {references[column][0]}({references[column][1]})"
+            parts.append(part)
+        return f"{self.name} table: {', '.join(parts)}"
+
+STATIC_SCHEMA = (
+    TableSchema(
+        "student",
+        (("roll_number", "INT"), ("sname", "VARCHAR(30)"), ("dept", "VARCHAR(5)"), ("sem", "INT")),
+        ("roll_number",),
+    ),
+    TableSchema(
+        "exam",
+        (("regno", "INT"), ("roll_number", "INT"), ("dept", "VARCHAR(5)"), ("mark1", "INT"), ("mark2", "INT"),
+         ("mark3", "INT"), ("mark4", "INT"), ("mark5", "INT"), ("total", "INT"), ("average", "INT"), ("grade", "VARCHAR(3)")),
+        ("regno",),
+        (("roll_number", "student", "roll_number"),),
+    ),
+    TableSchema(
+        "placement",
+        (("placementid", "INT"), ("roll_number", "INT"), ("dept", "CHAR(5)"), ("company", "VARCHAR(100)"), ("salary", "INT")),
+        ("placementid",),
+        (("roll_number", "student", "roll_number"),),
+    ),
+)
+
+def tables_from_catalog(columns: list[tuple], primary_keys: list[tuple], foreign_keys: list[tuple]) -> list[TableSchema]:
+
+    """
+    Assembles `TableSchema` objects from flat catalog query results.
+
+    Args:
+        columns (list[tuple]): `(table, column, type)` rows in column order.
+        primary_keys (list[tuple]): `(table, column)` rows.
+        foreign_keys (list[tuple]): `(table, column, referenced table, referenced column)` rows.
+
+    Returns:
+        list[TableSchema]: One entry per table, in the order the tables first appear in `columns`.
+    """
+
+    table_columns: dict[str, list[tuple[str, str]]] = {}
+    for table, column, column_type in columns:
+        table_columns.setdefault(table.lower(), []).append((column.lower(), column_type))
+
+    table_keys: dict[str, list[str]] = {}
+    for table, column in primary_keys:
+        table_keys.setdefault(table.lower(), []).append(column.lower())
+
+    table_references: dict[str, list[tuple[str, str, str]]] = {}
+    for table, column, referenced_table, referenced_column in foreign_keys:
+        table_references.setdefault(table.lower(), []).append(
+            (column.lower(), referenced_table.lower(), (referenced_column or column).lower())
+        )
+
+    return [
+        TableSchema(name, tuple(cols), tuple(table_keys.get(name, ())), tuple(table_references.get(name, ())))
+        for name, cols in table_columns.items()
+    ]
+
+def render_schema(tables: list[TableSchema] | tuple[TableSchema, ...]) -> list[str]:
+    """Renders tables as the description lines inserted into the prompt."""
+    names = [table.name for table in tables]
+    listing = names[0] if len(names) == 1 else f"{', '.join(names[:-1])} and {names[-1]}"
+    return [f"The database tables to query are {listing}:"] + [table.describe() for table in tables]
+
+class SchemaCache:
+
+    """
+    Holds the current schema snapshot and its version hash.
+
+    Attributes:
+        refresh_interval (float): Seconds between background catalog reads.
+        tables (dict[str, TableSchema]): The tables of the current snapshot, keyed by name.
+        lines (list[str]): Prompt description of the current snapshot.
+        version (str): 16 character hex digest of `lines`.
+    """
+
+    def __init__(self, loader: Callable[[], list[TableSchema]] | None = None, refresh_interval: float = 300.0):
+
+        """
+        Args:
+            loader (Callable, optional): Returns the tables from the catalog. Defaults to the
+                active backend's `Fetch_Schema`, or the static schema when `SCHEMA_SOURCE` is "static".
+            refresh_interval (float): Seconds between background refreshes.
+        """
+
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self._snapshot: tuple[str, list[str], dict[str, TableSchema]] | None = None
+
+    def snapshot(self) -> tuple[str, list[str], dict[str, TableSchema]]:
+
+        """
+        Returns the current snapshot, loading it on first use.
+
+        The three parts are swapped together on refresh, so callers that need more
+        than one of them should read them from a single snapshot.
+
+        Returns:
+            tuple[str, list[str], dict[str, TableSchema]]: `(version, lines, tables)`.
+        """
+
+        if self._snapshot is None:
+            self.refresh()
+        return self._snapshot
+
+    @property
+    def version(self) -> str:
+        return self.snapshot()[0]
+
+    @property
+    def lines(self) -> list[str]:
+        return self.snapshot()[1]
+
+    @property
+    def tables(self) -> dict[str, TableSchema]:
+        return self.snapshot()[2]
+
+    def _load(self) -> list[TableSchema]:
+        if self.loader is not None:
+            return self.loader()
+        if settings.SCHEMA_SOURCE == "static":
+            return list(STATIC_SCHEMA)
+
+        from src.db import get_backend
+        return get_backend().Fetch_Schema()
+
+    def refresh(self) -> bool:
+
+        """
+        Reloads the schema and recomputes its version.
+
+        A failed reload keeps the previous snapshot; if there is none yet the static
+        schema is used so the service can still start.
+
+        Returns:
+            bool: True if the schema version changed.
+        """
+
+        try:
+            tables = self._load()
+            if settings.SCHEMA_TABLES:
+                wanted = {name.lower() for name in settings.SCHEMA_TABLES}
+                tables = [table for table in tables if table.name in wanted]
+            if not tables:
+                raise ValueError("the catalog returned no tables")
+        except Exception as e:
+            if self._snapshot is not None:
+                logger.error(f"Schema refresh failed, keeping version {self._snapshot[0]}: {e}")
+                return False
+            logger.error(f"Schema introspection failed, falling back to the static schema: {e}")
+            tables = list(STATIC_SCHEMA)
+
+        lines = render_schema(tables)
+        version = hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()[:16]
+        previous = self._snapshot[0] if self._snapshot is not None else None
+        if version == previous:
+            return False
+
+        self._snapshot = (version, lines, {table.name: table for table in tables})
+        logger.info(f"Schema loaded: {len(tables)} tables, version {version} (previous {previous}).")
+        return True
+
+    async def refresh_async(self) -> bool:
+        """Runs `refresh` in a worker thread so catalog queries do not block the event loop."""
+        return await asyncio.to_thread(self.refresh)
+
+    async def run_refresher(self) -> None:
+        """Refreshes the schema every `refresh_interval` seconds until cancelled."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh_async()
+
+_schema_cache: SchemaCache | None = None
+
+def get_schema_cache() -> SchemaCache:
+
+    """
+    Returns the shared schema cache, creating it on first use.
+
+    Returns:
+        SchemaCache: The process-wide schema cache.
+    """
+
+    global _schema_cache
+    if _schema_cache is None:
+        _schema_cache = SchemaCache(refresh_interval=settings.SCHEMA_REFRESH_SECONDS)
+    return _schema_cache
+
 def get_metadata() -> list | None:
 
     """
@@ -23,13 +260,18 @@ def get_metadata() -> list | None:
                    information is available.
     """
     try:
-        return [
-            "The database tables to query are student, exam, ACCESS_RING_DATA and placement:"
-            
-            "student table: roll_number INT PRIMARY KEY, sname VARCHAR(30), dept VARCHAR(5), sem INT",
-            "exam table: regno INT PRIMARY KEY, roll_number INT Foreign key, dept VARCHAR(5), mark1 int,mark2,mark3 int,mark4 int,mark5 int,total int,average int,grade varchar(3)",
-            "placement table: placementID INT PRIMARY KEY, roll_number INT, dept char(5), company VARCHAR(100),salary int"
-        ]
+        return get_schema_cache().snapshot()[1]
     except Exception as e:
         logger.error(f"Error retrieving metadata: {e}")
-        raise HTTPException(status_code=500, detail="Schema metadata retrieval failed.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Schema metadata retrieval failed.")
+
+def get_schema_version() -> str:
+
+    """
+    Returns the version hash of the current schema.
+
+    Returns:
+        str: A 16 character hex digest that changes whenever the schema changes.
+    """
+
+    return get_schema_cache().version
@@ -0,0 +1,119 @@
+"""
+Relevance-pruned schema context for large schemas.
+
+Inlining every table in the prompt is fine for a handful of tables but prompt size
+drives LLM latency and cost once the schema has hundreds of them.  `SchemaRetriever`
+indexes each table locally with BM25 over the words of its table and column names,
+and for a query returns the top-k matching tables plus their foreign-key neighbours
+so that join paths stay intact.  Referenced (parent) tables are always added;
+referencing (child) tables only when they also matched the query, so a hub table
+referenced by hundreds of others does not drag all of them into the prompt.
+Everything runs in-process; no network calls.
+
+Classes:
+    - SchemaRetriever: BM25 index over tables and columns.
+"""
+
+import heapq
+import math
+import re
+from src.schema_details import TableSchema
+from src.utils.text_similarity import query_tokens
+
+_IDENTIFIER_SPLIT = re.compile(r"[_\W]+|(?<=[a-z])(?=[A-Z])")
+
+def table_tokens(table: TableSchema) -> list[str]:
+    """Returns the search terms of a table: the words of its name (weighted double) and its column names."""
+    name_words = query_tokens(" ".join(_IDENTIFIER_SPLIT.split(table.name)))
+    terms = name_words * 2
+    for column, _ in table.columns:
+        terms.extend(query_tokens(" ".join(_IDENTIFIER_SPLIT.split(column))))
+    return terms
+
+class SchemaRetriever:
+
+    """
+    Ranks tables by BM25 relevance to a natural language query.
+
+    Attributes:
+        tables (dict[str, TableSchema]): The indexed tables, keyed by name.
+        k1 (float): BM25 term frequency saturation.
+        b (float): BM25 document length normalization.
+    """
+
+    def __init__(self, tables: dict[str, TableSchema], k1: float = 1.5, b: float = 0.75):
+        self.tables = tables
+        self.k1 = k1
+        self.b = b
+        self._names = list(tables)
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._lengths: list[int] = []
+        self._parents: dict[str, set[str]] = {name: set() for name in tables}
+        self._children: dict[str, set[str]] = {name: set() for name in tables}
+
+        for index, name in enumerate(self._names):
+            terms = table_tokens(tables[name])
+            self._lengths.append(len(terms))
+            counts: dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                self._postings.setdefault(term, []).append((index, count))
+            for _, referenced_table, _ in tables[name].foreign_keys:
+                if referenced_table in tables and referenced_table != name:
+                    self._parents[name].add(referenced_table)
+                    self._children[referenced_table].add(name)
+
+        self._average_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        document_count = len(self._names)
+        self._idf = {
+            term: math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    def search(self, user_query: str, top_k: int) -> list[tuple[str, float]]:
+
+        """
+        Scores tables against a query.
+
+        Args:
+            user_query (str): The natural language query.
+            top_k (int): Maximum number of tables to return.
+
+        Returns:
+            list[tuple[str, float]]: `(table name, score)` pairs with a positive score, best first.
+        """
+
+        scores: dict[int, float] = {}
+        for term in set(query_tokens(user_query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for index, count in self._postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[index] / self._average_length)
+                scores[index] = scores.get(index, 0.0) + idf * count * (self.k1 + 1) / (count + norm)
+
+        ranked = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+        return [(self._names[index], score) for index, score in ranked]
+
+    def relevant_tables(self, user_query: str, top_k: int) -> list[TableSchema]:
+
+        """
+        Returns the top-k tables for a query together with their foreign-key neighbours.
+
+        Args:
+            user_query (str): The natural language query.
+            top_k (int): Number of tables selected by relevance before adding neighbours.
+
+        Returns:
+            list[TableSchema]: The selected tables; the first `top_k` tables when nothing matches.
+        """
+
+        candidates = [name for name, _ in self.search(user_query, top_k * 4)]
+        selected = candidates[:top_k] or self._names[:top_k]
+        matched = set(candidates)
+        chosen = dict.fromkeys(selected)
+        for name in selected:
+            chosen.update(dict.fromkeys(sorted(self._parents[name])))
+            chosen.update(dict.fromkeys(sorted(self._children[name] & matched)))
+        return [self.tables[name] for name in chosen]
@@ -0,0 +1,239 @@
+"""
+Single-flight deduplication of concurrent identical work.
+
+When a dashboard loads, many clients send the same query at the same moment.
+Without coordination each of them pays for its own LLM call and database round
+trip.  A single-flight group lets the first caller for a key (the leader) do the
+work while every concurrent caller with the same key (a follower) waits for and
+shares the leader's result or error.  Nothing is kept once the flight lands, so
+this is deduplication, not caching: a request that arrives afterwards starts a
+new flight.
+
+`SingleFlight` deduplicates within one worker process.  `RedisSingleFlight` adds a
+second level across uvicorn/gunicorn workers: the leader of each worker competes
+for a Redis lock (`SET NX PX`), the winner publishes its result under a key
+unique to its flight, and the other workers poll for it.  The lock holds a token
+unique to the flight and is released with a compare-and-delete script, so a
+leader whose lock expired cannot remove the lock of the worker that took over.
+Only `SET`, `GET` and `EVAL` are used, so any Redis-compatible server with Lua
+scripting (or an in-memory fake with the same asyncio interface) works.  Results
+shared through Redis must be JSON serializable.
+
+Classes:
+    - SingleFlight: In-process single-flight group.
+    - RedisSingleFlight: Single-flight group shared across workers through Redis.
+
+Functions:
+    - create_single_flight: Builds the group selected by `SINGLE_FLIGHT_BACKEND`.
+"""
+
+import asyncio
+import hashlib
+import json
+import uuid
+from typing import Any, Awaitable, Callable
+from fastapi import HTTPException
+from src.utils.config import settings
+from src.utils.logger import get_logger
+
+logger=get_logger(__name__)
+
+# Deletes the lock only while it still holds the releasing leader's token.
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+class SingleFlight:
+
+    """
+    Shares one execution among concurrent callers with the same key.
+
+    Attributes:
+        leaders (int): Calls that executed their work.
+        followers (int): Calls that shared an in-flight execution in this process.
+    """
+
+    def __init__(self):
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+
+        """
+        Runs `work` unless a call with the same key is already in flight.
+
+        Args:
+            key (str): Identifies identical work, e.g. the normalized query.
+            work (Callable): Coroutine function doing the work.
+
+        Returns:
+            Any: The result of the leader's `work`.
+
+        Raises:
+            Exception: Whatever the leader's `work` raised; every follower receives the same error.
+        """
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.followers += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(lambda done: done.cancelled() or done.exception())
+        self._inflight[key] = future
+        try:
+            result = await self._lead(key, work)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(result)
+        return result
+
+    async def _lead(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        self.leaders += 1
+        return await work()
+
+    async def close(self) -> None:
+        """Releases the group's resources."""
+
+    def stats(self) -> dict:
+        """Returns the in-flight count and the leader/follower counters."""
+        return {
+            "backend": "local",
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "followers": self.followers,
+        }
+
+class RedisSingleFlight(SingleFlight):
+
+    """
+    Single-flight group whose flights are shared by every worker using the same Redis.
+
+    Attributes:
+        client: An asyncio Redis client created with `decode_responses=True`.
+        lock_ttl (float): Seconds a leader may hold a flight before another worker may take over.
+        result_ttl (float): Seconds a published result stays readable for followers.
+        poll_interval (float): Seconds between follower polls.
+        prefix (str): Namespace for the Redis keys.
+        remote_followers (int): Flights answered by another worker's leader.
+    """
+
+    def __init__(self, client, lock_ttl: float = 60.0, result_ttl: float = 10.0,
+                 poll_interval: float = 0.02, prefix: str = "nl2sql:flight:"):
+        super().__init__()
+        self.client = client
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self.remote_followers = 0
+
+    async def _lead(self, key: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        lock_key = f"{self.prefix}lock:{hashlib.sha256(key.encode('utf-8')).hexdigest()}"
+        while True:
+            token = uuid.uuid4().hex
+            if await self.client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000)):
+                return await self._run_flight(lock_key, token, work)
+
+            token = await self.client.get(lock_key)
+            if token is None:
+                continue
+            payload = await self._wait(lock_key, token)
+            if payload is not None:
+                self.remote_followers += 1
+                if "error" in payload:
+                    status_code, detail, headers = payload["error"]
+                    raise HTTPException(status_code=status_code, detail=detail, headers=headers)
+                return payload["result"]
+            logger.warning(f"Single-flight leader for {lock_key} gave up without a result; retrying.")
+
+    async def _run_flight(self, lock_key: str, token: str, work: Callable[[], Awaitable[Any]]) -> Any:
+        self.leaders += 1
+        result_key = f"{self.prefix}result:{token}"
+        try:
+            try:
+                result = await work()
+            except HTTPException as e:
+                await self._publish(result_key, {"error": [e.status_code, e.detail, e.headers]})
+                raise
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await self._publish(result_key, {"error": [500, "Internal server error during query processing.", None]})
+                raise
+            await self._publish(result_key, {"result": result})
+            return result
+        finally:
+            if not await self.client.eval(_RELEASE_LOCK, 1, lock_key, token):
+                logger.warning(f"Single-flight lock {lock_key} expired before its leader finished.")
+
+    async def _publish(self, result_key: str, payload: dict) -> None:
+        try:
+            await self.client.set(result_key, json.dumps(payload, default=str), px=int(self.result_ttl * 1000))
+        except Exception as e:
+            logger.error(f"Unable to publish the single-flight result {result_key}: {e}")
+
+    async def _wait(self, lock_key: str, token: str) -> dict | None:
+        result_key = f"{self.prefix}result:{token}"
+        while True:
+            payload = await self.client.get(result_key)
+            if payload is not None:
+                return json.loads(payload)
+            if await self.client.get(lock_key) != token:
+                # The flight ended (or its lock expired); read the result once more in case it landed meanwhile.
+                payload = await self.client.get(result_key)
+                return json.loads(payload) if payload is not None else None
+            await asyncio.sleep(self.poll_interval)
+
+    async def close(self) -> None:
+        """Closes the Redis connection pool."""
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        """Returns the local counters plus the flights answered by other workers."""
+        return {**super().stats(), "backend": "redis", "remote_followers": self.remote_followers}
+
+def create_single_flight() -> SingleFlight | None:
+
+    """
+    Builds the single-flight group configured in the settings.
+
+    Returns:
+        SingleFlight | None: None when `SINGLE_FLIGHT_ENABLED` is false.
+
+    Raises:
+        HTTPException:
+            - 500 Internal Server Error: If the Redis backend is selected without a URL or without the `redis` package.
+    """
+
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return None
+    if settings.SINGLE_FLIGHT_BACKEND == "local":
+        return SingleFlight()
+    if settings.SINGLE_FLIGHT_BACKEND != "redis":
+        raise HTTPException(status_code=500, detail=f"Unknown single-flight backend '{settings.SINGLE_FLIGHT_BACKEND}'.")
+
+    if not settings.SINGLE_FLIGHT_REDIS_URL:
+        raise HTTPException(status_code=500, detail="SINGLE_FLIGHT_REDIS_URL is required for the redis single-flight backend.")
+    try:
+        from redis.asyncio import Redis
+    except ImportError:
+        raise HTTPException(status_code=500, detail="The redis single-flight backend requires the redis package.")
+
+    return RedisSingleFlight(
+        Redis.from_url(settings.SINGLE_FLIGHT_REDIS_URL, decode_responses=True),
+        lock_ttl=settings.SINGLE_FLIGHT_LOCK_TTL_SECONDS,
+        result_ttl=settings.SINGLE_FLIGHT_RESULT_TTL_SECONDS,
+        poll_interval=settings.SINGLE_FLIGHT_POLL_SECONDS
+    )
@@ -0,0 +1,400 @@
+"""
+Bind variables for generated SQL and query-shape templates learned from it.
+
+Questions that differ only in their values ("students in dept cse" vs "students
+in dept ece") produce SQL that differs only in its literals.  Run as is, every
+variant is a new statement to the database (a hard parse on Oracle) and a new LLM
+call.  Two pieces remove both costs:
+
+    - `SQLParameterizer` replaces the literals of filter predicates (WHERE, HAVING
+      and JOIN ... ON comparisons, IN lists, BETWEEN and LIKE patterns) with named
+      bind variables, so every variant executes the same statement text and hits
+      the driver's statement cache and the server's cursor cache.  Literals in the
+      select list, GROUP BY, ORDER BY and row limits are left in place: binding
+      them would change the meaning of the statement or make the database reject
+      it.  Only strings and integers are bound.  On Oracle, comparisons with CHAR
+      columns keep their literals, because a literal is blank-padded to the
+      column's length while a bound VARCHAR2 is not.
+    - `QueryTemplateCache` learns, from SQL that returned rows, which literals
+      were copied from which words of the question ("cse" -> 'CSE', "400" -> 400,
+      "ravi" -> '%ravi%').  Those words are slots; the question with its slots masked
+      is the query shape.  A later question of the same shape gets the learned SQL
+      with its own values substituted, without calling the LLM.  A new word takes
+      the case of the word it replaces ("ece" -> 'ECE'), which is a guess, so the
+      API only answers from a filled template once its `probe` finds a row.
+
+Both pick the same literals in the same order, from the AST the SQL validator has
+already parsed.  Slots are single words; a literal that matches no word of the
+question, or several, stays a constant of the template, so the shape only matches
+questions using the same value.
+
+Classes:
+    - SQLParameterizer: Memoized literal-to-bind-variable rewriting.
+    - QueryTemplateCache: LRU cache of SQL templates keyed by query shape.
+
+Functions:
+    - bindable_literals: The literals of a statement that can become bind variables.
+    - get_parameterizer: Returns the shared parameterizer for the active backend.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from src.sql_validator import SQLValidator
+from src.utils.logger import get_logger
+from src.utils.text_similarity import query_token_pairs
+
+logger=get_logger(__name__)
+
+_PREDICATES = (exp.EQ, exp.NEQ, exp.GT, exp.GTE, exp.LT, exp.LTE, exp.Like, exp.ILike, exp.In, exp.Between)
+
+_CASES = {
+    "": str,
+    "upper": str.upper,
+    "title": str.title,
+}
+
+def _in_filter(literal: exp.Literal) -> bool:
+    """True if the literal belongs to a WHERE, HAVING or JOIN condition rather than a select list, grouping or ordering."""
+    node = literal
+    while node.parent is not None:
+        parent = node.parent
+        if isinstance(parent, (exp.Where, exp.Having)):
+            return True
+        if isinstance(parent, exp.Join):
+            return node.arg_key == "on"
+        if isinstance(parent, (exp.Select, exp.Group, exp.Order)):
+            return False
+        node = parent
+    return False
+
+def bindable_literals(tree: exp.Expression) -> list[exp.Literal]:
+
+    """
+    Returns the literals of a statement that can be replaced by bind variables.
+
+    Args:
+        tree (exp.Expression): The parsed statement.
+
+    Returns:
+        list[exp.Literal]: String and integer operands of filter predicates, in source order.
+    """
+
+    return [
+        literal for literal in tree.find_all(exp.Literal, bfs=False)
+        if isinstance(literal.parent, _PREDICATES)
+        and (literal.is_string or literal.this.isdigit())
+        and _in_filter(literal)
+    ]
+
+class SQLParameterizer:
+
+    """
+    Rewrites validated SQL into a statement with named bind variables and their values.
+
+    Attributes:
+        validator (SQLValidator): Parses SQL in the backend's dialect and holds the schema cache.
+        placeholder (str): Format string of a named bind variable, e.g. ":{}" or "%({})s".
+        padded_types (frozenset[str]): Column types whose comparisons keep their literals.
+    """
+
+    def __init__(self, validator: SQLValidator, placeholder: str = ":{}", padded_types: tuple[str, ...] = (),
+                 cache_size: int = 1024):
+        self.validator = validator
+        self.placeholder = placeholder
+        self.padded_types = frozenset(padded_types)
+        self._bind = lru_cache(maxsize=cache_size)(self._bind_uncached)
+
+    def bind(self, sql: str) -> tuple[str, dict | None]:
+
+        """
+        Replaces the bindable literals of a query with bind variables.
+
+        Args:
+            sql (str): A validated query in the backend's dialect.
+
+        Returns:
+            tuple[str, dict | None]: The statement to execute and its bind parameters;
+                the query unchanged and None when there is nothing to bind.
+        """
+
+        template, params = self._bind(sql, self.validator.schema_cache.version)
+        return template, dict(params) if params else None
+
+    def _bind_uncached(self, sql: str, schema_version: str) -> tuple[str, tuple]:
+        try:
+            tree = self.validator.parse(sql).copy()
+        except (SqlglotError, ValueError):
+            return sql, ()
+        literals = bindable_literals(tree)
+        if self.padded_types:
+            literals = [literal for literal in literals if not self._compares_padded(tree, literal)]
+        if not literals:
+            return sql, ()
+
+        names = {}
+        params = []
+        for index, literal in enumerate(literals):
+            name = f"b{index}"
+            names[id(literal)] = name
+            params.append((name, literal.this if literal.is_string else int(literal.this)))
+
+        def to_placeholder(node):
+            name = names.get(id(node))
+            return exp.Var(this=self.placeholder.format(name)) if name else node
+
+        template = tree.transform(to_placeholder, copy=False)
+        return template.sql(dialect=self.validator.dialect), tuple(params)
+
+    def _compares_padded(self, tree: exp.Expression, literal: exp.Literal) -> bool:
+        column = literal.parent.find(exp.Column)
+        if column is None:
+            return False
+        tables = self.validator.schema_cache.tables
+        name = column.name.lower()
+        for table in tree.find_all(exp.Table):
+            schema = tables.get(table.name.lower())
+            if schema is None:
+                continue
+            for column_name, column_type in schema.columns:
+                if column_name == name and column_type.split("(")[0].upper() in self.padded_types:
+                    return True
+        return False
+
+class _Slot:
+    __slots__ = ("literal", "position", "case", "prefix", "suffix")
+
+    def __init__(self, literal: int, position: int, case: str, prefix: str = "", suffix: str = ""):
+        self.literal = literal
+        self.position = position
+        self.case = case
+        self.prefix = prefix
+        self.suffix = suffix
+
+class _Template:
+    __slots__ = ("sql", "slots", "literal_count", "positions")
+
+    def __init__(self, sql: str, slots: list[_Slot], literal_count: int):
+        self.sql = sql
+        self.slots = slots
+        self.literal_count = literal_count
+        self.positions = tuple(sorted({slot.position for slot in slots}))
+
+def _slot_class(raw: str) -> str:
+    return "<number>" if raw.isdigit() else "<word>"
+
+class QueryTemplateCache:
+
+    """
+    Caches SQL by query shape and fills in the values of new questions of the same shape.
+
+    Attributes:
+        validator (SQLValidator): Parses the stored SQL and renders it in the backend's dialect.
+        max_entries (int): Maximum number of templates before LRU eviction.
+    """
+
+    def __init__(self, validator: SQLValidator, max_entries: int = 1024):
+        self.validator = validator
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple, _Template] = OrderedDict()
+        self._patterns: dict[tuple[str, int], dict[tuple[int, ...], int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.learned = 0
+        self.evictions = 0
+
+    def learn(self, user_query: str, schema_version: str, sql: str) -> bool:
+
+        """
+        Records the SQL answering a question as the template of the question's shape.
+
+        Args:
+            user_query (str): The normalized natural language query.
+            schema_version (str): Version of the schema the SQL was generated for.
+            sql (str): The validated SQL, which has returned rows.
+
+        Returns:
+            bool: True if the SQL has at least one slot and was stored.
+        """
+
+        pairs = query_token_pairs(user_query)
+        try:
+            literals = bindable_literals(self.validator.parse(sql))
+        except (SqlglotError, ValueError):
+            return False
+
+        slots = []
+        for index, literal in enumerate(literals):
+            slot = self._find_slot(index, literal, pairs)
+            if slot is not None:
+                slots.append(slot)
+        if not slots:
+            return False
+
+        template = _Template(sql, slots, len(literals))
+        key = (schema_version, self._shape(pairs, template.positions))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = template
+            patterns = self._patterns.setdefault((schema_version, len(pairs)), {})
+            patterns[template.positions] = patterns.get(template.positions, 0) + 1
+            self.learned += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def match(self, user_query: str, schema_version: str) -> str | None:
+
+        """
+        Returns the learned SQL for the question's shape with the question's values filled in.
+
+        Args:
+            user_query (str): The normalized natural language query.
+            schema_version (str): Version of the schema the SQL must have been generated for.
+
+        Returns:
+            str | None: The SQL for this question, or None if no template has its shape.
+        """
+
+        pairs = query_token_pairs(user_query)
+        template = None
+        with self._lock:
+            for positions in self._patterns.get((schema_version, len(pairs)), {}):
+                key = (schema_version, self._shape(pairs, positions))
+                template = self._entries.get(key)
+                if template is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    break
+            else:
+                self.misses += 1
+        if template is None:
+            return None
+        return self._fill(template, pairs)
+
+    def probe(self, sql: str) -> str:
+
+        """
+        Returns a query that finds a row exactly when the filters of a filled template match one.
+
+        An aggregate or grouped query can return a row even when its WHERE clause
+        matches nothing (`COUNT(*)` gives 0), so for those only the FROM, joins and
+        WHERE clause are kept and the select list becomes a constant.
+
+        Args:
+            sql (str): A validated, filled template.
+
+        Returns:
+            str: The probe in the backend's dialect; `sql` itself unless it is an aggregate or grouped SELECT.
+        """
+
+        tree = self.validator.parse(sql)
+        if not isinstance(tree, exp.Select) or not (
+                tree.args.get("group") or any(expression.find(exp.AggFunc) for expression in tree.expressions)):
+            return sql
+        probe = tree.copy()
+        for key in ("distinct", "group", "having", "order", "limit", "offset"):
+            probe.set(key, None)
+        probe.set("expressions", [exp.Literal.number(1)])
+        return probe.sql(dialect=self.validator.dialect)
+
+    def clear(self) -> None:
+        """Drops every template; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._patterns.clear()
+
+    def stats(self) -> dict:
+        """Returns the number of templates and the hit/miss/eviction counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "learned": self.learned,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    @staticmethod
+    def _shape(pairs: list[tuple[str, str]], positions: tuple[int, ...]) -> tuple[str, ...]:
+        shape = [token for token, _ in pairs]
+        for position in positions:
+            shape[position] = _slot_class(pairs[position][1])
+        return tuple(shape)
+
+    @staticmethod
+    def _find_slot(index: int, literal: exp.Literal, pairs: list[tuple[str, str]]) -> _Slot | None:
+        value, prefix, suffix = literal.this, "", ""
+        if not literal.is_string:
+            positions = [(position, "") for position, (_, raw) in enumerate(pairs) if raw == value]
+        else:
+            if isinstance(literal.parent, (exp.Like, exp.ILike)):
+                core = value.strip("%")
+                prefix = value[:len(value) - len(value.lstrip("%"))]
+                suffix = value[len(value.rstrip("%")):]
+                value = core
+            positions = [
+                (position, case) for position, (_, raw) in enumerate(pairs)
+                if not raw.isdigit()
+                for case in (case for case, transform in _CASES.items() if transform(raw) == value)
+            ]
+        if len({position for position, _ in positions}) != 1:
+            return None
+        position, case = positions[0]
+        return _Slot(index, position, case, prefix, suffix)
+
+    def _fill(self, template: _Template, pairs: list[tuple[str, str]]) -> str | None:
+        tree = self.validator.parse(template.sql).copy()
+        literals = bindable_literals(tree)
+        if len(literals) != template.literal_count:
+            return None
+        for slot in template.slots:
+            raw = pairs[slot.position][1]
+            literal = literals[slot.literal]
+            if literal.is_string:
+                literal.replace(exp.Literal.string(slot.prefix + _CASES[slot.case](raw) + slot.suffix))
+            else:
+                literal.replace(exp.Literal.number(raw))
+        return tree.sql(dialect=self.validator.dialect)
+
+    def _remove(self, key: tuple) -> None:
+        template = self._entries.pop(key)
+        pattern_key = (key[0], len(key[1]))
+        patterns = self._patterns.get(pattern_key)
+        if patterns is None:
+            return
+        patterns[template.positions] -= 1
+        if not patterns[template.positions]:
+            del patterns[template.positions]
+            if not patterns:
+                del self._patterns[pattern_key]
+
+_parameterizer: SQLParameterizer | None = None
+
+def get_parameterizer() -> SQLParameterizer:
+
+    """
+    Returns the shared parameterizer for the active database backend, creating it on first use.
+
+    Returns:
+        SQLParameterizer: Binds literals using the backend's placeholder style.
+    """
+
+    global _parameterizer
+    if _parameterizer is None:
+        from src.db import get_backend
+        from src.schema_details import get_schema_cache
+        backend = get_backend()
+        _parameterizer = SQLParameterizer(
+            SQLValidator(get_schema_cache(), backend.dialect),
+            backend.bind_placeholder,
+            backend.padded_char_types,
+        )
+    return _parameterizer
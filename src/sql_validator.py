@@ -0,0 +1,191 @@
+"""
+Local parse-and-validate stage for LLM generated SQL.
+
+The LLM is asked to answer "ERROR" for anything that is not a plain SELECT, but
+its output is not trusted: before any SQL reaches the database it is parsed with
+sqlglot and checked locally, so bad queries are rejected in microseconds instead of
+costing a round trip and a database error.
+
+Checks, in order:
+    1. Markdown code fences and trailing semicolons are stripped.
+    2. The text must parse as exactly one statement.
+    3. The statement must be a query (SELECT, set operation, CTE) with no DML, DDL,
+       SELECT INTO or row locking anywhere in the tree.
+    4. Every table must exist in the cached schema, and every column must exist in
+       one of the tables it can refer to. The dialect's built-in tables and
+       pseudocolumns (Oracle's DUAL, ROWNUM, SYSDATE, ...) are always allowed.
+    5. The query is rendered in the active backend's dialect (Oracle, MySQL, SQLite).
+
+Parsed ASTs and validation outcomes are memoized per schema version.
+
+Classes:
+    - SQLValidator: Validates and transpiles generated SQL.
+
+Functions:
+    - parse_sql: Memoized sqlglot parsing.
+"""
+
+from functools import lru_cache
+import sqlglot
+from sqlglot import exp
+from sqlglot.errors import SqlglotError
+from fastapi import HTTPException
+from src.schema_details import SchemaCache
+from src.utils.logger import get_logger
+from src.utils.sql_text import strip_code_fences
+
+logger=get_logger(__name__)
+
+# Looked up by name: some node classes (e.g. Revoke) only exist in newer sqlglot releases.
+_FORBIDDEN_NODES = tuple(filter(None, (getattr(exp, name, None) for name in (
+    "Insert", "Update", "Delete", "Merge", "Drop", "Create", "Alter",
+    "TruncateTable", "Command", "Grant", "Revoke", "Commit", "Rollback",
+    "Transaction", "Set", "Use", "Pragma", "Into", "Lock",
+))))
+
+# Tables and pseudocolumns every database of the dialect has, outside the schema.
+_BUILTIN_TABLES = {
+    "oracle": frozenset({"dual"}),
+    "mysql": frozenset({"dual"}),
+}
+_BUILTIN_COLUMNS = {
+    "oracle": frozenset({"rownum", "rowid", "level", "sysdate", "systimestamp"}),
+    "sqlite": frozenset({"rowid", "oid", "_rowid_"}),
+}
+
+@lru_cache(maxsize=2048)
+def parse_sql(sql: str, dialect: str | None) -> tuple:
+
+    """
+    Parses SQL into statements, memoized on the SQL text and dialect.
+
+    The returned ASTs are shared between callers and must not be mutated in place;
+    sqlglot's builder methods (`limit`, `where`, ...) return copies by default.
+
+    Args:
+        sql (str): The SQL text, without fences.
+        dialect (str | None): The sqlglot dialect to read, or None for the generic dialect.
+
+    Returns:
+        tuple[exp.Expression, ...]: The parsed statements.
+
+    Raises:
+        SqlglotError: If the SQL cannot be parsed.
+    """
+
+    return tuple(statement for statement in sqlglot.parse(sql, read=dialect) if statement is not None)
+
+class SQLValidator:
+
+    """
+    Validates generated SQL against the cached schema and transpiles it.
+
+    Attributes:
+        schema_cache (SchemaCache): Source of the known tables and columns.
+        dialect (str): sqlglot dialect of the active database backend.
+    """
+
+    def __init__(self, schema_cache: SchemaCache, dialect: str, cache_size: int = 1024):
+        self.schema_cache = schema_cache
+        self.dialect = dialect
+        self._check = lru_cache(maxsize=cache_size)(self._check_uncached)
+
+    def validate(self, generated_sql: str) -> str:
+
+        """
+        Validates LLM output and returns SQL ready for execution.
+
+        Args:
+            generated_sql (str): The raw LLM output.
+
+        Returns:
+            str: A single SELECT statement in the backend's dialect.
+
+        Raises:
+            HTTPException:
+                - 400 Bad Request: If the SQL is not a single valid SELECT over known tables and columns.
+        """
+
+        sql = strip_code_fences(generated_sql)
+        valid, result = self._check(sql, self.schema_cache.version)
+        if not valid:
+            logger.warning(f"Rejected generated SQL ({result}): {sql}")
+            raise HTTPException(status_code=400, detail=f"Generated SQL rejected: {result}")
+        return result
+
+    def parse(self, sql: str) -> exp.Expression:
+        """Returns the memoized AST of a single, already validated statement."""
+        return self._parse_single(strip_code_fences(sql))
+
+    def _parse_single(self, sql: str) -> exp.Expression:
+        try:
+            statements = parse_sql(sql, self.dialect)
+        except SqlglotError:
+            statements = parse_sql(sql, None)
+        if len(statements) != 1:
+            raise ValueError("expected exactly one SQL statement")
+        return statements[0]
+
+    def _check_uncached(self, sql: str, schema_version: str) -> tuple[bool, str]:
+        if not sql:
+            return False, "empty SQL"
+        try:
+            tree = self._parse_single(sql)
+        except (SqlglotError, ValueError) as e:
+            return False, str(e).splitlines()[0]
+
+        if not isinstance(tree, exp.Query):
+            return False, "only SELECT statements are allowed"
+        forbidden = next(tree.find_all(*_FORBIDDEN_NODES), None)
+        if forbidden is not None:
+            return False, f"{forbidden.key.upper()} is not allowed"
+
+        error = self._check_schema(tree)
+        if error:
+            return False, error
+        return True, tree.sql(dialect=self.dialect)
+
+    def _check_schema(self, tree: exp.Expression) -> str | None:
+        tables = self.schema_cache.tables
+        builtin_tables = _BUILTIN_TABLES.get(self.dialect, frozenset())
+        builtin_columns = _BUILTIN_COLUMNS.get(self.dialect, frozenset())
+        cte_names = {cte.alias_or_name.lower() for cte in tree.find_all(exp.CTE)}
+
+        sources: dict[str, str | None] = {}
+        for table in tree.find_all(exp.Table):
+            name = table.name.lower()
+            if name in cte_names or (name in builtin_tables and name not in tables):
+                sources[table.alias_or_name.lower()] = None
+                continue
+            if name not in tables:
+                return f"unknown table '{table.name}'"
+            sources[name] = name
+            sources[table.alias_or_name.lower()] = name
+
+        has_derived = bool(cte_names) or any(
+            isinstance(source, exp.Subquery) and source.alias
+            for source in tree.find_all(exp.Subquery)
+        )
+        output_names = {alias.alias.lower() for alias in tree.find_all(exp.Alias)}
+        known_columns = {
+            column for name in set(sources.values()) if name for column, _ in tables[name].columns
+        }
+
+        for column in tree.find_all(exp.Column):
+            if isinstance(column.this, exp.Star):
+                continue
+            name = column.name.lower()
+            if name in builtin_columns:
+                continue
+            qualifier = column.table.lower()
+            if qualifier:
+                if qualifier not in sources:
+                    if has_derived:
+                        continue
+                    return f"unknown table or alias '{column.table}'"
+                source = sources[qualifier]
+                if source is not None and name not in {col for col, _ in tables[source].columns}:
+                    return f"unknown column '{column.table}.{column.name}'"
+            elif name not in known_columns and name not in output_names and not has_derived:
+                return f"unknown column '{column.name}'"
+        return None
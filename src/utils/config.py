@@ -1,19 +1,116 @@
 from dotenv import load_dotenv
+from pydantic import AliasChoices, Field
 from pydantic_settings import BaseSettings
 
 load_dotenv()
 
 class Settings(BaseSettings):
-    API_KEY: str
-    DB_USER: str
-    DB_PASS: str
-    DB_HOST: str
-    DB_PORT: str = "1521"
-    DB_SERVICE_NAME: str
+    API_KEY: str | None = None
+
+    # Database driver: "oracle", "mysql" or "sqlite" (see src.db).
+    DB_BACKEND: str = "oracle"
+    # The MySQL-only setup used HOST_NAME, USER_NAME, PASSWORD, DATABASE_NAME and POOL_SIZE;
+    # they are still read when the DB_* setting is not set (deprecated, see README).
+    DB_USER: str | None = Field(default=None, validation_alias=AliasChoices("DB_USER", "USER_NAME"))
+    DB_PASS: str | None = Field(default=None, validation_alias=AliasChoices("DB_PASS", "PASSWORD"))
+    DB_HOST: str | None = Field(default=None, validation_alias=AliasChoices("DB_HOST", "HOST_NAME"))
+    DB_PORT: str | None = None
+    DB_SERVICE_NAME: str | None = None
+    DB_NAME: str | None = Field(default=None, validation_alias=AliasChoices("DB_NAME", "DATABASE_NAME"))
+    SQLITE_PATH: str = "nl2sql.sqlite3"
     
+    DB_CONNECT_TIMEOUT: int = 10
     DB_MIN_CONNECTIONS: int = 2
-    DB_MAX_CONNECTIONS: int = 5
+    DB_MAX_CONNECTIONS: int = Field(default=5, validation_alias=AliasChoices("DB_MAX_CONNECTIONS", "POOL_SIZE"))
     DB_CONNECTION_INCREMENT: int = 1
+    # Adaptive checkout limit between DB_MIN_CONNECTIONS and DB_MAX_CONNECTIONS (see src.db.pool_manager).
+    DB_POOL_ADAPTIVE: bool = True
+    DB_POOL_WAIT_TIMEOUT_SECONDS: float = 2.0
+    DB_POOL_TARGET_WAIT_SECONDS: float = 0.01
+    DB_POOL_RESIZE_SECONDS: float = 30.0
+    DB_POOL_PING_INTERVAL_SECONDS: int = 60
+    DB_POOL_IDLE_TIMEOUT_SECONDS: int = 300
+    DB_STMT_CACHE_SIZE: int = 50
+    DB_FETCH_BATCH_SIZE: int = 1000
+    MAX_PAGE_SIZE: int = 10000
+    # Per-statement timeout enforced by the driver/server; 0 disables it.
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+
+    # Row cap added to every generated query; 0 disables it.
+    MAX_RESULT_ROWS: int = 100000
+    # "off", "warn" or "reject" queries whose plan estimates exceed the limits below.
+    QUERY_COST_GUARD: str = "off"
+    MAX_QUERY_COST: float | None = None
+    MAX_QUERY_CARDINALITY: float | None = None
+
+    BATCH_MAX_QUERIES: int = 100
+    BATCH_CONCURRENCY: int = 4
+
+    # Token-bucket request limits per client and per worker; a rate of 0 disables the bucket.
+    # Clients are told apart by RATE_LIMIT_CLIENT_HEADER (set by a trusted gateway or proxy, e.g.
+    # "X-Forwarded-For", whose last entry is used) or else the remote address.  Per-client limits
+    # are off by default: behind a proxy without the header every user would share one bucket.
+    RATE_LIMIT_CLIENT_RPS: float = 0.0
+    RATE_LIMIT_CLIENT_BURST: float = 20.0
+    RATE_LIMIT_GLOBAL_RPS: float = 0.0
+    RATE_LIMIT_GLOBAL_BURST: float = 100.0
+    RATE_LIMIT_CLIENT_HEADER: str | None = None
+    RATE_LIMIT_MAX_CLIENTS: int = 10000
+
+    # LLM calls in flight per worker (0 disables the budget), calls allowed to queue for a
+    # slot, and retries of transient provider errors with jittered exponential backoff.
+    LLM_MAX_CONCURRENCY: int = 16
+    LLM_MAX_QUEUE: int = 64
+    LLM_QUEUE_TIMEOUT_SECONDS: float = 10.0
+    LLM_MAX_RETRIES: int = 3
+    LLM_RETRY_BASE_SECONDS: float = 0.5
+    LLM_RETRY_MAX_SECONDS: float = 8.0
+
+    # Concurrent identical requests share one LLM call and DB execution.
+    # "local" deduplicates per worker; "redis" also across workers sharing SINGLE_FLIGHT_REDIS_URL.
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_BACKEND: str = "local"
+    SINGLE_FLIGHT_REDIS_URL: str | None = None
+    SINGLE_FLIGHT_LOCK_TTL_SECONDS: float = 60.0
+    SINGLE_FLIGHT_RESULT_TTL_SECONDS: float = 10.0
+    SINGLE_FLIGHT_POLL_SECONDS: float = 0.02
+
+    # Opens an OpenTelemetry span for every timed pipeline stage (requires opentelemetry-api).
+    OTEL_TRACING_ENABLED: bool = False
+
+    SQL_CACHE_ENABLED: bool = True
+    SQL_CACHE_MAX_ENTRIES: int = 1024
+    SQL_CACHE_TTL_SECONDS: float = 3600.0
+    SQL_CACHE_SIMILARITY_THRESHOLD: float = 0.85
+
+    # Verified NL/SQL examples: the most similar ones are added to the prompt, and a
+    # near-identical one is reused without calling the LLM (see src.example_store).
+    # They are kept in memory unless EXAMPLE_STORE_PATH names a JSON lines file.
+    EXAMPLE_STORE_ENABLED: bool = True
+    EXAMPLE_STORE_PATH: str | None = None
+    EXAMPLE_STORE_MAX_ENTRIES: int = 5000
+    EXAMPLE_TOP_K: int = 3
+    EXAMPLE_MIN_SIMILARITY: float = 0.3
+    EXAMPLE_REUSE_THRESHOLD: float = 0.95
+
+    # Filter literals are executed as bind variables so queries differing only in values share
+    # one cursor, and learned query-shape templates answer such queries without the LLM (see src.sql_templates).
+    SQL_BIND_LITERALS: bool = True
+    SQL_TEMPLATES_ENABLED: bool = True
+    SQL_TEMPLATE_MAX_ENTRIES: int = 1024
+
+    # "database" reads the catalog of DB_BACKEND; "static" uses the built-in schema.
+    SCHEMA_SOURCE: str = "database"
+    SCHEMA_REFRESH_SECONDS: float = 300.0
+    SCHEMA_OWNER: str | None = None
+    SCHEMA_TABLES: list[str] = []
+    SCHEMA_RETRIEVAL_MIN_TABLES: int = 20
+    SCHEMA_RETRIEVAL_TOP_K: int = 5
+
+    RESULT_CACHE_ENABLED: bool = False
+    RESULT_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    RESULT_CACHE_TTL_SECONDS: float = 30.0
+    RESULT_CACHE_TABLE_TTLS: dict[str, float] = {}
 
     @classmethod
     def validate(cls):
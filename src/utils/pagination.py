@@ -0,0 +1,55 @@
+"""
+Opaque page tokens for cursor-based pagination of query results.
+
+A token records the row offset of the next page together with a fingerprint of the
+SQL it belongs to.  Because the SQL is regenerated for each page request, the
+fingerprint makes sure a token is only honoured for the same statement; a token
+issued for different SQL (e.g. after a schema change) is rejected with a 400.
+"""
+
+import base64
+import hashlib
+import json
+from fastapi import HTTPException
+from src.utils.logger import get_logger
+
+logger=get_logger(__name__)
+
+def _fingerprint(sql: str) -> str:
+    return hashlib.sha256(" ".join(sql.split()).encode("utf-8")).hexdigest()[:16]
+
+def encode_page_token(sql: str, offset: int) -> str:
+    """Builds the token pointing at `offset` within the results of `sql`."""
+    payload = json.dumps({"o": offset, "q": _fingerprint(sql)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+def decode_page_token(token: str | None, sql: str) -> int:
+
+    """
+    Returns the row offset stored in a page token.
+
+    Args:
+        token (str | None): The token from the client, or None for the first page.
+        sql (str): The SQL the page is requested for.
+
+    Returns:
+        int: The offset of the first row of the requested page.
+
+    Raises:
+        HTTPException:
+            - 400 Bad Request: If the token is malformed or belongs to a different query.
+    """
+
+    if not token:
+        return 0
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+        offset = int(payload["o"])
+        fingerprint = payload["q"]
+    except Exception:
+        logger.warning("Received a malformed page token.")
+        raise HTTPException(status_code=400, detail="Invalid page token.")
+
+    if offset < 0 or fingerprint != _fingerprint(sql):
+        raise HTTPException(status_code=400, detail="Page token does not match this query. Restart from the first page.")
+    return offset
@@ -0,0 +1,142 @@
+"""
+Helpers for turning cursor batches into response payloads.
+
+Database drivers hand results over as `(columns, rows)` batches, where `rows` is
+the list of tuples returned by one `cursor.fetchmany()` call.  The helpers here
+encode those batches incrementally so a streamed response never has to hold the
+whole result set in memory, and build column-major payloads (compact JSON or
+Apache Arrow IPC) straight from the batches without allocating a dict per row.
+
+Apache Arrow support is optional; `pyarrow` is only imported when the Arrow
+format is requested.
+"""
+
+import json
+from typing import AsyncIterator
+from fastapi import HTTPException
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def rows_to_dicts(columns: list[str], rows: list[tuple]) -> list[dict]:
+    """Converts a batch of row tuples into dictionaries keyed by column name."""
+    return [dict(zip(columns, row)) for row in rows]
+
+def ndjson_chunk(columns: list[str], rows: list[tuple]) -> bytes:
+
+    """
+    Encodes one batch of rows as newline-delimited JSON objects.
+
+    Values that are not natively JSON serializable (dates, decimals, LOB handles)
+    are rendered with `str`.
+
+    Args:
+        columns (list[str]): Column names of the result set.
+        rows (list[tuple]): A batch of row tuples.
+
+    Returns:
+        bytes: One JSON object per row, each terminated by a newline.
+    """
+
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=str) + "\n" for row in rows
+    ).encode("utf-8")
+
+async def ndjson_stream(batches: AsyncIterator[tuple[list[str], list[tuple]]], first_batch: tuple[list[str], list[tuple]] | None = None) -> AsyncIterator[bytes]:
+
+    """
+    Encodes an asynchronous stream of cursor batches as NDJSON chunks.
+
+    Args:
+        batches (AsyncIterator): The remaining `(columns, rows)` batches.
+        first_batch (tuple, optional): A batch already read from `batches`, e.g. to
+            surface query errors before the response headers are sent.
+
+    Yields:
+        bytes: One encoded chunk per batch.
+    """
+
+    if first_batch is not None:
+        yield ndjson_chunk(*first_batch)
+    async for columns, rows in batches:
+        yield ndjson_chunk(columns, rows)
+
+
+async def collect_columns(batches: AsyncIterator[tuple[list[str], list[tuple]]]) -> dict | None:
+
+    """
+    Builds a column-major payload from cursor batches.
+
+    Column names are listed once and each column's values are appended batch by
+    batch, so no per-row dictionaries are created.
+
+    Args:
+        batches (AsyncIterator): The `(columns, rows)` batches of a result set.
+
+    Returns:
+        dict | None: `{"columns": [...], "data": [[column values], ...]}`, or None for an empty result.
+    """
+
+    columns, data = None, None
+    async for batch_columns, rows in batches:
+        if data is None:
+            columns, data = batch_columns, [[] for _ in batch_columns]
+        for values, column_values in zip(data, zip(*rows)):
+            values.extend(column_values)
+    if data is None:
+        return None
+    return {"columns": columns, "data": data}
+
+def _unify_chunks(pa, chunks: list):
+    """Combines per-batch arrays of one column, reconciling types that drifted between batches."""
+    types = {chunk.type for chunk in chunks if chunk.type != pa.null()}
+    if not types:
+        return pa.chunked_array(chunks, type=pa.null())
+    if len(types) == 1:
+        target = types.pop()
+    elif all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        target = pa.float64()
+    else:
+        target = pa.string()
+    return pa.chunked_array([chunk if chunk.type == target else chunk.cast(target) for chunk in chunks], type=target)
+
+async def collect_arrow_ipc(batches: AsyncIterator[tuple[list[str], list[tuple]]]) -> memoryview | None:
+
+    """
+    Builds an Apache Arrow IPC stream from cursor batches.
+
+    Every batch is converted to Arrow arrays column by column as soon as it is
+    fetched, so the Python objects of a batch are released before the next one is
+    read.  The resulting buffer is returned as a memoryview to avoid another copy
+    when it is written to the response.
+
+    Args:
+        batches (AsyncIterator): The `(columns, rows)` batches of a result set.
+
+    Returns:
+        memoryview | None: The serialized Arrow IPC stream, or None for an empty result.
+
+    Raises:
+        HTTPException:
+            - 501 Not Implemented: If `pyarrow` is not installed.
+    """
+
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Arrow format is unavailable: pyarrow is not installed.")
+
+    columns, chunks = None, None
+    async for batch_columns, rows in batches:
+        if chunks is None:
+            columns, chunks = batch_columns, [[] for _ in batch_columns]
+        for column_chunks, column_values in zip(chunks, zip(*rows)):
+            column_chunks.append(pa.array(column_values))
+    if chunks is None:
+        return None
+
+    table = pa.Table.from_arrays([_unify_chunks(pa, column_chunks) for column_chunks in chunks], names=columns)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return memoryview(sink.getvalue())
\ No newline at end of file
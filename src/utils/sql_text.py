@@ -0,0 +1,20 @@
+"""
+Plain-text clean-up of SQL returned by the LLM.
+
+Kept free of parser imports so the converter can use it without loading sqlglot.
+"""
+
+import re
+
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*(.*?)\s*```\s*$", re.DOTALL)
+
+def strip_code_fences(text: str) -> str:
+    """Removes a surrounding markdown code fence, surrounding whitespace and trailing semicolons."""
+    match = _FENCE.match(text)
+    if match:
+        text = match.group(1)
+    return text.strip().rstrip(";").strip()
+
+def is_refusal(text: str) -> bool:
+    """True if the LLM answered with the bare "ERROR" refusal (fences and quotes ignored)."""
+    return strip_code_fences(text).strip("\"'`").upper() == "ERROR"
@@ -0,0 +1,103 @@
+"""
+Lightweight text normalization and similarity helpers for natural language queries.
+
+These helpers are deliberately dependency free and cheap enough to run on every
+request: queries are lower-cased, tokenized, stripped of filler words and turned
+into unigram/bigram shingles that can be compared with Jaccard similarity.
+"""
+
+import re
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9_.]+")
+_STRING_LITERAL = re.compile(r"'((?:[^']|'')*)'")
+
+STOPWORDS = frozenset({
+    "a", "an", "the", "of", "for", "to", "in", "on", "by", "with", "and", "from",
+    "me", "my", "us", "our", "please", "show", "list", "give", "get", "display",
+    "find", "fetch", "retrieve", "what", "which", "who", "are", "is", "was", "were",
+    "all", "details", "detail", "info", "information", "can", "you", "i", "want",
+    "need", "tell", "about", "whose", "that", "there", "their", "do", "does",
+})
+
+def normalize_query(user_query: str) -> str:
+    """Lower-cases the query, collapses whitespace and drops trailing punctuation."""
+    return " ".join(user_query.lower().split()).rstrip("?.!;")
+
+def query_tokens(user_query: str) -> list[str]:
+
+    """
+    Splits a query into content tokens.
+
+    Stopwords are removed and simple plurals are folded ("students" -> "student")
+    so that rephrasings of the same question map to the same tokens.
+
+    Args:
+        user_query (str): The natural language query.
+
+    Returns:
+        list[str]: The content tokens in their original order.
+    """
+
+    return [token for token, _ in query_token_pairs(user_query)]
+
+def query_token_pairs(user_query: str) -> list[tuple[str, str]]:
+
+    """
+    Splits a query into content tokens, keeping each token as written next to its folded form.
+
+    Args:
+        user_query (str): The natural language query.
+
+    Returns:
+        list[tuple[str, str]]: `(folded token, raw token)` pairs in their original order.
+    """
+
+    pairs = []
+    for raw in _TOKEN_PATTERN.findall(user_query.lower()):
+        raw = raw.strip(".")
+        if not raw or raw in STOPWORDS:
+            continue
+        token = raw
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        pairs.append((token, raw))
+    return pairs
+
+def shingles(tokens: list[str]) -> frozenset[str]:
+    """Returns the unigram and adjacent-bigram shingles of a token list."""
+    grams = set(tokens)
+    grams.update(f"{left} {right}" for left, right in zip(tokens, tokens[1:]))
+    return frozenset(grams)
+
+def literal_tokens(tokens: list[str]) -> frozenset[str]:
+    """Returns the tokens carrying literal values (numbers, identifiers with digits)."""
+    return frozenset(token for token in tokens if any(char.isdigit() for char in token))
+
+def value_tokens(user_query: str, sql: str) -> frozenset[str]:
+
+    """
+    Returns the content tokens of a query that its SQL uses as values.
+
+    A token is a value when it is a word of one of the SQL's string literals, e.g.
+    "cse" for `dept = 'CSE'` or "ravi" for `sname LIKE '%ravi%'`.  Such tokens
+    select different rows when they change, however similar the rest of the query is.
+
+    Args:
+        user_query (str): The natural language query.
+        sql (str): The SQL answering it.
+
+    Returns:
+        frozenset[str]: The value tokens, in their folded form.
+    """
+
+    words = set()
+    for literal in _STRING_LITERAL.findall(sql):
+        words.update(word.strip(".") for word in _TOKEN_PATTERN.findall(literal.lower()))
+    return frozenset(token for token, raw in query_token_pairs(user_query) if raw in words or token in words)
+
+def jaccard(left: frozenset, right: frozenset) -> float:
+    """Jaccard similarity of two sets; 0.0 when both are empty."""
+    if not left and not right:
+        return 0.0
+    overlap = len(left & right)
+    return overlap / (len(left) + len(right) - overlap)
@@ -0,0 +1,96 @@
+import threading
+import pytest
+from fastapi import HTTPException
+from src.db.pool_manager import PoolManager
+from src.db.queue_pool import QueuePool
+
+def make_manager(**overrides) -> PoolManager:
+    options = dict(min_size=1, max_size=3, increment=1, wait_timeout=1.0, target_wait=0.01)
+    options.update(overrides)
+    manager = PoolManager(**options)
+    manager.resizes = []
+    manager.on_resize = manager.resizes.append
+    return manager
+
+def acquire_in_thread(manager: PoolManager) -> threading.Thread:
+    thread = threading.Thread(target=manager.acquire)
+    thread.start()
+    return thread
+
+def test_waiting_caller_grows_the_limit():
+    manager = make_manager()
+    manager.acquire()
+    acquire_in_thread(manager).join(timeout=2)
+    assert manager.limit == 2
+    assert manager.in_use == 2
+    assert manager.resizes == [2]
+    assert manager.stats()["grown"] == 1
+
+def test_limit_never_grows_past_the_maximum_and_times_out_with_503():
+    manager = make_manager(max_size=2, wait_timeout=0.1)
+    manager.acquire()
+    manager.acquire()
+    with pytest.raises(HTTPException) as e:
+        manager.acquire()
+    assert e.value.status_code == 503
+    assert manager.limit == 2
+    assert manager.stats()["timeouts"] == 1
+
+def test_released_slot_is_handed_to_a_waiting_caller_without_growing():
+    manager = make_manager(max_size=1)
+    manager.acquire()
+    thread = acquire_in_thread(manager)
+    manager.release()
+    thread.join(timeout=2)
+    assert manager.in_use == 1
+    assert manager.resizes == []
+
+def test_unused_limit_shrinks_one_step_per_interval():
+    manager = make_manager(min_size=1)
+    manager.acquire()
+    acquire_in_thread(manager).join(timeout=2)
+    manager.release()
+    manager.release()
+    assert manager.adjust() == 2  # the last interval still needed both connections
+    assert manager.adjust() == 1
+    assert manager.adjust() == 1
+    assert manager.resizes == [2, 1]
+    assert manager.stats()["shrunk"] == 1
+
+def test_failed_resize_keeps_the_limit():
+    manager = make_manager(wait_timeout=0.1)
+
+    def refuse(limit):
+        raise RuntimeError("pool cannot grow")
+    manager.on_resize = refuse
+    manager.acquire()
+    with pytest.raises(HTTPException):
+        manager.acquire()
+    assert manager.limit == 1
+
+def test_non_adaptive_manager_stays_at_the_maximum():
+    manager = make_manager(adaptive=False)
+    assert manager.limit == 3
+    manager.adjust()
+    assert manager.limit == 3
+
+class Connection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+def test_queue_pool_follows_the_limit():
+    pool = QueuePool(Connection, max_connections=2, timeout=0.1)
+    first, second = pool.acquire(), pool.acquire()
+    assert pool.usage() == (2, 2)
+    pool.release(first)
+    pool.resize(1)
+    assert first.closed and pool.usage() == (1, 1)
+    pool.release(second)
+    assert not second.closed and pool.usage() == (1, 0)
+    assert pool.acquire() is second
+    with pytest.raises(HTTPException) as e:
+        pool.acquire()
+    assert e.value.status_code == 503
@@ -0,0 +1,31 @@
+import pytest
+from src.query_cache import SemanticQueryCache
+
+SQL = "SELECT sname, total FROM exam WHERE dept = 'CSE' ORDER BY total ASC FETCH FIRST 10 ROWS ONLY"
+
+def make_cache(similarity_threshold: float = 0.85) -> SemanticQueryCache:
+    cache = SemanticQueryCache(similarity_threshold=similarity_threshold)
+    cache.put("top 10 students by total in cse ascending", "v1", SQL)
+    return cache
+
+@pytest.mark.parametrize("query", [
+    "Top 10 students by total in CSE ascending?",
+    "show me the top 10 student by total in cse ascending",
+])
+def test_rephrasings_with_the_same_content_words_reuse_the_sql(query):
+    assert make_cache().get(query, "v1") == SQL
+
+@pytest.mark.parametrize("query", [
+    "top 10 students by total in cse descending",
+    "top 20 students by total in cse ascending",
+    "top 10 students by total in ece ascending",
+    "top 10 failed students by total in cse ascending",
+])
+def test_a_changed_or_added_word_never_reuses_the_sql(query):
+    # However low the threshold, only the content words decide whether SQL is reused.
+    cache = make_cache(similarity_threshold=0.5)
+    assert cache.get(query, "v1") is None
+    assert cache.stats()["near_hits"] == 0
+
+def test_other_schema_versions_never_match():
+    assert make_cache().get("show the top 10 students by total in cse ascending", "v2") is None
@@ -0,0 +1,62 @@
+import pytest
+import sqlglot
+from sqlglot import exp
+from src.query_guard import QueryGuard, _limit_value
+from src.schema_details import STATIC_SCHEMA, SchemaCache
+from src.sql_validator import SQLValidator
+
+def make_guard(dialect: str = "oracle", max_rows: int = 100) -> QueryGuard:
+    return QueryGuard(SQLValidator(SchemaCache(loader=lambda: list(STATIC_SCHEMA)), dialect), max_rows=max_rows)
+
+def test_query_without_limit_is_capped():
+    assert make_guard().cap_rows("SELECT * FROM student") == "SELECT * FROM student FETCH FIRST 100 ROWS ONLY"
+    assert make_guard("sqlite").cap_rows("SELECT * FROM student") == "SELECT * FROM student LIMIT 100"
+
+def test_smaller_limit_is_kept_and_larger_one_is_lowered():
+    guard = make_guard()
+    assert guard.cap_rows("SELECT * FROM student FETCH FIRST 5 ROWS ONLY") == "SELECT * FROM student FETCH FIRST 5 ROWS ONLY"
+    assert guard.cap_rows("SELECT * FROM student FETCH FIRST 500 ROWS ONLY") == "SELECT * FROM student FETCH FIRST 100 ROWS ONLY"
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM student FETCH FIRST 50 PERCENT ROWS ONLY",
+    "SELECT * FROM student ORDER BY sem FETCH FIRST 5 ROWS WITH TIES",
+])
+def test_percent_and_with_ties_limits_are_kept(sql):
+    capped = make_guard().cap_rows(sql)
+    assert _limit_value(sqlglot.parse_one(sql, read="oracle")) is None
+    assert sql in capped
+    assert capped.endswith("FETCH FIRST 100 ROWS ONLY")
+
+@pytest.mark.parametrize("option", ["percent", "with_ties"])
+def test_limit_options_stored_on_fetch_are_recognized(option):
+    # sqlglot releases before LimitOptions keep PERCENT / WITH TIES as args of the Fetch node.
+    tree = sqlglot.parse_one("SELECT * FROM student", read="oracle")
+    tree.set("limit", exp.Fetch(direction="FIRST", count=exp.Literal.number(50), **{option: True}))
+    assert _limit_value(tree) is None
+
+def test_zero_max_rows_disables_the_cap():
+    assert make_guard(max_rows=0).cap_rows("SELECT * FROM student") == "SELECT * FROM student"
+
+JOIN = "SELECT * FROM student s JOIN placement p ON s.roll_number = p.roll_number"
+
+def test_join_with_duplicate_columns_keeps_its_percent_limit_uncapped():
+    sql = f"{JOIN} FETCH FIRST 50 PERCENT ROWS ONLY"
+    assert make_guard().cap_rows(sql) == sql
+
+def test_paginate_extends_the_query_instead_of_wrapping_it():
+    guard = make_guard()
+    paged = guard.paginate(guard.order_rows(guard.cap_rows(JOIN)), 20, 11)
+    assert paged.startswith(JOIN + " ORDER BY 1, 2")
+    assert paged.endswith("OFFSET 20 ROWS FETCH FIRST 11 ROWS ONLY")
+    assert make_guard("mysql").paginate("SELECT sname FROM student ORDER BY 1", 20, 11).endswith("LIMIT 11 OFFSET 20")
+
+@pytest.mark.parametrize("offset, limit, expected", [(0, 11, 11), (95, 11, 5), (120, 11, 0)])
+def test_paginate_stays_within_the_row_cap(offset, limit, expected):
+    guard = make_guard()
+    paged = guard.paginate(guard.cap_rows("SELECT sname FROM student ORDER BY 1"), offset, limit)
+    assert paged.endswith(f"FETCH FIRST {expected} ROWS ONLY")
+    assert (f"OFFSET {offset} ROWS" in paged) == bool(offset)
+
+def test_paginate_wraps_a_query_with_its_own_offset():
+    paged = make_guard("sqlite").paginate("SELECT sname FROM student ORDER BY 1 LIMIT 5 OFFSET 2", 0, 3)
+    assert paged == "SELECT * FROM (SELECT sname FROM student ORDER BY 1 LIMIT 5 OFFSET 2) AS paged LIMIT 3"
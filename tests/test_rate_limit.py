@@ -0,0 +1,81 @@
+import asyncio
+import types
+import pytest
+from fastapi import HTTPException
+from src import rate_limit
+from src.llm_gate import LLMGate
+from src.rate_limit import RateLimiter
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+def test_client_over_its_rate_gets_429_with_retry_after(clock):
+    limiter = RateLimiter(client_rate=0.5, client_burst=2)
+    limiter.check("a")
+    limiter.check("a")
+    with pytest.raises(HTTPException) as e:
+        limiter.check("a")
+    assert e.value.status_code == 429
+    assert e.value.headers == {"Retry-After": "2"}
+    limiter.check("b")
+    clock.now += 2
+    limiter.check("a")
+
+def test_global_rate_gets_503_and_refunds_the_client(clock):
+    limiter = RateLimiter(client_rate=1, client_burst=2, global_rate=1, global_burst=1)
+    limiter.check("a")
+    with pytest.raises(HTTPException) as e:
+        limiter.check("b")
+    assert e.value.status_code == 503
+    assert e.value.headers == {"Retry-After": "1"}
+    clock.now += 1
+    limiter.check("b")
+    clock.now += 1
+    limiter.check("b")
+    assert limiter.stats()["global_rejections"] == 1
+
+def test_batch_larger_than_the_burst_is_rejected_without_retry_after(clock):
+    limiter = RateLimiter(client_rate=1, client_burst=5)
+    with pytest.raises(HTTPException) as e:
+        limiter.check("a", cost=6)
+    assert e.value.status_code == 429
+    assert e.value.headers is None
+    limiter.check("a", cost=5)
+
+def test_llm_gate_sheds_calls_beyond_the_queue_with_retry_after():
+    gate = LLMGate(max_concurrency=1, max_queue=1, queue_timeout=5, max_retries=0)
+
+    async def call():
+        await asyncio.sleep(0.05)
+        return "SELECT 1 FROM dual"
+
+    async def run():
+        return await asyncio.gather(*(gate.run(call) for _ in range(3)), return_exceptions=True)
+    results = asyncio.run(run())
+    assert results[:2] == ["SELECT 1 FROM dual"] * 2
+    assert results[2].status_code == 503
+    assert int(results[2].headers["Retry-After"]) >= 1
+    assert gate.shed == 1
+
+def test_llm_gate_sheds_calls_that_wait_too_long():
+    gate = LLMGate(max_concurrency=1, max_queue=1, queue_timeout=0.01, max_retries=0)
+
+    async def call():
+        await asyncio.sleep(0.1)
+
+    async def run():
+        return await asyncio.gather(gate.run(call), gate.run(call), return_exceptions=True)
+    results = asyncio.run(run())
+    assert results[1].status_code == 503
+    assert "Retry-After" in results[1].headers
+    assert gate.queue_timeouts == 1
@@ -0,0 +1,105 @@
+import asyncio
+import types
+import pytest
+from src import result_cache
+from src.result_cache import QueryResultCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_cache, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+def counting_executor(rows=None):
+    calls = []
+
+    async def execute(sql):
+        calls.append(sql)
+        await asyncio.sleep(0.01)
+        return rows if rows is not None else [{"n": len(calls)}]
+    return execute, calls
+
+def test_repeated_sql_is_served_from_the_cache(clock):
+    cache = QueryResultCache()
+    execute, calls = counting_executor()
+
+    async def run():
+        first = await cache.get_or_execute("SELECT * FROM student", execute)
+        second = await cache.get_or_execute("select *  from STUDENT;", execute)
+        return first, second
+    first, second = asyncio.run(run())
+    assert first is second
+    assert len(calls) == 1
+    assert cache.stats()["hits"] == 1
+
+def test_entries_expire_after_the_shortest_table_ttl(clock):
+    cache = QueryResultCache(default_ttl=30.0, table_ttls={"Exam": 5.0})
+    execute, calls = counting_executor()
+
+    async def run():
+        await cache.get_or_execute("SELECT * FROM student JOIN exam ON 1 = 1", execute)
+        clock.now += 4
+        await cache.get_or_execute("SELECT * FROM student JOIN exam ON 1 = 1", execute)
+        clock.now += 2
+        await cache.get_or_execute("SELECT * FROM student JOIN exam ON 1 = 1", execute)
+    asyncio.run(run())
+    assert len(calls) == 2
+
+def test_least_recently_used_entries_are_evicted_over_budget(clock):
+    rows = [{"value": "x" * 100}]
+    cache = QueryResultCache(max_bytes=2 * result_cache._estimate_size(rows))
+    execute, calls = counting_executor(rows)
+
+    async def run():
+        for sql in ("SELECT 1 FROM a", "SELECT 1 FROM b", "SELECT 1 FROM a", "SELECT 1 FROM c"):
+            await cache.get_or_execute(sql, execute)
+        await cache.get_or_execute("SELECT 1 FROM a", execute)
+        await cache.get_or_execute("SELECT 1 FROM b", execute)
+    asyncio.run(run())
+    assert calls == ["SELECT 1 FROM a", "SELECT 1 FROM b", "SELECT 1 FROM c", "SELECT 1 FROM b"]
+    assert cache.stats()["evictions"] == 2
+
+def test_concurrent_identical_sql_is_executed_once(clock):
+    cache = QueryResultCache()
+    execute, calls = counting_executor()
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_execute("SELECT * FROM student", execute) for _ in range(5)))
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["coalesced"] == 4
+
+def test_coalesced_callers_receive_the_leaders_error(clock):
+    cache = QueryResultCache()
+
+    async def fail(sql):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+
+    async def run():
+        return await asyncio.gather(*(cache.get_or_execute("SELECT * FROM student", fail) for _ in range(3)),
+                                    return_exceptions=True)
+    errors = asyncio.run(run())
+    assert [str(error) for error in errors] == ["database down"] * 3
+    assert cache.stats()["entries"] == 0
+
+def test_invalidation_drops_results_of_the_table(clock):
+    cache = QueryResultCache()
+    execute, calls = counting_executor()
+
+    async def run():
+        await cache.get_or_execute("SELECT * FROM student", execute)
+        await cache.get_or_execute("SELECT * FROM exam", execute)
+        assert cache.invalidate(["STUDENT"]) == 1
+        await cache.get_or_execute("SELECT * FROM student", execute)
+        await cache.get_or_execute("SELECT * FROM exam", execute)
+    asyncio.run(run())
+    assert calls == ["SELECT * FROM student", "SELECT * FROM exam", "SELECT * FROM student"]
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import pytest
+from fastapi import HTTPException
+from src.single_flight import RedisSingleFlight, SingleFlight
+
+class FakeRedis:
+    """In-memory stand-in for the `redis.asyncio` calls made by `RedisSingleFlight`; expiry is ignored."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def set(self, name, value, nx=False, px=None):
+        if nx and name in self.data:
+            return None
+        self.data[name] = value
+        return True
+
+    async def get(self, name):
+        return self.data.get(name)
+
+    async def eval(self, script, numkeys, name, token):
+        if self.data.get(name) != token:
+            return 0
+        del self.data[name]
+        return 1
+
+def rate_limited():
+    raise HTTPException(status_code=429, detail="Rate limit exceeded.", headers={"Retry-After": "3"})
+
+async def flight(group, work, delay=0.02):
+    async def run():
+        await asyncio.sleep(delay)
+        return work()
+    return await group.do("students in cse", run)
+
+def test_followers_share_the_leaders_result():
+    group = SingleFlight()
+    calls = []
+
+    async def run():
+        return await asyncio.gather(*(flight(group, lambda: calls.append(1) or "SELECT 1 FROM dual") for _ in range(4)))
+    assert asyncio.run(run()) == ["SELECT 1 FROM dual"] * 4
+    assert len(calls) == 1
+    assert group.stats()["followers"] == 3
+
+def test_followers_receive_the_leaders_error_with_its_headers():
+    group = SingleFlight()
+
+    async def run():
+        return await asyncio.gather(*(flight(group, rate_limited) for _ in range(3)), return_exceptions=True)
+    errors = asyncio.run(run())
+    assert [(error.status_code, error.headers) for error in errors] == [(429, {"Retry-After": "3"})] * 3
+    assert group.stats()["inflight"] == 0
+
+def test_redis_followers_receive_the_leaders_result():
+    redis = FakeRedis()
+    leader, follower = RedisSingleFlight(redis, poll_interval=0.001), RedisSingleFlight(redis, poll_interval=0.001)
+
+    async def run():
+        return await asyncio.gather(flight(leader, lambda: "SELECT 1 FROM dual"),
+                                    flight(follower, lambda: pytest.fail("the follower must not run the work")))
+    assert asyncio.run(run()) == ["SELECT 1 FROM dual"] * 2
+    assert follower.remote_followers == 1
+
+def test_redis_followers_receive_the_leaders_error_with_its_headers():
+    redis = FakeRedis()
+    leader, follower = RedisSingleFlight(redis, poll_interval=0.001), RedisSingleFlight(redis, poll_interval=0.001)
+
+    async def run():
+        return await asyncio.gather(flight(leader, rate_limited), flight(follower, rate_limited),
+                                    return_exceptions=True)
+    errors = asyncio.run(run())
+    assert [(error.status_code, error.detail, error.headers) for error in errors] == \
+        [(429, "Rate limit exceeded.", {"Retry-After": "3"})] * 2
+    assert leader.leaders + follower.leaders == 1
+
+def test_redis_leader_publishes_unexpected_errors_as_500():
+    redis = FakeRedis()
+    group = RedisSingleFlight(redis)
+
+    def crash():
+        raise RuntimeError("boom")
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight(group, crash, delay=0))
+    [payload] = [json.loads(value) for name, value in redis.data.items() if ":result:" in name]
+    assert payload["error"][0] == 500
+    assert not any(":lock:" in name for name in redis.data)
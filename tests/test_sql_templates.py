@@ -0,0 +1,46 @@
+from src.schema_details import STATIC_SCHEMA, SchemaCache
+from src.sql_templates import QueryTemplateCache, SQLParameterizer
+from src.sql_validator import SQLValidator
+
+def make_validator(dialect: str = "sqlite") -> SQLValidator:
+    return SQLValidator(SchemaCache(loader=lambda: list(STATIC_SCHEMA)), dialect)
+
+def learned_templates() -> QueryTemplateCache:
+    validator = make_validator()
+    templates = QueryTemplateCache(validator)
+    sql = validator.validate("SELECT sname FROM student WHERE dept = 'CSE' AND sem = 5 AND sname LIKE '%ravi%'")
+    assert templates.learn("students in dept cse in sem 5 named ravi", "v1", sql)
+    return templates
+
+def test_template_is_filled_with_the_new_values():
+    assert learned_templates().match("students in dept ece in sem 3 named jo", "v1") == \
+        "SELECT sname FROM student WHERE dept = 'ECE' AND sem = 3 AND sname LIKE '%jo%'"
+
+def test_other_shapes_and_schema_versions_fall_back():
+    templates = learned_templates()
+    assert templates.match("students in dept ece in sem x named jo", "v1") is None
+    assert templates.match("students in dept ece in sem 3 called jo", "v1") is None
+    assert templates.match("students in dept ece in sem 3 named jo", "v2") is None
+    assert templates.stats()["misses"] == 3
+
+def test_sql_without_values_from_the_question_is_not_learned():
+    validator = make_validator()
+    templates = QueryTemplateCache(validator)
+    assert not templates.learn("top students", "v1", validator.validate("SELECT sname FROM student LIMIT 10"))
+    assert templates.stats()["size"] == 0
+
+def test_probe_of_an_aggregate_keeps_only_its_filters():
+    validator = make_validator()
+    templates = QueryTemplateCache(validator)
+    sql = "SELECT dept, COUNT(*) FROM student WHERE sem = 3 GROUP BY dept ORDER BY 2 DESC"
+    assert templates.probe(sql) == "SELECT 1 FROM student WHERE sem = 3"
+    assert templates.probe("SELECT sname FROM student WHERE sem = 3") == "SELECT sname FROM student WHERE sem = 3"
+
+def test_filter_literals_become_bind_variables():
+    validator = make_validator("oracle")
+    sql = validator.validate("SELECT sname, 'x' AS tag FROM student WHERE dept = 'CSE' AND sem IN (3, 5) "
+                             "ORDER BY 1 FETCH FIRST 10 ROWS ONLY")
+    statement, params = SQLParameterizer(validator).bind(sql)
+    assert "'x' AS tag" in statement and "FETCH FIRST 10 ROWS ONLY" in statement
+    assert "'CSE'" not in statement
+    assert sorted(params.values(), key=str) == [3, 5, "CSE"]
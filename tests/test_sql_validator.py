@@ -0,0 +1,30 @@
+import pytest
+from fastapi import HTTPException
+from src.schema_details import STATIC_SCHEMA, SchemaCache
+from src.sql_validator import SQLValidator
+
+def make_validator(dialect: str) -> SQLValidator:
+    return SQLValidator(SchemaCache(loader=lambda: list(STATIC_SCHEMA)), dialect)
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM student WHERE ROWNUM <= 5",
+    "SELECT s.ROWID, sname FROM student s",
+    "SELECT LEVEL, sname FROM student",
+    "SELECT SYSDATE FROM dual",
+    "SELECT SYSTIMESTAMP FROM DUAL",
+])
+def test_oracle_builtins_are_allowed(sql):
+    assert make_validator("oracle").validate(sql)
+
+@pytest.mark.parametrize("sql", [
+    "SELECT * FROM student WHERE ROWNUM <= 5",
+    "SELECT SYSDATE FROM dual",
+])
+def test_oracle_builtins_are_rejected_in_other_dialects(sql):
+    with pytest.raises(HTTPException) as e:
+        make_validator("sqlite").validate(sql)
+    assert e.value.status_code == 400
+
+def test_unknown_column_is_still_rejected():
+    with pytest.raises(HTTPException, match="unknown column 'rownumber'"):
+        make_validator("oracle").validate("SELECT * FROM student WHERE rownumber <= 5")